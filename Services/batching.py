@@ -0,0 +1,148 @@
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, List, Sequence
+
+
+class MicroBatcher:
+    """
+    Coalesces concurrent async calls into batch calls.
+
+    Items submitted while a batch is forming (up to max_wait_ms after the first one, or until
+    max_batch_size items) are passed to batch_func together; each caller gets its own result.
+    Meant for one event loop (e.g. a server process).
+
+    Args:
+        batch_func (Callable): async function taking a list of items, returning one result per item
+        max_batch_size (int): Items per batch call
+        max_wait_ms (float): How long the first item of a batch waits for company
+    """
+
+    def __init__(self, batch_func: Callable[[List[Any]], Awaitable[Sequence[Any]]],
+                 max_batch_size: int = 32, max_wait_ms: float = 5.0):
+        self.batch_func = batch_func
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self.batches = 0
+        self.items = 0
+        self._pending = []
+        self._timer = None
+
+    async def submit(self, item: Any) -> Any:
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((item, future))
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self.max_wait_ms / 1000, self._flush)
+        return await future
+
+    def stats(self):
+        return {"batches": self.batches, "items": self.items,
+                "avg_batch_size": round(self.items / self.batches, 2) if self.batches else 0.0}
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending[:self.max_batch_size], self._pending[self.max_batch_size:]
+        if self._pending:
+            self._timer = asyncio.get_running_loop().call_later(self.max_wait_ms / 1000, self._flush)
+        if batch:
+            asyncio.ensure_future(self._run(batch))
+
+    async def _run(self, batch):
+        self.batches += 1
+        self.items += len(batch)
+        try:
+            results = await self.batch_func([item for item, _ in batch])
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+
+class _Slot:
+    __slots__ = ("item", "result", "error", "done", "lead")
+
+    def __init__(self, item):
+        self.item = item
+        self.result = None
+        self.error = None
+        self.done = threading.Event()
+        self.lead = False
+
+
+class ThreadedMicroBatcher:
+    """
+    Coalesces concurrent blocking calls from many threads into batch calls.
+
+    The first caller to arrive leads: it waits up to max_wait_ms for other callers (or until
+    max_batch_size items), runs batch_func on all of them and hands every caller its result.
+    Callers still queued afterwards get a new leader. No background thread is involved.
+
+    Args:
+        batch_func (Callable): function taking a list of items, returning one result per item
+        max_batch_size (int): Items per batch call
+        max_wait_ms (float): How long the leader waits for company
+    """
+
+    def __init__(self, batch_func: Callable[[List[Any]], Sequence[Any]],
+                 max_batch_size: int = 32, max_wait_ms: float = 5.0):
+        self.batch_func = batch_func
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self.batches = 0
+        self.items = 0
+        self._pending = []
+        self._leading = False
+        self._condition = threading.Condition()
+
+    def submit(self, item: Any) -> Any:
+        slot = _Slot(item)
+        with self._condition:
+            self._pending.append(slot)
+            if self._leading:
+                self._condition.notify_all()
+            else:
+                self._leading = slot.lead = True
+
+        if not slot.lead:
+            slot.done.wait()
+        if slot.lead:
+            self._lead()
+        if slot.error is not None:
+            raise slot.error
+        return slot.result
+
+    def stats(self):
+        with self._condition:
+            return {"batches": self.batches, "items": self.items,
+                    "avg_batch_size": round(self.items / self.batches, 2) if self.batches else 0.0}
+
+    def _lead(self):
+        with self._condition:
+            self._condition.wait_for(lambda: len(self._pending) >= self.max_batch_size, self.max_wait_ms / 1000)
+            batch, self._pending = self._pending[:self.max_batch_size], self._pending[self.max_batch_size:]
+            self.batches += 1
+            self.items += len(batch)
+            # Hand leadership to the next queued caller, if any
+            if self._pending:
+                self._pending[0].lead = True
+                self._pending[0].done.set()
+            else:
+                self._leading = False
+
+        try:
+            results = self.batch_func([slot.item for slot in batch])
+            for slot, result in zip(batch, results):
+                slot.result = result
+        except Exception as e:
+            for slot in batch:
+                slot.error = e
+        for slot in batch:
+            slot.lead = False
+            slot.done.set()
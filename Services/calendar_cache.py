@@ -0,0 +1,227 @@
+import os
+import sys
+import time
+import select
+import threading
+from datetime import date
+import psycopg2
+from dotenv import load_dotenv
+from Services import db_service
+
+load_dotenv()
+
+# Holidays change rarely, so serve them from memory. While the LISTEN connection is up,
+# entries stay valid until holidays_table notifies a change (capped at HOLIDAY_CACHE_MAX_AGE);
+# without notifications they expire after HOLIDAY_CACHE_TTL instead.
+HOLIDAY_CACHE_TTL = float(os.getenv("HOLIDAY_CACHE_TTL", "300"))
+HOLIDAY_CACHE_MAX_AGE = float(os.getenv("HOLIDAY_CACHE_MAX_AGE", str(24 * 3600)))
+HOLIDAY_CACHE_LISTEN = os.getenv("HOLIDAY_CACHE_LISTEN", "true").lower() == "true"
+HOLIDAYS_CHANNEL = "holidays_changed"
+
+# Run once against the database (see install_notify_trigger) to get change notifications.
+# The payload is the employee_id whose holidays changed, empty for "everything" (TRUNCATE).
+NOTIFY_TRIGGER_SQL = """
+    CREATE OR REPLACE FUNCTION notify_holidays_changed() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP = 'TRUNCATE' THEN
+            PERFORM pg_notify('holidays_changed', '');
+            RETURN NULL;
+        END IF;
+        IF TG_OP <> 'INSERT' THEN
+            PERFORM pg_notify('holidays_changed', OLD.employee_id::text);
+        END IF;
+        IF TG_OP <> 'DELETE' THEN
+            PERFORM pg_notify('holidays_changed', NEW.employee_id::text);
+        END IF;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql;
+
+    DROP TRIGGER IF EXISTS holidays_changed ON holidays_table;
+    CREATE TRIGGER holidays_changed
+        AFTER INSERT OR UPDATE OR DELETE ON holidays_table
+        FOR EACH ROW EXECUTE FUNCTION notify_holidays_changed();
+
+    DROP TRIGGER IF EXISTS holidays_truncated ON holidays_table;
+    CREATE TRIGGER holidays_truncated
+        AFTER TRUNCATE ON holidays_table
+        FOR EACH STATEMENT EXECUTE FUNCTION notify_holidays_changed();
+"""
+
+
+def install_notify_trigger():
+    """
+    Creates the holidays_table trigger that publishes changes on HOLIDAYS_CHANNEL.
+    """
+    with db_service.get_connection() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute(NOTIFY_TRIGGER_SQL)
+
+
+class HolidayCache:
+    """
+    Read-through employee_id -> upcoming holidays cache, invalidated by Postgres LISTEN/NOTIFY.
+    """
+
+    def __init__(self, ttl=HOLIDAY_CACHE_TTL, max_age=HOLIDAY_CACHE_MAX_AGE):
+        self.ttl = ttl
+        self.max_age = max_age
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.listening = False
+        self._entries = {}
+        # Bumped on every invalidation so a load that raced with one isn't stored
+        self._generation = 0
+        self._lock = threading.Lock()
+        self._listener = None
+        self._stop = threading.Event()
+
+    def get(self, employee_id):
+        """
+        Upcoming holidays of the employee, from memory when possible.
+        """
+        dates = self._lookup(employee_id)
+        if dates is not None:
+            return dates
+        generation = self._generation
+        return self._store(employee_id, db_service.query_holidays_dates(employee_id), generation)
+
+    async def get_async(self, employee_id):
+        """
+        Async variant of get, loads misses through the asyncpg pool (the psycopg2 pool in a
+        worker thread when asyncpg is not installed).
+        """
+        dates = self._lookup(employee_id)
+        if dates is not None:
+            return dates
+        generation = self._generation
+        return self._store(employee_id, await db_service.query_holidays_dates_async(employee_id), generation)
+
+    def invalidate(self, employee_id=None):
+        """
+        Forgets one employee's holidays, or everyone's when employee_id is None.
+        """
+        with self._lock:
+            self._generation += 1
+            self.invalidations += 1
+            if employee_id is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(employee_id, None)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations,
+                "listening": self.listening,
+                "size": len(self._entries),
+            }
+
+    def _lookup(self, employee_id):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(employee_id)
+            max_age = self.max_age if self.listening else self.ttl
+            if entry is None or now - entry[1] > max_age:
+                self.misses += 1
+                return None
+            self.hits += 1
+        # Cached lists were "from today onward" when loaded, drop what has passed since
+        today = date.today().isoformat()
+        return [d for d in entry[0] if d >= today]
+
+    def _store(self, employee_id, dates, generation):
+        with self._lock:
+            if generation == self._generation:
+                self._entries[employee_id] = (dates, time.monotonic())
+        return dates
+
+    # ---------------------------------------------------------------- LISTEN/NOTIFY
+
+    def start_listener(self):
+        """
+        Starts a background thread holding a dedicated LISTEN connection.
+        """
+        if self._listener is not None and self._listener.is_alive():
+            return
+        self._stop.clear()
+        self._listener = threading.Thread(target=self._listen, name="holiday-cache-listener", daemon=True)
+        self._listener.start()
+
+    def stop_listener(self):
+        self._stop.set()
+        if self._listener is not None:
+            self._listener.join(timeout=10)
+            self._listener = None
+
+    def _listen(self):
+        while not self._stop.is_set():
+            conn = None
+            try:
+                conn = psycopg2.connect(**db_service.DB_CONFIG)
+                conn.autocommit = True
+                with conn.cursor() as cursor:
+                    cursor.execute(f"LISTEN {HOLIDAYS_CHANNEL}")
+                # Anything cached before LISTEN started may have missed a notification
+                self.invalidate()
+                self.listening = True
+
+                while not self._stop.is_set():
+                    if select.select([conn], [], [], 5)[0]:
+                        conn.poll()
+                        while conn.notifies:
+                            payload = conn.notifies.pop(0).payload
+                            self.invalidate(int(payload) if payload.isdigit() else None)
+
+            except Exception as e:
+                print("❌ Holiday cache listener error, falling back to TTL:", e, sys.exc_info())
+            finally:
+                self.listening = False
+                if conn is not None:
+                    conn.close()
+            # Retry the connection after a pause
+            self._stop.wait(30)
+
+
+_holiday_cache = None
+_holiday_cache_lock = threading.Lock()
+
+
+def get_holiday_cache():
+    """
+    Returns the process-wide HolidayCache, starting its listener on Postgres.
+    """
+    global _holiday_cache
+    if _holiday_cache is None:
+        with _holiday_cache_lock:
+            if _holiday_cache is None:
+                cache = HolidayCache()
+                if HOLIDAY_CACHE_LISTEN and db_service.DB_BACKEND == "postgres":
+                    cache.start_listener()
+                _holiday_cache = cache
+    return _holiday_cache
+
+
+def get_cached_holidays_dates(employee_id):
+    """
+    Cached get_holidays_dates, [] on database errors (which are not cached).
+    """
+    try:
+        return get_holiday_cache().get(employee_id)
+    except Exception as e:
+        print("❌ Error in get_cached_holidays_dates():", e, sys.exc_info())
+        return []
+
+
+async def get_cached_holidays_dates_async(employee_id):
+    """
+    Async variant of get_cached_holidays_dates.
+    """
+    try:
+        return await get_holiday_cache().get_async(employee_id)
+    except Exception as e:
+        print("❌ Error in get_cached_holidays_dates():", e, sys.exc_info())
+        return []
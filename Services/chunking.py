@@ -0,0 +1,169 @@
+import os
+import re
+from typing import Callable, Iterable, Iterator, List, Optional
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Chunker used by the preference indexer: "sentence" (default) or "fixed" (the original
+# 500 character slices with 20 characters of overlap)
+CHUNKER = os.getenv("CHUNKER", "sentence")
+# Token budget per chunk. all-MiniLM-L6-v2 truncates its input at 256 word pieces, and
+# estimate_tokens (used when the tokenizer isn't available) undercounts word pieces.
+CHUNK_MAX_TOKENS = int(os.getenv("CHUNK_MAX_TOKENS", "128"))
+# Tokens of trailing sentences repeated at the start of the next chunk
+CHUNK_OVERLAP_TOKENS = int(os.getenv("CHUNK_OVERLAP_TOKENS", "0"))
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+_ROUGH_TOKEN = re.compile(r"\w+|[^\w\s]")
+
+
+def estimate_tokens(text: str) -> int:
+    """Word + punctuation count, a close lower bound of word-piece tokens for English text"""
+    return len(_ROUGH_TOKEN.findall(text))
+
+
+class FixedSizeChunker:
+    """
+    Fixed-size character slices (the original chunking).
+
+    Args:
+        size (int): Characters per chunk
+        step (int): Characters between chunk starts (size - step characters overlap)
+    """
+
+    def __init__(self, size: int = 500, step: int = 480):
+        self.size = size
+        self.step = step
+
+    def chunk(self, text: str) -> List[str]:
+        return [text[i:i + self.size] for i in range(0, len(text), self.step)]
+
+    def iter_chunks(self, lines: Iterable[str]) -> Iterator[str]:
+        """Same slices as chunk(), holding at most one chunk of text at a time"""
+        buffer = ""
+        for line in lines:
+            buffer += line
+            while len(buffer) >= self.size:
+                yield buffer[:self.size]
+                buffer = buffer[self.step:]
+        # What is left is the tail of the text, sliced like chunk() would
+        while buffer:
+            yield buffer[:self.size]
+            if len(buffer) <= self.step:
+                break
+            buffer = buffer[self.step:]
+
+
+class SentenceChunker:
+    """
+    Packs whole paragraphs, or whole sentences of longer paragraphs, into chunks of at most
+    max_tokens tokens.
+
+    Consecutive paragraphs (blank-line separated) share a chunk while they fit, a paragraph is
+    only split when it is over budget on its own, and a sentence only when it is. Within a split
+    paragraph the last overlap_tokens tokens worth of sentences of a chunk are repeated at the
+    start of the next one.
+
+    Args:
+        max_tokens (int): Token budget per chunk
+        overlap_tokens (int): Token budget of the sentences carried into the next chunk
+        count_tokens (Callable): Token counter, e.g. the embedding model's tokenizer
+            (defaults to estimate_tokens)
+    """
+
+    def __init__(self, max_tokens: int = CHUNK_MAX_TOKENS, overlap_tokens: int = CHUNK_OVERLAP_TOKENS,
+                 count_tokens: Optional[Callable[[str], int]] = None):
+        self.max_tokens = max_tokens
+        self.overlap_tokens = overlap_tokens
+        self.count_tokens = count_tokens or estimate_tokens
+
+    def chunk(self, text: str) -> List[str]:
+        return list(self.iter_chunks(text.splitlines(keepends=True)))
+
+    def iter_chunks(self, lines: Iterable[str]) -> Iterator[str]:
+        """Chunks of a text given as lines (e.g. an open file), one paragraph in memory at a time"""
+        # A chunk is a list of paragraphs, each a list of (sentence, tokens)
+        chunk, tokens = [], 0
+        for paragraph in self._paragraphs(lines):
+            sentences = [(sentence, self.count_tokens(sentence)) for sentence in self._sentences(paragraph)]
+            paragraph_tokens = sum(t for _, t in sentences)
+            if chunk and tokens + paragraph_tokens > self.max_tokens:
+                yield self._render(chunk)
+                chunk, tokens = [], 0
+            if paragraph_tokens <= self.max_tokens:
+                chunk.append(sentences)
+                tokens += paragraph_tokens
+                continue
+
+            # Over budget on its own: pack its sentences
+            chunk.append([])
+            for sentence, sentence_tokens in sentences:
+                if tokens + sentence_tokens > self.max_tokens and any(chunk):
+                    carried = self._overlap(chunk[-1])
+                    yield self._render(chunk)
+                    chunk, tokens = [carried], sum(t for _, t in carried)
+                chunk[-1].append((sentence, sentence_tokens))
+                tokens += sentence_tokens
+        if any(chunk):
+            yield self._render(chunk)
+
+    @staticmethod
+    def _paragraphs(lines: Iterable[str]) -> Iterator[str]:
+        paragraph = []
+        for line in lines:
+            if line.strip():
+                paragraph.append(line.strip())
+            elif paragraph:
+                yield " ".join(paragraph)
+                paragraph = []
+        if paragraph:
+            yield " ".join(paragraph)
+
+    @staticmethod
+    def _render(chunk) -> str:
+        return "\n\n".join(" ".join(sentence for sentence, _ in paragraph) for paragraph in chunk if paragraph)
+
+    def _sentences(self, paragraph: str) -> Iterator[str]:
+        for sentence in _SENTENCE_END.split(paragraph):
+            if self.count_tokens(sentence) <= self.max_tokens:
+                yield sentence
+                continue
+            # A single sentence over budget: fall back to splitting it on words
+            words, piece = sentence.split(), []
+            for word in words:
+                if piece and self.count_tokens(" ".join(piece + [word])) > self.max_tokens:
+                    yield " ".join(piece)
+                    piece = []
+                piece.append(word)
+            if piece:
+                yield " ".join(piece)
+
+    def _overlap(self, sentences):
+        carried, tokens = [], 0
+        for sentence, sentence_tokens in reversed(sentences):
+            if tokens + sentence_tokens > self.overlap_tokens:
+                break
+            carried.insert(0, (sentence, sentence_tokens))
+            tokens += sentence_tokens
+        return carried
+
+
+CHUNKERS = {
+    "fixed": FixedSizeChunker,
+    "sentence": SentenceChunker,
+}
+
+
+def get_chunker(name: str = None, **options):
+    """
+    Build a chunker by name (default CHUNKER); options go to its constructor.
+    Sentence chunkers count tokens with the embedding model's tokenizer unless told otherwise.
+    """
+    name = name or CHUNKER
+    if name not in CHUNKERS:
+        raise ValueError(f"Unknown chunker '{name}', expected one of {sorted(CHUNKERS)}")
+    if name == "sentence" and "count_tokens" not in options:
+        from Services.embeddings import get_token_counter
+        options["count_tokens"] = get_token_counter()
+    return CHUNKERS[name](**options)
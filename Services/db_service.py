@@ -1,6 +1,14 @@
 import os
-import psycopg2
 import sys
+import time
+import asyncio
+import sqlite3
+import threading
+import weakref
+from contextlib import closing, contextmanager
+import psycopg2
+from psycopg2 import pool as pg_pool
+from psycopg2.extensions import connection as pg_connection
 from dotenv import load_dotenv
 from datetime import date
 
@@ -14,34 +22,384 @@ DB_CONFIG = {
     "port": os.getenv("DB_PORT")
 }
 
+# Connection pool settings
+DB_POOL_MIN = int(os.getenv("DB_POOL_MIN", "1"))
+DB_POOL_MAX = int(os.getenv("DB_POOL_MAX", "10"))
+# Pooled connections idle for longer than this are pinged before being handed out
+DB_HEALTHCHECK_INTERVAL = float(os.getenv("DB_HEALTHCHECK_INTERVAL", "30"))
+# Seconds to wait for a free pooled connection once all DB_POOL_MAX are borrowed
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "10"))
+
+# "postgres" (default) or "sqlite" to run against a local SQLite file with the same
+# holidays_table (employee_id INTEGER, holidays TEXT 'YYYY-MM-DD'), e.g. for tests
+DB_BACKEND = os.getenv("DB_BACKEND", "postgres")
+DB_SQLITE_PATH = os.getenv("DB_SQLITE_PATH", "holidays.sqlite3")
+
+# Statements PREPAREd once per pooled connection and then run with EXECUTE
+PREPARED_STATEMENTS = {
+    "holidays_by_employee": """
+        SELECT holidays FROM holidays_table
+        WHERE employee_id = $1 AND holidays >= $2
+        ORDER BY holidays ASC
+    """,
+}
+
+SQLITE_HOLIDAYS_QUERY = """
+    SELECT holidays FROM holidays_table
+    WHERE employee_id = ? AND holidays >= ?
+    ORDER BY holidays ASC
+"""
+
+# Holidays of many employees in one round trip
+TEAM_HOLIDAYS_QUERY = """
+    SELECT employee_id, holidays FROM holidays_table
+    WHERE employee_id = ANY(%(employee_ids)s) AND holidays BETWEEN %(start)s AND %(end)s
+    ORDER BY employee_id, holidays ASC
+"""
+
+# Dates every employee is free on (optionally only among the candidate dates), grouped into
+# runs of consecutive days ("gaps and islands": consecutive dates share day - row_number)
+COMMON_WINDOWS_QUERY = """
+    WITH free AS (
+        SELECT holidays AS day FROM holidays_table
+        WHERE employee_id = ANY(%(employee_ids)s) AND holidays BETWEEN %(start)s AND %(end)s
+          AND (%(candidates)s::date[] IS NULL OR holidays = ANY(%(candidates)s::date[]))
+        GROUP BY holidays
+        HAVING COUNT(DISTINCT employee_id) = %(employee_count)s
+    ), islands AS (
+        SELECT day, day - (ROW_NUMBER() OVER (ORDER BY day))::int AS island FROM free
+    )
+    SELECT MIN(day), MAX(day), COUNT(*), array_agg(day ORDER BY day)
+    FROM islands GROUP BY island ORDER BY MIN(day)
+"""
+
+
+class PooledConnection(pg_connection):
+    """psycopg2 connection that remembers its prepared statements and last health check"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Reads only, and PREPAREd statements live for the whole session anyway
+        self.autocommit = True
+        self.prepared = set()
+        self.last_checked = time.monotonic()
+
+
+_pool = None
+_pool_lock = threading.Lock()
+# ThreadedConnectionPool raises PoolError instead of waiting when it is exhausted, so borrowers
+# first take one of DB_POOL_MAX slots (waiting up to DB_POOL_TIMEOUT) and only then call getconn
+_pool_slots = threading.BoundedSemaphore(DB_POOL_MAX)
+
+
+def get_pool():
+    """
+    Returns the process-wide psycopg2 ThreadedConnectionPool, creating it on first use.
+    """
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = pg_pool.ThreadedConnectionPool(
+                    DB_POOL_MIN, DB_POOL_MAX, connection_factory=PooledConnection, **DB_CONFIG
+                )
+    return _pool
+
+
+def close_pool():
+    """
+    Closes every pooled connection (e.g. on server shutdown).
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.closeall()
+            _pool = None
+
+
+def _is_healthy(conn):
+    if conn.closed:
+        return False
+    if time.monotonic() - conn.last_checked < DB_HEALTHCHECK_INTERVAL:
+        return True
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT 1")
+        conn.last_checked = time.monotonic()
+        return True
+    except psycopg2.Error:
+        return False
+
+
+@contextmanager
+def get_connection():
+    """
+    Borrows a healthy connection from the pool and gives it back afterwards, waiting up to
+    DB_POOL_TIMEOUT seconds when every pooled connection is in use.
+    Connections that fail their health check or break while in use are discarded.
+    Raises psycopg2.pool.PoolError on timeout and psycopg2.OperationalError when no healthy
+    connection can be had.
+    """
+    if not _pool_slots.acquire(timeout=DB_POOL_TIMEOUT):
+        raise pg_pool.PoolError(f"no free database connection within {DB_POOL_TIMEOUT}s")
+    try:
+        pool = get_pool()
+        conn = _get_healthy_connection(pool)
+
+        broken = False
+        try:
+            yield conn
+        except (psycopg2.OperationalError, psycopg2.InterfaceError):
+            broken = True
+            raise
+        finally:
+            pool.putconn(conn, close=broken or bool(conn.closed))
+    finally:
+        _pool_slots.release()
+
+
+# Every pooled connection may have gone stale at once (e.g. after a database restart), so try
+# up to DB_POOL_MAX + 1 of them (the last one freshly opened) before giving up
+def _get_healthy_connection(pool):
+    for _ in range(DB_POOL_MAX + 1):
+        conn = pool.getconn()
+        if _is_healthy(conn):
+            return conn
+        pool.putconn(conn, close=True)
+    raise psycopg2.OperationalError("no healthy database connection available")
+
+
+def execute_prepared(conn, cursor, name, params):
+    """
+    Runs one of PREPARED_STATEMENTS, preparing it on this connection the first time.
+    """
+    if name not in conn.prepared:
+        cursor.execute(f"PREPARE {name} AS {PREPARED_STATEMENTS[name]}")
+        conn.prepared.add(name)
+    placeholders = ", ".join(["%s"] * len(params))
+    cursor.execute(f"EXECUTE {name} ({placeholders})", params)
+
+
+def _isoformat(value):
+    # Postgres returns datetime.date, the SQLite stand-in stores ISO strings already
+    return value.isoformat() if hasattr(value, "isoformat") else str(value)
+
+
 def get_holidays_dates(employee_id):
     """
     Returns upcoming holidays for the given employee_id from today's date onward.
     """
-    conn = None
-    cursor = None
     try:
-        conn = psycopg2.connect(**DB_CONFIG)
-        cursor = conn.cursor()
+        return query_holidays_dates(employee_id)
+
+    except Exception as e:
+        print("❌ Error in get_availability():", e, sys.exc_info())
+        return []
+
+
+def query_holidays_dates(employee_id):
+    """
+    Same as get_holidays_dates but raises on database errors instead of returning [],
+    for callers (like the holiday cache) that must not mistake an error for "no holidays".
+    """
+    if DB_BACKEND == "sqlite":
+        with closing(sqlite3.connect(DB_SQLITE_PATH)) as conn:
+            results = conn.execute(SQLITE_HOLIDAYS_QUERY, (employee_id, date.today().isoformat())).fetchall()
+        return [_isoformat(row[0]) for row in results]
+
+    with get_connection() as conn:
+        with conn.cursor() as cursor:
+            execute_prepared(conn, cursor, "holidays_by_employee", (employee_id, date.today()))
+            results = cursor.fetchall()
+
+    return [_isoformat(row[0]) for row in results]
+
+
+def _date_range(date_range):
+    # Default: from today on
+    start, end = date_range if date_range else (None, None)
+    return _isoformat(start or date.today()), _isoformat(end or date.max)
+
+
+def get_holidays_for_employees(employee_ids, date_range=None):
+    """
+    Returns holidays for several employees in one query, as {employee_id: [dates]}.
+    date_range is an optional inclusive (start, end) pair of dates / ISO strings,
+    either end may be None; by default every holiday from today onward is returned.
+    """
+    employee_ids = list(dict.fromkeys(employee_ids))
+    holidays = {employee_id: [] for employee_id in employee_ids}
+    if not employee_ids:
+        return holidays
+    start, end = _date_range(date_range)
+
+    try:
+        if DB_BACKEND == "sqlite":
+            ids = ", ".join(["?"] * len(employee_ids))
+            with closing(sqlite3.connect(DB_SQLITE_PATH)) as conn:
+                results = conn.execute(f"""
+                    SELECT employee_id, holidays FROM holidays_table
+                    WHERE employee_id IN ({ids}) AND holidays BETWEEN ? AND ?
+                    ORDER BY employee_id, holidays ASC
+                """, (*employee_ids, start, end)).fetchall()
+        else:
+            with get_connection() as conn:
+                with conn.cursor() as cursor:
+                    cursor.execute(TEAM_HOLIDAYS_QUERY, {"employee_ids": employee_ids, "start": start, "end": end})
+                    results = cursor.fetchall()
+
+        for employee_id, holiday in results:
+            holidays[employee_id].append(_isoformat(holiday))
+        return holidays
+
+    except Exception as e:
+        print("❌ Error in get_holidays_for_employees():", e, sys.exc_info())
+        return holidays
+
+
+def get_common_available_dates(employee_ids, candidate_dates=None, min_window=1, date_range=None):
+    """
+    Computes in SQL the dates on which all the given employees are free, optionally only
+    among candidate_dates (e.g. the dates with the right weather), and groups them into
+    runs of consecutive days. Only the answer is transferred, not every holiday row.
+
+    Returns:
+        {
+            "dates": ['2025-08-18', '2025-08-19', '2025-08-23'],
+            "windows": [{"start": '2025-08-18', "end": '2025-08-19', "days": 2}]
+        }
+        where windows only lists runs of at least min_window days.
+    """
+    employee_ids = list(dict.fromkeys(employee_ids))
+    if not employee_ids:
+        return {"dates": [], "windows": []}
+    start, end = _date_range(date_range)
+    candidates = [_isoformat(d) for d in candidate_dates] if candidate_dates is not None else None
+
+    try:
+        if DB_BACKEND == "sqlite":
+            results = _get_common_windows_sqlite(employee_ids, candidates, start, end)
+        else:
+            with get_connection() as conn:
+                with conn.cursor() as cursor:
+                    cursor.execute(COMMON_WINDOWS_QUERY, {
+                        "employee_ids": employee_ids,
+                        "employee_count": len(employee_ids),
+                        "candidates": candidates,
+                        "start": start,
+                        "end": end,
+                    })
+                    results = cursor.fetchall()
 
-        today = date.today()
+        dates = []
+        windows = []
+        for first, last, days, island in results:
+            dates.extend(_isoformat(d) for d in island)
+            if days >= min_window:
+                windows.append({"start": _isoformat(first), "end": _isoformat(last), "days": days})
+        return {"dates": dates, "windows": windows}
 
-        query = """
-            SELECT holidays FROM holidays_table
-            WHERE employee_id = %s AND holidays >= %s
-            ORDER BY holidays ASC
-        """
-        cursor.execute(query, (employee_id, today))
-        results = cursor.fetchall()
+    except Exception as e:
+        print("❌ Error in get_common_available_dates():", e, sys.exc_info())
+        return {"dates": [], "windows": []}
+
+
+def _get_common_windows_sqlite(employee_ids, candidates, start, end):
+    # Same query as COMMON_WINDOWS_QUERY for the SQLite stand-in (dates stored as ISO text)
+    params = [*employee_ids, start, end]
+    candidate_filter = ""
+    if candidates is not None:
+        candidate_filter = f"AND holidays IN ({', '.join(['?'] * len(candidates))})"
+        params.extend(candidates)
+    params.append(len(employee_ids))
+
+    with closing(sqlite3.connect(DB_SQLITE_PATH)) as conn:
+        results = conn.execute(f"""
+            WITH free AS (
+                SELECT holidays AS day FROM holidays_table
+                WHERE employee_id IN ({', '.join(['?'] * len(employee_ids))}) AND holidays BETWEEN ? AND ?
+                  {candidate_filter}
+                GROUP BY holidays
+                HAVING COUNT(DISTINCT employee_id) = ?
+            ), islands AS (
+                SELECT day, julianday(day) - ROW_NUMBER() OVER (ORDER BY day) AS island FROM free
+            )
+            SELECT MIN(day), MAX(day), COUNT(*), group_concat(day)
+            FROM islands GROUP BY island ORDER BY MIN(day)
+        """, params).fetchall()
+    return [(first, last, days, sorted(island.split(","))) for first, last, days, island in results]
+
+
+# asyncpg pools are bound to the event loop that created them, so keep one per loop
+_async_pools = weakref.WeakKeyDictionary()
+_asyncpg = None
+_asyncpg_checked = False
 
-        return [row[0].isoformat() for row in results]
+
+# asyncpg is optional: without it the async queries run the psycopg2 pool's queries in a
+# worker thread instead (same results, one blocked thread per query). Checked once.
+def _get_asyncpg():
+    global _asyncpg, _asyncpg_checked
+    if not _asyncpg_checked:
+        try:
+            import asyncpg
+            _asyncpg = asyncpg
+        except ImportError as e:
+            print("⚠️ asyncpg not installed, async holiday queries use the psycopg2 pool in a worker thread:", e)
+        _asyncpg_checked = True
+    return _asyncpg
+
+
+async def get_async_pool():
+    """
+    Returns the asyncpg pool for the running event loop, creating it on first use.
+    asyncpg prepares and caches statements per connection on its own.
+    Raises ImportError when asyncpg is not installed.
+    """
+    asyncpg = _get_asyncpg()
+    if asyncpg is None:
+        raise ImportError("asyncpg is not installed")
+
+    loop = asyncio.get_running_loop()
+    pool = _async_pools.get(loop)
+    if pool is None:
+        pool = asyncio.ensure_future(asyncpg.create_pool(
+            database=DB_CONFIG["dbname"],
+            user=DB_CONFIG["user"],
+            password=DB_CONFIG["password"],
+            host=DB_CONFIG["host"],
+            port=int(DB_CONFIG["port"]) if DB_CONFIG["port"] else None,
+            min_size=DB_POOL_MIN,
+            max_size=DB_POOL_MAX,
+        ))
+        _async_pools[loop] = pool
+    try:
+        return await pool
+    except Exception:
+        # Don't keep a failed pool around, retry on the next call
+        _async_pools.pop(loop, None)
+        raise
+
+
+async def get_holidays_dates_async(employee_id):
+    """
+    Async variant of get_holidays_dates, for use from an asyncio pipeline.
+    """
+    try:
+        return await query_holidays_dates_async(employee_id)
 
     except Exception as e:
         print("❌ Error in get_availability():", e, sys.exc_info())
         return []
 
-    finally:
-        if cursor is not None:
-            cursor.close()
-        if conn is not None:
-            conn.close()
+
+async def query_holidays_dates_async(employee_id):
+    """
+    Async variant of query_holidays_dates (raises on database errors).
+    """
+    if DB_BACKEND == "sqlite" or _get_asyncpg() is None:
+        return await asyncio.to_thread(query_holidays_dates, employee_id)
+
+    pool = await get_async_pool()
+    rows = await pool.fetch(PREPARED_STATEMENTS["holidays_by_employee"], employee_id, date.today())
+    return [_isoformat(row[0]) for row in rows]
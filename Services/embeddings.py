@@ -0,0 +1,156 @@
+import os
+import threading
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Sentence embedding model shared by the preference index and anything else embedding text
+EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "all-MiniLM-L6-v2")
+# "local": load the model in this process; "remote": call the embedding server (embedding_server.py),
+# so one model instance serves every worker process on the host
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "local").lower()
+# http://host:port, or unix:///path/to/socket
+EMBEDDING_SERVER_URL = os.getenv("EMBEDDING_SERVER_URL", "http://127.0.0.1:8100")
+EMBEDDING_SERVER_TIMEOUT = float(os.getenv("EMBEDDING_SERVER_TIMEOUT", "30"))
+# How a local model runs: "sentence_transformers" (PyTorch) or "onnx" (ONNX Runtime, int8 by
+# default, see Services/onnx_embeddings.py). Applies to the embedding server too.
+EMBEDDING_RUNTIME = os.getenv("EMBEDDING_RUNTIME", "sentence_transformers").lower()
+
+_embedding_function = None
+_remote_embedding_function = None
+_embedding_lock = threading.Lock()
+# Set by use_batched_embeddings(): concurrent embedding calls share one model forward pass
+_batcher = None
+
+
+# Returns the process-wide embedding function (texts -> vectors) of the configured backend
+def get_embedding_function():
+    if _batcher is not None:
+        return _embed_batched
+    return _get_backend_embedding_function()
+
+
+def _get_backend_embedding_function():
+    if EMBEDDING_BACKEND == "remote":
+        return get_remote_embedding_function()
+    return get_local_embedding_function()
+
+
+# Returns the in-process embedding function, loading the model on first use
+# (loading SentenceTransformer takes seconds, so nothing is loaded at import time)
+def get_local_embedding_function():
+    global _embedding_function
+    if _embedding_function is None:
+        with _embedding_lock:
+            if _embedding_function is None:
+                if EMBEDDING_RUNTIME == "onnx":
+                    from Services.onnx_embeddings import OnnxEmbeddingFunction
+                    _embedding_function = OnnxEmbeddingFunction()
+                else:
+                    from chromadb.utils import embedding_functions
+                    _embedding_function = embedding_functions.SentenceTransformerEmbeddingFunction(model_name=EMBEDDING_MODEL)
+    return _embedding_function
+
+
+def get_remote_embedding_function():
+    global _remote_embedding_function
+    if _remote_embedding_function is None:
+        with _embedding_lock:
+            if _remote_embedding_function is None:
+                _remote_embedding_function = RemoteEmbeddingFunction(EMBEDDING_SERVER_URL)
+    return _remote_embedding_function
+
+
+class RemoteEmbeddingFunction:
+    """
+    Embedding function backed by the embedding server (embedding_server.py).
+
+    Follows Chroma's EmbeddingFunction interface (called with input=list of texts, returns one
+    vector per text), so it can be used wherever SentenceTransformerEmbeddingFunction is.
+    Requests go over one pooled connection, which is safe to share between threads.
+
+    Args:
+        url (str): Server address, http://host:port or unix:///path/to/socket
+        timeout (float): Seconds to wait for a response
+        transport (httpx.BaseTransport): Custom transport (e.g. for tests)
+    """
+
+    def __init__(self, url: str = EMBEDDING_SERVER_URL, timeout: float = EMBEDDING_SERVER_TIMEOUT, transport=None):
+        import httpx
+        self.url = url
+        if transport is None and url.startswith("unix://"):
+            transport = httpx.HTTPTransport(uds=url[len("unix://"):])
+            url = "http://embedding-server"
+        self._client = httpx.Client(base_url=url, timeout=timeout, transport=transport)
+
+    def __call__(self, input):
+        texts = list(input)
+        if not texts:
+            return []
+        response = self._client.post("/embed", json={"texts": texts})
+        response.raise_for_status()
+        return response.json()["embeddings"]
+
+    @staticmethod
+    def name():
+        return "trip_planner_embedding_server"
+
+    def get_config(self):
+        return {"url": self.url}
+
+    @staticmethod
+    def build_from_config(config):
+        return RemoteEmbeddingFunction(config["url"])
+
+    def close(self):
+        self._client.close()
+
+
+# Makes get_embedding_function() coalesce calls made concurrently from different threads
+# (e.g. server requests) into one batch, at the cost of up to max_wait_ms latency per call.
+def use_batched_embeddings(max_batch_size=64, max_wait_ms=5.0):
+    global _batcher
+    from Services.batching import ThreadedMicroBatcher
+    _batcher = ThreadedMicroBatcher(_embed_batch, max_batch_size=max_batch_size, max_wait_ms=max_wait_ms)
+    return _batcher
+
+
+def _embed_batched(texts):
+    return _batcher.submit(list(texts))
+
+
+def _embed_batch(items):
+    return embed_batch(_get_backend_embedding_function(), items)
+
+
+# Each item is one caller's list of texts: embed them all in one call and split the vectors back
+def embed_batch(embed, items):
+    texts = [text for item in items for text in item]
+    vectors = list(embed(texts)) if texts else []
+    results, offset = [], 0
+    for item in items:
+        results.append(vectors[offset:offset + len(item)])
+        offset += len(item)
+    return results
+
+
+_token_counter = None
+
+
+# Returns a function counting the embedding model's word-piece tokens in a text, used for chunk
+# budgets. Falls back to Services.chunking.estimate_tokens when the tokenizer can't be loaded
+# (e.g. offline with nothing cached).
+def get_token_counter():
+    global _token_counter
+    if _token_counter is None:
+        with _embedding_lock:
+            if _token_counter is None:
+                try:
+                    from transformers import AutoTokenizer
+                    tokenizer = AutoTokenizer.from_pretrained(f"sentence-transformers/{EMBEDDING_MODEL}")
+                    _token_counter = lambda text: len(tokenizer.tokenize(text))
+                except Exception as e:
+                    from Services.chunking import estimate_tokens
+                    print("⚠️ Embedding tokenizer unavailable, estimating chunk tokens:", e)
+                    _token_counter = estimate_tokens
+    return _token_counter
@@ -0,0 +1,153 @@
+from datetime import date, datetime, timedelta
+from typing import Dict, List
+import numpy as np
+
+# Daily roll-up of the OpenWeatherMap 5 day / 3 hour forecast ("list" entries of /forecast).
+# All functions return the same records; aggregate_daily_columnar is the one WeatherService
+# uses, aggregate_daily_columnar_batch amortizes the NumPy overhead over many forecasts, and
+# aggregate_daily_loop is the original per-slot Python loop, kept for reference and
+# benchmark_forecast_aggregation.py.
+
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+
+def aggregate_daily_loop(items: List[Dict]) -> List[Dict]:
+    """Group forecast slots by local date with plain Python dicts"""
+    forecasts = []
+
+    # Group forecasts by day (OpenWeatherMap provides 3-hour forecasts)
+    daily_forecasts = {}
+
+    for item in items:
+        day = datetime.fromtimestamp(item["dt"]).strftime("%Y-%m-%d")
+        if day not in daily_forecasts:
+            daily_forecasts[day] = []
+        daily_forecasts[day].append(item)
+
+    # Process each day's forecasts
+    for day, hourly_forecasts in daily_forecasts.items():
+        # Get the most common weather condition for the day
+        conditions = [f["weather"][0]["main"].lower() for f in hourly_forecasts]
+        condition_counts = {}
+        for condition in conditions:
+            condition_counts[condition] = condition_counts.get(condition, 0) + 1
+
+        # Get the dominant condition, and its condition code from the first slot that had it
+        dominant_condition = max(condition_counts.items(), key=lambda x: x[1])[0]
+        condition_id = next(f["weather"][0].get("id") for f in hourly_forecasts
+                            if f["weather"][0]["main"].lower() == dominant_condition)
+
+        # Get average / min / max temperature
+        temps = [f["main"]["temp"] for f in hourly_forecasts]
+        avg_temp = sum(temps) / len(temps)
+
+        forecasts.append({
+            "date": day,
+            "condition": dominant_condition,
+            "condition_id": condition_id,
+            "description": hourly_forecasts[0]["weather"][0]["description"],
+            "temperature": round(avg_temp, 1),
+            "temp_min": round(min(temps), 1),
+            "temp_max": round(max(temps), 1),
+            "humidity": hourly_forecasts[0]["main"]["humidity"]
+        })
+
+    return forecasts
+
+
+def _local_days(timestamps: np.ndarray) -> np.ndarray:
+    """Local calendar day (days since 1970-01-01) of each unix timestamp"""
+    lo, hi = int(timestamps.min()), int(timestamps.max())
+    first = datetime.fromtimestamp(lo).astimezone().utcoffset()
+    last = datetime.fromtimestamp(hi).astimezone().utcoffset()
+    if first == last:
+        # Same UTC offset across the whole window: one vectorized shift + floor division
+        return (timestamps + int(first.total_seconds())) // 86400
+    # A DST change falls inside the window, resolve each slot on its own
+    return np.array([datetime.fromtimestamp(int(t)).date().toordinal() - _EPOCH_ORDINAL for t in timestamps])
+
+
+def aggregate_daily_columnar(items: List[Dict]) -> List[Dict]:
+    """Group one forecast's slots by local date with NumPy"""
+    return aggregate_daily_columnar_batch([items])[0]
+
+
+def aggregate_daily_columnar_batch(forecasts: List[List[Dict]]) -> List[List[Dict]]:
+    """
+    Group the slots of many forecasts (e.g. one per city) by local date in one NumPy pass
+
+    The slots are pulled into flat arrays once and every per-day statistic (slot count,
+    mean / min / max temperature, condition counts) is computed with grouped reductions
+    over (forecast, day) groups instead of per-day Python loops. Ties for the dominant
+    condition go to the condition seen first that day, same as aggregate_daily_loop.
+
+    Returns:
+        List[List[Dict]]: Daily records for each forecast, in the order given
+    """
+    items = [item for forecast in forecasts for item in forecast]
+    if not items:
+        return [[] for _ in forecasts]
+
+    n = len(items)
+    owner = np.repeat(np.arange(len(forecasts), dtype=np.int64), [len(f) for f in forecasts])
+    timestamps = np.fromiter((item["dt"] for item in items), dtype=np.int64, count=n)
+    temps = np.fromiter((item["main"]["temp"] for item in items), dtype=np.float64, count=n)
+    codes = {}
+    condition_codes = np.fromiter(
+        (codes.setdefault(item["weather"][0]["main"].lower(), len(codes)) for item in items),
+        dtype=np.int64, count=n
+    )
+    condition_names = list(codes)
+
+    # Group index of every slot, one group per (forecast, day), numbered in order of first appearance
+    days = _local_days(timestamps)
+    _, first_index, group_idx = np.unique(owner * 1_000_000 + days, return_index=True, return_inverse=True)
+    order = np.argsort(first_index, kind="stable")
+    rank = np.empty_like(order)
+    rank[order] = np.arange(len(order))
+    group_idx = rank[group_idx.reshape(-1)]
+    first_index = first_index[order]
+    n_groups = len(first_index)
+
+    counts = np.bincount(group_idx, minlength=n_groups)
+    means = np.bincount(group_idx, weights=temps, minlength=n_groups) / counts
+    temp_min = np.full(n_groups, np.inf)
+    temp_max = np.full(n_groups, -np.inf)
+    np.minimum.at(temp_min, group_idx, temps)
+    np.maximum.at(temp_max, group_idx, temps)
+
+    # Per (group, condition) slot counts; break ties on the first slot the condition appeared in
+    n_conditions = len(condition_names)
+    cell = group_idx * n_conditions + condition_codes
+    condition_counts = np.bincount(cell, minlength=n_groups * n_conditions)
+    first_seen = np.full(n_groups * n_conditions, n, dtype=np.int64)
+    np.minimum.at(first_seen, cell, np.arange(n))
+    score = (condition_counts * (n + 1) - first_seen).reshape(n_groups, n_conditions)
+    dominant = np.argmax(score, axis=1)
+    dominant_first = first_seen.reshape(n_groups, n_conditions)[np.arange(n_groups), dominant]
+
+    group_days = days[first_index]
+    group_owner = owner[first_index]
+    means = [round(t, 1) for t in means.tolist()]
+    temp_min = [round(t, 1) for t in temp_min.tolist()]
+    temp_max = [round(t, 1) for t in temp_max.tolist()]
+    date_names = {}
+
+    results = [[] for _ in forecasts]
+    for g in range(n_groups):
+        first = items[first_index[g]]
+        day = int(group_days[g])
+        if day not in date_names:
+            date_names[day] = (date(1970, 1, 1) + timedelta(days=day)).strftime("%Y-%m-%d")
+        results[group_owner[g]].append({
+            "date": date_names[day],
+            "condition": condition_names[dominant[g]],
+            "condition_id": items[dominant_first[g]]["weather"][0].get("id"),
+            "description": first["weather"][0]["description"],
+            "temperature": means[g],
+            "temp_min": temp_min[g],
+            "temp_max": temp_max[g],
+            "humidity": first["main"]["humidity"]
+        })
+
+    return results
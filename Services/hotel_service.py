@@ -5,54 +5,329 @@
 
 import os
 import json
+import hashlib
+import threading
 from dotenv import load_dotenv
-import chromadb
-from chromadb.utils import embedding_functions
-import google.generativeai as genai
+from Services.chunking import get_chunker
+from Services.embeddings import get_embedding_function
+from Services.retrieval_cache import RetrievalCache
+from Services.vector_index import VECTOR_INDEX_ENABLED, VectorIndex
+from Services.lexical_index import get_lexical_index, reciprocal_rank_fusion
+from Services.llm_cache import get_llm_cache, llm_cache_key
+from Services.llm_client import clean_response_text, generate, generate_async, get_model
 
 # Load environment variables
 load_dotenv()
 GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
-genai.configure(api_key=GOOGLE_API_KEY)
+
+CHROMA_PATH = "chroma_persistent_storage"
+COLLECTION_NAME = "hotel_pref_collection"
 
 # Gemini model setup
-generation_config = genai.GenerationConfig(
-    temperature=0.4,
-    max_output_tokens=800,
-    top_p=1,
-    top_k=1
-)
-gemini_model = genai.GenerativeModel("gemini-1.5-flash", generation_config=generation_config)
-
-# ChromaDB setup
-chroma_client = chromadb.PersistentClient(path="chroma_persistent_storage")
-collection = chroma_client.get_or_create_collection(
-    name="hotel_pref_collection",
-    embedding_function=embedding_functions.SentenceTransformerEmbeddingFunction(model_name="all-MiniLM-L6-v2")
-)
+GEMINI_MODEL_NAME = "gemini-1.5-flash"
+GENERATION_CONFIG = {
+    "temperature": 0.4,
+    "max_output_tokens": 800,
+    "top_p": 1,
+    "top_k": 1
+}
+
+# Gemini, ChromaDB and the embedding model are created on first use rather than at import,
+# so scripts that never reach the RAG step (e.g. non-trip prompts) don't pay for them.
+# Servers can call warmup() at startup instead.
+_chroma_client = None
+_collection = None
+_chunker = None
+_lock = threading.Lock()
+
+# Query embeddings and retrieve_context results, invalidated by every write of the indexer
+retrieval_cache = RetrievalCache()
+# Per-user exact search for small preference sets, kept in sync by the indexer (VECTOR_INDEX_ENABLED);
+# ChromaDB serves users it doesn't hold
+vector_index = VectorIndex() if VECTOR_INDEX_ENABLED else None
+
+
+# The model instance is shared through Services/llm_client.py
+def get_gemini_model():
+    return get_model(GEMINI_MODEL_NAME, GENERATION_CONFIG)
+
+
+def get_chroma_client():
+    global _chroma_client
+    if _chroma_client is None:
+        with _lock:
+            if _chroma_client is None:
+                import chromadb
+                _chroma_client = chromadb.PersistentClient(path=CHROMA_PATH)
+    return _chroma_client
+
+
+def get_collection():
+    global _collection
+    if _collection is None:
+        client = get_chroma_client()
+        with _lock:
+            if _collection is None:
+                # Documents and queries are always embedded here (get_embedding_function) and passed
+                # as vectors, so Chroma gets no embedding function: opening the collection loads no
+                # model, and switching EMBEDDING_BACKEND doesn't conflict with the stored config
+                _collection = client.get_or_create_collection(
+                    name=COLLECTION_NAME,
+                    embedding_function=None
+                )
+    return _collection
+
+
+# Chunker for preference text (see Services/chunking.py, picked with the CHUNKER env var)
+def get_preference_chunker():
+    global _chunker
+    if _chunker is None:
+        with _lock:
+            if _chunker is None:
+                _chunker = get_chunker()
+    return _chunker
+
+
+# Builds every lazily created resource up front (for long-running servers)
+def warmup():
+    get_gemini_model()
+    get_collection()
+    get_embedding_function()(["hotel preferences"])
+
+# Chunks indexed without a user_id (e.g. the bundled hotel_preferences.txt) belong to this user
+DEFAULT_USER_ID = "default"
+# Users per batch in bulk_index_preferences (one lookup + one embedding batch + one upsert each)
+BULK_INDEX_BATCH_SIZE = int(os.getenv("BULK_INDEX_BATCH_SIZE", "256"))
+# Chunks embedded and upserted per call while indexing, bounding memory on large files
+EMBED_BATCH_SIZE = int(os.getenv("EMBED_BATCH_SIZE", "512"))
+
+# "vector": the 3 nearest chunks. "hybrid": nearest chunks fused with BM25 matches of the terms
+# of the user's trip request (Services/lexical_index.py, maintained by the indexer in this
+# mode), see retrieve_context
+RETRIEVAL_MODE = os.getenv("RETRIEVAL_MODE", "vector").lower()
+# Nearest chunks fused in hybrid mode, chunks it may return, and the share of the best fused
+# score a chunk needs to be returned. A chunk both searches rank scores about twice one only
+# one search found, so at 0.5 the latter is only kept when it ranks above the chunks both found.
+HYBRID_CANDIDATES = int(os.getenv("HYBRID_CANDIDATES", "10"))
+HYBRID_MAX_CHUNKS = int(os.getenv("HYBRID_MAX_CHUNKS", "3"))
+HYBRID_MIN_SCORE_RATIO = float(os.getenv("HYBRID_MIN_SCORE_RATIO", "0.5"))
+# The query generate_hotel_preferences' context is retrieved with
+HOTEL_PREFERENCES_QUERY = "hotel preferences"
+
+# Split preference text into chunks for embedding
+def chunk_text(text):
+    return get_preference_chunker().chunk(text)
 
 # Load and chunk hotel preference text
-def load_and_index_preferences(filename="hotel_preferences.txt"):
+# The file is streamed line by line into the chunker, so it is never held in memory whole.
+def load_and_index_preferences(filename="hotel_preferences.txt", user_id=None):
     with open(filename, "r", encoding="utf-8") as f:
-        text = f.read()
+        chunks = get_preference_chunker().iter_chunks(f)
+        if user_id is None:
+            return index_chunks(filename, chunks)
+        return index_chunks(f"{filename}#{user_id}", chunks, id_prefix=f"user_{user_id}_chunk", user_id=user_id)
+
+# Incrementally sync the chunks of one source file into ChromaDB
+# Every chunk is stored with a hash of its text, so re-indexing an unchanged file is a single
+# metadata lookup: only new or changed chunks are embedded (in one batch) and upserted (in one
+# call), and chunk IDs left over from a longer previous version are deleted.
+# Returns: {"upserted": 1, "unchanged": 3, "deleted": 0}
+def index_chunks(source, chunks, id_prefix="pref_chunk", user_id=None):
+    counts = _sync_sources([{"source": source, "chunks": chunks, "id_prefix": id_prefix, "user_id": user_id}])
+    print(f"Indexed {counts['upserted'] + counts['unchanged']} chunks from {source} "
+          f"({counts['upserted']} embedded, {counts['unchanged']} unchanged, {counts['deleted']} removed)")
+    return counts
+
+# Index preference documents for many users
+# path is either a directory of <user_id>.txt files or a JSONL file of {"user_id": ..., "text": ...}
+# lines. Documents are streamed and synced BULK_INDEX_BATCH_SIZE users at a time, so memory stays
+# flat and each batch costs one metadata lookup, one embedding batch and one upsert.
+# Returns: {"users": 1000, "upserted": 3950, "unchanged": 50, "deleted": 0}
+def bulk_index_preferences(path, batch_size=BULK_INDEX_BATCH_SIZE):
+    totals = {"users": 0, "upserted": 0, "unchanged": 0, "deleted": 0}
+    batch = []
+
+    for user_id, source, text in _iter_preference_documents(path):
+        batch.append({"source": source, "chunks": chunk_text(text),
+                      "id_prefix": f"user_{user_id}_chunk", "user_id": user_id})
+        if len(batch) >= batch_size:
+            _add_counts(totals, _sync_sources(batch), len(batch))
+            batch = []
+    if batch:
+        _add_counts(totals, _sync_sources(batch), len(batch))
 
-    chunks = [text[i:i+500] for i in range(0, len(text), 480)]
-    for i, chunk in enumerate(chunks):
-        collection.upsert(
-            ids=[f"pref_chunk_{i+1}"],
-            documents=[chunk]
-        )
-    print(f"Indexed {len(chunks)} chunks from {filename}")
+    print(f"Indexed preferences of {totals['users']} users from {path} "
+          f"({totals['upserted']} embedded, {totals['unchanged']} unchanged, {totals['deleted']} removed)")
+    return totals
+
+def _iter_preference_documents(path):
+    if os.path.isdir(path):
+        for name in sorted(os.listdir(path)):
+            if name.endswith(".txt"):
+                filename = os.path.join(path, name)
+                with open(filename, "r", encoding="utf-8") as f:
+                    yield name[:-len(".txt")], filename, f.read()
+    else:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    record = json.loads(line)
+                    yield str(record["user_id"]), f"{path}#{record['user_id']}", record["text"]
+
+def _add_counts(totals, counts, users):
+    totals["users"] += users
+    for key in ("upserted", "unchanged", "deleted"):
+        totals[key] += counts[key]
+
+# Sync a batch of sources ({"source", "chunks", "id_prefix", "user_id"}) into ChromaDB
+# chunks can be any iterable (e.g. a generator over a file); changed chunks are embedded and
+# upserted EMBED_BATCH_SIZE at a time as they come.
+def _sync_sources(entries):
+    collection = get_collection()
+    sources = [entry["source"] for entry in entries]
+    where = {"source": sources[0]} if len(sources) == 1 else {"source": {"$in": sources}}
+    existing = collection.get(where=where, include=["metadatas"])
+    # Chunks indexed before user tagging have no user_id and get re-tagged
+    stored = {id_: ((metadata or {}).get("hash"), (metadata or {}).get("user_id"))
+              for id_, metadata in zip(existing["ids"], existing["metadatas"])}
+
+    ids, documents, metadatas = [], [], []
+    current_ids = set()
+    changed_users = set()
+    unchanged = upserted = 0
+    for entry in entries:
+        user_id = _entry_user_id(entry)
+        if vector_index is not None and not vector_index.has(user_id):
+            changed_users.add(user_id)
+        for i, chunk in enumerate(entry["chunks"]):
+            id_ = f"{entry['id_prefix']}_{i+1}"
+            chunk_hash = hashlib.sha256(chunk.encode("utf-8")).hexdigest()
+            current_ids.add(id_)
+            if stored.get(id_) == (chunk_hash, user_id):
+                unchanged += 1
+                continue
+            changed_users.add(user_id)
+            ids.append(id_)
+            documents.append(chunk)
+            metadatas.append({"source": entry["source"], "user_id": user_id, "hash": chunk_hash, "chunk": i + 1})
+            if len(ids) >= EMBED_BATCH_SIZE:
+                upserted += _upsert_chunks(collection, ids, documents, metadatas)
+                ids, documents, metadatas = [], [], []
+
+    stale = [id_ for id_ in stored if id_ not in current_ids]
+    if stale:
+        collection.delete(ids=stale)
+        if RETRIEVAL_MODE == "hybrid":
+            get_lexical_index().delete(stale)
+        retrieval_cache.invalidate()
+        changed_users.update(stored[id_][1] or DEFAULT_USER_ID for id_ in stale)
+    if ids:
+        upserted += _upsert_chunks(collection, ids, documents, metadatas)
+    if RETRIEVAL_MODE == "hybrid":
+        _backfill_lexical_index(collection, {_entry_user_id(entry) for entry in entries})
+    if vector_index is not None and changed_users:
+        _update_vector_index(collection, changed_users)
+    return {"upserted": upserted, "unchanged": unchanged, "deleted": len(stale)}
+
+def _entry_user_id(entry):
+    return str(entry["user_id"]) if entry["user_id"] is not None else DEFAULT_USER_ID
+
+def _upsert_chunks(collection, ids, documents, metadatas):
+    collection.upsert(
+        ids=ids,
+        documents=documents,
+        embeddings=get_embedding_function()(documents),
+        metadatas=metadatas
+    )
+    if RETRIEVAL_MODE == "hybrid":
+        get_lexical_index().upsert(ids, documents, [metadata["user_id"] for metadata in metadatas])
+    retrieval_cache.invalidate()
+    return len(ids)
+
+# Chunks indexed before hybrid mode was turned on are copied from ChromaDB into the BM25 index
+def _backfill_lexical_index(collection, user_ids):
+    missing = sorted(get_lexical_index().missing_users(user_ids))
+    if not missing:
+        return
+    where = {"user_id": missing[0]} if len(missing) == 1 else {"user_id": {"$in": missing}}
+    stored = collection.get(where=where, include=["documents", "metadatas"])
+    if stored["ids"]:
+        get_lexical_index().upsert(stored["ids"], stored["documents"],
+                                   [metadata["user_id"] for metadata in stored["metadatas"]])
+        retrieval_cache.invalidate()
+
+# Rewrite the vector index files of the given users from what ChromaDB now holds for them
+def _update_vector_index(collection, user_ids):
+    user_ids = sorted(user_ids)
+    where = {"user_id": user_ids[0]} if len(user_ids) == 1 else {"user_id": {"$in": user_ids}}
+    stored = collection.get(where=where, include=["embeddings", "documents", "metadatas"])
+    rows = {user_id: [] for user_id in user_ids}
+    for embedding, document, metadata in zip(stored["embeddings"], stored["documents"], stored["metadatas"]):
+        rows[metadata["user_id"]].append(((metadata["source"], metadata.get("chunk", 0)), embedding, document))
+    for user_id, user_rows in rows.items():
+        user_rows.sort(key=lambda row: row[0])
+        vector_index.write(user_id, [row[1] for row in user_rows], [row[2] for row in user_rows])
+    retrieval_cache.invalidate()
 
 # Query ChromaDB
-def retrieve_context(query="hotel preferences"):
-    results = collection.query(query_texts=[query], n_results=3)
-    chunks = [doc for sublist in results["documents"] for doc in sublist]
-    return "\n".join(chunks)
+# Only the given user's chunks are searched (a metadata filter), so the cost of a query
+# doesn't grow with the number of users in the collection.
+# Repeated queries (e.g. the default "hotel preferences") skip the embedding model and the
+# search: both the query embedding and the result are cached until the indexer next writes.
+# With the vector index enabled, users it holds are searched there without opening ChromaDB.
+# In hybrid mode the HYBRID_CANDIDATES nearest chunks are fused (reciprocal rank fusion) with
+# the user's BM25 matches for constraints, the terms of the trip request (see
+# hotel_constraints), or for the query when there are none. Chunks within HYBRID_MIN_SCORE_RATIO
+# of the best fused score are kept, at most HYBRID_MAX_CHUNKS: once a chunk names what the
+# request asks for, chunks only the vector search found are dropped.
+def retrieve_context(query=HOTEL_PREFERENCES_QUERY, user_id=None, constraints=None):
+    where = {"user_id": str(user_id) if user_id is not None else DEFAULT_USER_ID}
+    collection_name = _collection.name if _collection is not None else COLLECTION_NAME
+    # Constraints only change the result (and so the cache key) in hybrid mode
+    lexical_query = (constraints or query) if RETRIEVAL_MODE == "hybrid" else query
+    key = retrieval_cache.key(collection_name, query if lexical_query == query else f"{query}\n{lexical_query}", where)
+    hit, context = retrieval_cache.get(key)
+    if hit:
+        return context
 
-# Generate structured hotel preference JSON
-def generate_hotel_preferences(context):
-    prompt = f"""
+    n_results = HYBRID_CANDIDATES if RETRIEVAL_MODE == "hybrid" else 3
+    query_embedding = retrieval_cache.embed_query(query, get_embedding_function())
+    chunks = vector_index.search(where["user_id"], query_embedding, k=n_results) if vector_index is not None else None
+    if chunks is None:
+        results = get_collection().query(query_embeddings=[query_embedding], n_results=n_results, where=where)
+        chunks = [doc for sublist in results["documents"] for doc in sublist]
+    if RETRIEVAL_MODE == "hybrid":
+        chunks = _fuse_with_lexical_matches(lexical_query, where["user_id"], chunks)
+    context = "\n".join(chunks)
+    retrieval_cache.set(key, context)
+    return context
+
+def _fuse_with_lexical_matches(lexical_query, user_id, chunks):
+    matches = [text for text, _ in get_lexical_index().search(lexical_query, user_id, k=HYBRID_CANDIDATES)]
+    if not matches:
+        # Nothing to fuse with: same result as vector mode
+        return chunks[:3]
+    return reciprocal_rank_fusion([chunks, matches], HYBRID_MAX_CHUNKS, HYBRID_MIN_SCORE_RATIO)
+
+# Trip intent fields that say nothing about the stay
+_NON_HOTEL_FIELDS = ("source", "weather_preference")
+
+# The terms of an extracted trip intent (process_query's data) that describe the stay:
+# destination, dates, hotel preferences and whatever else was mentioned, flattened to text
+def hotel_constraints(trip):
+    def values(value):
+        if isinstance(value, dict):
+            return [text for item in value.values() for text in values(item)]
+        if isinstance(value, list):
+            return [text for item in value for text in values(item)]
+        return [str(value)] if value is not None and not isinstance(value, bool) else []
+
+    if not isinstance(trip, dict):
+        return None
+    terms = values({key: value for key, value in trip.items() if key not in _NON_HOTEL_FIELDS})
+    return " ".join(terms) or None
+
+HOTEL_PREFERENCES_PROMPT = """
         You are an AI assistant that extracts hotel preferences from user context.
 
         Context:
@@ -70,14 +345,36 @@ def generate_hotel_preferences(context):
         IMPORTANT: Return ONLY the JSON object. No markdown or extra text.
         """
 
-    response = gemini_model.generate_content(prompt)
-    response_text = response.text.strip()
+# Generate structured hotel preference JSON
+# Parsed results are cached on disk (Services/llm_cache.py) under a hash of the prompt
+# template, model, generation config and context, so repeat plans for a user whose
+# preferences haven't changed skip the Gemini round trip.
+def generate_hotel_preferences(context):
+    key, cached = _cached_hotel_preferences(context)
+    if cached is not None:
+        return cached
+    response_text = generate(HOTEL_PREFERENCES_PROMPT.format(context=context), GEMINI_MODEL_NAME, GENERATION_CONFIG)
+    return _hotel_preferences_response(key, response_text)
+
+# Async variant of generate_hotel_preferences
+async def generate_hotel_preferences_async(context):
+    key, cached = _cached_hotel_preferences(context)
+    if cached is not None:
+        return cached
+    response_text = await generate_async(HOTEL_PREFERENCES_PROMPT.format(context=context), GEMINI_MODEL_NAME, GENERATION_CONFIG)
+    return _hotel_preferences_response(key, response_text)
 
-    if response_text.startswith("```"):
-        response_text = response_text.replace("```json", "").replace("```", "").strip()
+def _cached_hotel_preferences(context):
+    key = llm_cache_key(HOTEL_PREFERENCES_PROMPT, GEMINI_MODEL_NAME, GENERATION_CONFIG, context)
+    hit, parsed = get_llm_cache().get(key)
+    return key, ({"status": "success", "data": parsed} if hit else None)
 
+def _hotel_preferences_response(key, response_text):
+    response_text = clean_response_text(response_text)
     try:
         parsed = json.loads(response_text)
+        # Only well-formed answers are cached, a malformed one gets another try next time
+        get_llm_cache().set(key, parsed)
         return {"status": "success", "data": parsed}
     except json.JSONDecodeError:
         return {"status": "success", "data": response_text}
@@ -0,0 +1,139 @@
+import json
+from typing import Any, List, Tuple
+
+_WHITESPACE = " \t\r\n"
+
+
+class IncrementalJSONParser:
+    """
+    Parses a JSON document as it arrives in chunks (e.g. a streamed LLM response) and reports
+    every scalar field the moment its value is complete.
+
+    Fields are reported as (path, value) with dotted paths: "destination",
+    "hotel_preferences.rating", "hotel_preferences.amenities.0". Leading ```json fences are
+    skipped; a response that isn't a JSON object or array (e.g. a plain text refusal) reports
+    nothing, and so does the rest of a response once it stops being valid JSON (e.g. a bare
+    True or NaN): the final json.loads of text decides what to make of it.
+    """
+
+    def __init__(self):
+        self.text = ""
+        self.fields = {}
+        self._state = "start"
+        # One frame per open container: [is_object, key or index, expecting]
+        self._stack = []
+        self._token = ""
+        self._escape = False
+        self._string_is_key = False
+
+    def feed(self, chunk: str) -> List[Tuple[str, Any]]:
+        """Add the next chunk of text, returns the fields completed by it"""
+        self.text += chunk
+        completed = []
+        for ch in chunk:
+            self._consume(ch, completed)
+        return completed
+
+    @property
+    def done(self) -> bool:
+        """True once the root object / array is closed"""
+        return self._state == "end"
+
+    def _consume(self, ch, completed):
+        state = self._state
+        if state in ("end", "text"):
+            return
+        if state == "start":
+            if ch in _WHITESPACE:
+                return
+            if ch == "`":
+                self._state = "fence"
+            elif ch in "{[":
+                self._open(ch)
+            else:
+                self._state = "text"
+            return
+        if state == "fence":
+            if ch == "\n":
+                self._state = "start"
+            return
+        if state == "string":
+            self._string_char(ch, completed)
+            return
+        if state == "literal":
+            if ch not in _WHITESPACE and ch not in ",]}":
+                self._token += ch
+                return
+            try:
+                value = json.loads(self._token)
+            except ValueError:
+                self._state = "text"
+                return
+            self._finish_value(value, completed)
+            self._state = "container"
+        self._container_char(ch, completed)
+
+    def _container_char(self, ch, completed):
+        if ch in _WHITESPACE:
+            return
+        frame = self._stack[-1]
+        is_object, _, expecting = frame
+        if ch in "}]":
+            self._close()
+        elif ch == ",":
+            if is_object:
+                frame[2] = "key"
+            else:
+                frame[1] += 1
+                frame[2] = "value"
+        elif ch == ":":
+            frame[2] = "value"
+        elif ch == '"':
+            self._state = "string"
+            self._token = ""
+            self._string_is_key = is_object and expecting == "key"
+        elif expecting == "value":
+            if ch in "{[":
+                self._open(ch)
+            else:
+                self._state = "literal"
+                self._token = ch
+
+    def _string_char(self, ch, completed):
+        if self._escape:
+            self._token += ch
+            self._escape = False
+        elif ch == "\\":
+            self._token += ch
+            self._escape = True
+        elif ch == '"':
+            try:
+                value = json.loads(f'"{self._token}"')
+            except ValueError:
+                self._state = "text"
+                return
+            self._state = "container"
+            if self._string_is_key:
+                self._stack[-1][1] = value
+                self._stack[-1][2] = "colon"
+            else:
+                self._finish_value(value, completed)
+        else:
+            self._token += ch
+
+    def _open(self, ch):
+        self._stack.append([ch == "{", None if ch == "{" else 0, "key" if ch == "{" else "value"])
+        self._state = "container"
+
+    def _close(self):
+        self._stack.pop()
+        if self._stack:
+            self._stack[-1][2] = "comma"
+        else:
+            self._state = "end"
+
+    def _finish_value(self, value, completed):
+        path = ".".join(str(frame[1]) for frame in self._stack)
+        self._stack[-1][2] = "comma"
+        self.fields[path] = value
+        completed.append((path, value))
@@ -0,0 +1,191 @@
+import os
+import re
+import math
+import sqlite3
+import threading
+from collections import Counter
+from typing import Dict, Iterable, List, Sequence, Set, Tuple
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+LEXICAL_INDEX_PATH = os.getenv("LEXICAL_INDEX_PATH", "lexical_index.sqlite3")
+# Standard BM25 parameters: term frequency saturation and document length normalization
+BM25_K1 = float(os.getenv("BM25_K1", "1.2"))
+BM25_B = float(os.getenv("BM25_B", "0.75"))
+# Rank damping of reciprocal rank fusion (60 is the value from the original RRF paper)
+RRF_K = 60
+
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "i", "in", "is", "it", "like", "me",
+    "my", "of", "on", "or", "our", "should", "that", "the", "this", "to", "we", "with",
+}
+
+
+# Lowercased word and number tokens without stopwords; a plural "s" is dropped so that
+# "hotels" matches "hotel". Numbers stay whole, so "under 5000 rupees" matches "5000".
+def tokenize(text: str) -> List[str]:
+    tokens = []
+    for token in re.findall(r"\w+", text.lower()):
+        if token in STOPWORDS:
+            continue
+        if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+            token = token[:-1]
+        tokens.append(token)
+    return tokens
+
+
+def reciprocal_rank_fusion(rankings: Iterable[Sequence[str]], max_results: int,
+                           min_score_ratio: float = 0.0) -> List[str]:
+    """
+    Fuse ranked lists of texts: each list adds 1 / (RRF_K + rank) to the texts it contains.
+
+    Adaptive k: besides the max_results cap, texts scoring below min_score_ratio times the
+    best fused score are dropped, so a text that several lists agree on can stand alone
+    while texts only one list ranks are left out.
+
+    Returns:
+        List[str]: Texts, best first
+    """
+    scores = Counter()
+    for ranking in rankings:
+        for rank, text in enumerate(dict.fromkeys(ranking), start=1):
+            scores[text] += 1.0 / (RRF_K + rank)
+    if not scores:
+        return []
+    best = max(scores.values())
+    return [text for text, score in scores.most_common(max_results) if score >= best * min_score_ratio]
+
+
+class LexicalIndex:
+    """
+    BM25 inverted index of the preference chunks, kept next to the ChromaDB collection
+
+    Chunks are stored under their ChromaDB IDs with their user_id, so searches are scoped to
+    one user like retrieve_context's vector search, while document frequencies are counted
+    over the whole corpus. Postings live in SQLite: updating a chunk touches only its rows.
+
+    Args:
+        path (str): SQLite file, ":memory:" for a private in-memory index
+        k1 (float): BM25 term frequency saturation
+        b (float): BM25 document length normalization
+    """
+
+    def __init__(self, path: str = LEXICAL_INDEX_PATH, k1: float = BM25_K1, b: float = BM25_B):
+        self.k1 = k1
+        self.b = b
+        self.searches = 0
+        self._corpus = None
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS chunks (
+                id TEXT PRIMARY KEY,
+                user_id TEXT NOT NULL,
+                length INTEGER NOT NULL,
+                text TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS chunks_user_id ON chunks (user_id);
+            CREATE TABLE IF NOT EXISTS postings (
+                id TEXT NOT NULL,
+                term TEXT NOT NULL,
+                tf INTEGER NOT NULL,
+                PRIMARY KEY (id, term)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS postings_term ON postings (term);
+        """)
+        self._db.commit()
+
+    def upsert(self, ids: Sequence[str], documents: Sequence[str], user_ids: Sequence[str]):
+        """Index chunks, replacing any stored under the same IDs"""
+        chunks, postings = [], []
+        for id_, document, user_id in zip(ids, documents, user_ids):
+            terms = Counter(tokenize(document))
+            chunks.append((id_, str(user_id), sum(terms.values()), document))
+            postings.extend((id_, term, tf) for term, tf in terms.items())
+        with self._lock:
+            self._db.executemany("DELETE FROM postings WHERE id = ?", [(id_,) for id_ in ids])
+            self._db.executemany("INSERT OR REPLACE INTO chunks (id, user_id, length, text) VALUES (?, ?, ?, ?)", chunks)
+            self._db.executemany("INSERT INTO postings (id, term, tf) VALUES (?, ?, ?)", postings)
+            self._db.commit()
+            self._corpus = None
+
+    def delete(self, ids: Sequence[str]):
+        with self._lock:
+            self._db.executemany("DELETE FROM postings WHERE id = ?", [(id_,) for id_ in ids])
+            self._db.executemany("DELETE FROM chunks WHERE id = ?", [(id_,) for id_ in ids])
+            self._db.commit()
+            self._corpus = None
+
+    def missing_users(self, user_ids: Iterable[str]) -> Set[str]:
+        """The given users that have no chunks in the index"""
+        user_ids = {str(user_id) for user_id in user_ids}
+        if not user_ids:
+            return set()
+        with self._lock:
+            rows = self._db.execute(
+                f"SELECT DISTINCT user_id FROM chunks WHERE user_id IN ({','.join('?' * len(user_ids))})",
+                list(user_ids)
+            ).fetchall()
+        return user_ids - {row[0] for row in rows}
+
+    def search(self, query: str, user_id: str, k: int = 3) -> List[Tuple[str, float]]:
+        """
+        BM25 search of one user's chunks
+
+        Returns:
+            List[Tuple[str, float]]: (chunk text, score) of up to k matching chunks, best first
+        """
+        terms = sorted(set(tokenize(query)))
+        if not terms:
+            return []
+        placeholders = ",".join("?" * len(terms))
+        with self._lock:
+            self.searches += 1
+            count, average_length = self._corpus_stats()
+            document_frequency = dict(self._db.execute(
+                f"SELECT term, COUNT(*) FROM postings WHERE term IN ({placeholders}) GROUP BY term", terms
+            ).fetchall())
+            rows = self._db.execute(f"""
+                SELECT c.id, c.text, c.length, p.term, p.tf
+                FROM chunks c JOIN postings p ON p.id = c.id
+                WHERE c.user_id = ? AND p.term IN ({placeholders})
+            """, [str(user_id)] + terms).fetchall()
+
+        scores: Dict[str, float] = {}
+        texts = {}
+        for id_, text, length, term, tf in rows:
+            df = document_frequency[term]
+            idf = math.log(1 + (count - df + 0.5) / (df + 0.5))
+            norm = self.k1 * (1 - self.b + self.b * length / average_length)
+            scores[id_] = scores.get(id_, 0.0) + idf * tf * (self.k1 + 1) / (tf + norm)
+            texts[id_] = text
+        best = sorted(scores, key=lambda id_: (-scores[id_], id_))[:k]
+        return [(texts[id_], scores[id_]) for id_ in best]
+
+    def stats(self) -> Dict:
+        with self._lock:
+            count, _ = self._corpus_stats()
+            return {"chunks": count, "searches": self.searches}
+
+    # Chunk count and average length, cached until this process next writes
+    def _corpus_stats(self):
+        if self._corpus is None:
+            count, average_length = self._db.execute("SELECT COUNT(*), AVG(length) FROM chunks").fetchone()
+            self._corpus = (count, average_length or 1.0)
+        return self._corpus
+
+
+_lexical_index = None
+_lexical_index_lock = threading.Lock()
+
+
+def get_lexical_index() -> LexicalIndex:
+    """Process-wide LexicalIndex, opened on first use"""
+    global _lexical_index
+    if _lexical_index is None:
+        with _lexical_index_lock:
+            if _lexical_index is None:
+                _lexical_index = LexicalIndex()
+    return _lexical_index
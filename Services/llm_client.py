@@ -0,0 +1,142 @@
+import os
+import json
+import time
+import asyncio
+import weakref
+import threading
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+api_key = os.getenv("GOOGLE_API_KEY")
+
+# Gemini calls in flight at once per process (sync callers) and per event loop (async callers)
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))
+# Retries of a rate-limited call, waiting 1s, 2s, 4s, ... in between
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "3"))
+
+# google.generativeai takes about a second to import, so it is imported and configured
+# on first use instead of whenever a module imports this one
+_genai = None
+_models = {}
+_lock = threading.Lock()
+_semaphore = threading.BoundedSemaphore(LLM_MAX_CONCURRENCY)
+_async_semaphores = weakref.WeakKeyDictionary()
+# Identical calls in flight per event loop, shared instead of repeated
+_in_flight = weakref.WeakKeyDictionary()
+coalesced_calls = 0
+
+
+def get_genai():
+    global _genai
+    if _genai is None:
+        with _lock:
+            if _genai is None:
+                import google.generativeai as genai
+                genai.configure(api_key=api_key)
+                _genai = genai
+    return _genai
+
+
+# Returns the shared GenerativeModel for a model name and generation config (a dict),
+# creating it on first use. Every caller with the same settings gets the same instance.
+def get_model(model_name, generation_config):
+    key = (model_name, json.dumps(generation_config, sort_keys=True))
+    model = _models.get(key)
+    if model is None:
+        genai = get_genai()
+        with _lock:
+            model = _models.get(key)
+            if model is None:
+                model = genai.GenerativeModel(model_name, generation_config=genai.GenerationConfig(**generation_config))
+                _models[key] = model
+    return model
+
+
+# Gemini answers 429 Too Many Requests (ResourceExhausted) when over quota, and 503 when overloaded
+def _is_rate_limited(error):
+    code = getattr(error, "code", None)
+    return code in (429, 503) or type(error).__name__ in ("ResourceExhausted", "TooManyRequests", "ServiceUnavailable")
+
+
+# Blocking generate_content on the shared model, at most LLM_MAX_CONCURRENCY at a time,
+# retried with exponential backoff when rate limited. Returns the response text.
+def generate(prompt, model_name, generation_config):
+    model = get_model(model_name, generation_config)
+    with _semaphore:
+        for attempt in range(LLM_MAX_RETRIES + 1):
+            try:
+                return model.generate_content(prompt).text
+            except Exception as e:
+                if attempt == LLM_MAX_RETRIES or not _is_rate_limited(e):
+                    raise
+                print(f"⏳ Gemini rate limited, retrying in {2 ** attempt}s")
+                time.sleep(2 ** attempt)
+
+
+# Async variant of generate: awaits generate_content_async, so one event loop can have many
+# requests waiting on Gemini without a thread each. The limiter is per event loop.
+# Gemini has no batch endpoint for generate_content, so concurrent requests are combined the
+# other way available: an identical prompt already in flight is awaited instead of sent again.
+async def generate_async(prompt, model_name, generation_config):
+    global coalesced_calls
+    key = (json.dumps(prompt), model_name, json.dumps(generation_config, sort_keys=True))
+    loop = asyncio.get_running_loop()
+    calls = _in_flight.setdefault(loop, {})
+    task = calls.get(key)
+    if task is None:
+        task = asyncio.ensure_future(_generate_async(prompt, model_name, generation_config))
+        calls[key] = task
+        task.add_done_callback(lambda _: calls.pop(key, None))
+    else:
+        coalesced_calls += 1
+    # One caller giving up must not cancel the call for the others
+    return await asyncio.shield(task)
+
+
+async def _generate_async(prompt, model_name, generation_config):
+    model = get_model(model_name, generation_config)
+    async with _get_async_semaphore():
+        for attempt in range(LLM_MAX_RETRIES + 1):
+            try:
+                return (await model.generate_content_async(prompt)).text
+            except Exception as e:
+                if attempt == LLM_MAX_RETRIES or not _is_rate_limited(e):
+                    raise
+                print(f"⏳ Gemini rate limited, retrying in {2 ** attempt}s")
+                await asyncio.sleep(2 ** attempt)
+
+
+# Streaming variant of generate_async: yields the response text chunk by chunk as Gemini
+# produces it. Rate limits are retried while opening the stream, not once text has arrived.
+async def stream_async(prompt, model_name, generation_config):
+    model = get_model(model_name, generation_config)
+    async with _get_async_semaphore():
+        for attempt in range(LLM_MAX_RETRIES + 1):
+            try:
+                response = await model.generate_content_async(prompt, stream=True)
+                break
+            except Exception as e:
+                if attempt == LLM_MAX_RETRIES or not _is_rate_limited(e):
+                    raise
+                print(f"⏳ Gemini rate limited, retrying in {2 ** attempt}s")
+                await asyncio.sleep(2 ** attempt)
+        async for chunk in response:
+            yield chunk.text
+
+
+def _get_async_semaphore():
+    loop = asyncio.get_running_loop()
+    semaphore = _async_semaphores.get(loop)
+    if semaphore is None:
+        semaphore = asyncio.Semaphore(LLM_MAX_CONCURRENCY)
+        _async_semaphores[loop] = semaphore
+    return semaphore
+
+
+# Strips the ```json fences Gemini sometimes wraps answers in
+def clean_response_text(text):
+    text = text.strip()
+    if text.startswith("```"):
+        text = text.replace("```json", "").replace("```", "").strip()
+    return text
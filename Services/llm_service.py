@@ -8,22 +8,27 @@
 """
 
 import os
-import google.generativeai as genai
+import time
+import asyncio
 from dotenv import load_dotenv
 import json
+from Services.embeddings import get_embedding_function
+from Services.llm_cache import get_llm_cache, llm_cache_key
+from Services.llm_client import clean_response_text, generate, generate_async, stream_async
+from Services.json_stream import IncrementalJSONParser
+from Services.semantic_cache import SemanticCache, normalize_query
 
 # Load environment variables from .env file
 load_dotenv()
-api_key = os.getenv("GOOGLE_API_KEY")
 
 # 1. Configuration
-genai.configure(api_key=api_key)
-generation_config = genai.GenerationConfig(
-    temperature=0.5,
-    max_output_tokens=1000,
-    top_p=1,
-    top_k=1
-)
+MODEL_NAME = "gemini-1.5-flash"
+generation_config = {
+    "temperature": 0.5,
+    "max_output_tokens": 1000,
+    "top_p": 1,
+    "top_k": 1
+}
 
 # Trip planning prompt template
 TRIP_PLANNING_PROMPT = """
@@ -56,6 +61,26 @@ Example queries:
 User query: "{query}"
 """
 
+# Extracted intents of previously answered queries. Near-identical queries ("Plan a trip to
+# Goa on a sunny weekend" / "plan a trip to goa on a sunny weekend!") reuse them instead of
+# calling Gemini: exact matches first, then the nearest query by MiniLM embedding.
+SEMANTIC_CACHE_ENABLED = os.getenv("SEMANTIC_CACHE_ENABLED", "true").lower() == "true"
+
+# Fields a semantic hit must agree on: the new query has to name the cached places, weather
+# and dates ("... this weekend" and "... next weekend" embed almost identically)
+_INTENT_FIELDS = ("source", "destination", "weather_preference", "travel_dates")
+
+def _names_same_intent(query, data):
+    words = normalize_query(query)
+    return all(
+        not isinstance(data.get(field), str) or data[field].lower() in words
+        for field in _INTENT_FIELDS
+    )
+
+# The embedding model is only loaded once the first intent is cached (lookups in an empty
+# cache don't embed), so refusals and the first prompt of a run don't pay for it
+intent_cache = SemanticCache(lambda texts: get_embedding_function()(texts), accept=_names_same_intent)
+
 # 2. Function to process user query and generate content
 # query: str
 # Returns: 
@@ -81,21 +106,226 @@ User query: "{query}"
 """
 def process_query(query: str):
     try:
-        model = genai.GenerativeModel("gemini-1.5-flash", generation_config=generation_config)
-        prompt = TRIP_PLANNING_PROMPT.format(query=query)
-        response = model.generate_content([prompt])
-
-        # Clean up the response text and try to parse as JSON
-        response_text = response.text.strip()
-        if response_text.startswith('```'):
-            # Remove ```json and ``` markers
-            response_text = response_text.replace('```json', '').replace('```', '').strip()
-        
-        try:
-            parsed = json.loads(response_text)
-            return json.dumps({"status": "success", "data": parsed}, indent=4)
-        except json.JSONDecodeError:
-            return json.dumps({"status": "success", "data": response_text}, indent=4)
+        cached = _cached_intent(query)
+        if cached is not None:
+            return cached
+
+        start = time.perf_counter()
+        response_text = generate(TRIP_PLANNING_PROMPT.format(query=query), MODEL_NAME, generation_config)
+        return _intent_response(query, response_text, time.perf_counter() - start)
+
+    except Exception as e:
+        return json.dumps({"status": "error", "message": str(e)}, indent=4)
+
+# Async variant of process_query, for callers running in an event loop
+async def process_query_async(query: str):
+    try:
+        # The intent cache embeds queries (blocking), keep that off the event loop
+        cached = await asyncio.to_thread(_cached_intent, query)
+        if cached is not None:
+            return cached
+
+        start = time.perf_counter()
+        response_text = await generate_async(TRIP_PLANNING_PROMPT.format(query=query), MODEL_NAME, generation_config)
+        return await asyncio.to_thread(_intent_response, query, response_text, time.perf_counter() - start)
 
     except Exception as e:
-        return json.dumps({"status": "error", "message": str(e)}, indent=4)
\ No newline at end of file
+        return json.dumps({"status": "error", "message": str(e)}, indent=4)
+
+# Streaming variant of process_query_async
+# Reads the Gemini response as it is generated and parses it incrementally, calling
+# on_field(path, value) as soon as each field (e.g. "destination") is complete, so callers
+# can start work before the model finishes. Returns (process_query response, metrics):
+"""
+    {
+        "first_field_ms": 402.1,                  # time to the first complete field
+        "fields_ms": {"source": 402.1, "destination": 455.3, ...},
+        "total_ms": 1210.7,                       # time to the complete response
+        "cached": False
+    }
+"""
+async def process_query_stream_async(query: str, on_field=None):
+    start = time.perf_counter()
+    metrics = {"first_field_ms": None, "fields_ms": {}, "total_ms": None, "cached": False}
+    try:
+        cached = await asyncio.to_thread(_cached_intent, query)
+        if cached is not None:
+            metrics["cached"] = True
+            elapsed = round((time.perf_counter() - start) * 1000, 1)
+            data = json.loads(cached)["data"]
+            for path, value in data.items():
+                metrics["fields_ms"][path] = elapsed
+                if on_field is not None:
+                    on_field(path, value)
+            metrics["first_field_ms"] = metrics["total_ms"] = elapsed
+            return cached, metrics
+
+        parser = IncrementalJSONParser()
+        async for text in stream_async(TRIP_PLANNING_PROMPT.format(query=query), MODEL_NAME, generation_config):
+            for path, value in parser.feed(text):
+                elapsed = round((time.perf_counter() - start) * 1000, 1)
+                if metrics["first_field_ms"] is None:
+                    metrics["first_field_ms"] = elapsed
+                metrics["fields_ms"][path] = elapsed
+                if on_field is not None:
+                    on_field(path, value)
+
+        response = await asyncio.to_thread(_intent_response, query, parser.text, time.perf_counter() - start)
+
+    except Exception as e:
+        response = json.dumps({"status": "error", "message": str(e)}, indent=4)
+
+    metrics["total_ms"] = round((time.perf_counter() - start) * 1000, 1)
+    return response, metrics
+
+def _cached_intent(query):
+    if SEMANTIC_CACHE_ENABLED:
+        cached = intent_cache.get(query)
+        if cached is not None:
+            return json.dumps({"status": "success", "data": cached}, indent=4)
+    return None
+
+def _intent_response(query, response_text, seconds):
+    # Clean up the response text and try to parse as JSON
+    response_text = clean_response_text(response_text)
+    try:
+        parsed = json.loads(response_text)
+        # Only extracted trip intents are cached, not refusals or malformed answers
+        if SEMANTIC_CACHE_ENABLED and isinstance(parsed, dict):
+            intent_cache.set(query, parsed, seconds=seconds)
+        return json.dumps({"status": "success", "data": parsed}, indent=4)
+    except json.JSONDecodeError:
+        return json.dumps({"status": "success", "data": response_text}, indent=4)
+
+
+# 3. Fused extraction: trip intent and hotel preferences in one call
+# The two-call path asks Gemini for the trip entities (process_query) and then, separately, for
+# the hotel fields of the retrieved preference context (generate_hotel_preferences). Given the
+# context up front, one schema-constrained call returns both.
+NOT_A_TRIP_MESSAGE = ("This AI agent is designed specifically to help plan trips. "
+                      "Please ask something like 'Plan a trip to CA on a sunny day'.")
+
+FUSED_PLANNING_PROMPT = """
+You are an AI agent that helps users plan trips. Using the user's query and their stored hotel
+preference context, extract:
+- trip: source, destination, weather_preference, travel_dates (if mentioned) and other_info
+  (any other relevant info) from the query
+- hotel_preferences: location, stay_dates and hotel_preferences (rating, amenities, price_range)
+  from the context, updated with anything the query says about hotels
+
+If the query is NOT about planning a trip or has no destination, set is_trip to false, the
+other fields to null and message to:
+"{not_a_trip}"
+If any field is missing, set it to null.
+
+Hotel preference context:
+{context}
+
+User query: "{query}"
+"""
+
+_NULLABLE_STRING = {"type": "STRING", "nullable": True}
+
+FUSED_RESPONSE_SCHEMA = {
+    "type": "OBJECT",
+    "properties": {
+        "is_trip": {"type": "BOOLEAN"},
+        "message": _NULLABLE_STRING,
+        "trip": {
+            "type": "OBJECT",
+            "nullable": True,
+            "properties": {field: _NULLABLE_STRING for field in
+                           ("source", "destination", "weather_preference", "travel_dates", "other_info")},
+        },
+        "hotel_preferences": {
+            "type": "OBJECT",
+            "nullable": True,
+            "properties": {
+                "location": _NULLABLE_STRING,
+                "stay_dates": _NULLABLE_STRING,
+                "hotel_preferences": {
+                    "type": "OBJECT",
+                    "nullable": True,
+                    "properties": {
+                        "rating": _NULLABLE_STRING,
+                        "amenities": {"type": "ARRAY", "nullable": True, "items": {"type": "STRING"}},
+                        "price_range": _NULLABLE_STRING,
+                    },
+                },
+            },
+        },
+    },
+    "required": ["is_trip"],
+}
+
+# JSON mode with a response schema: the answer always parses, no fences to strip
+fused_generation_config = {
+    **generation_config,
+    "response_mime_type": "application/json",
+    "response_schema": FUSED_RESPONSE_SCHEMA,
+}
+
+# Extracts trip entities and hotel preferences from the query and the retrieved context
+# in one Gemini call. Answers are cached on disk like generate_hotel_preferences.
+# Returns:
+"""
+    For Success Case:
+    {
+        "status": "success",
+        "data": {
+            "trip": {"source": "New York", "destination": "California", "weather_preference": "sunny", ...},
+            "hotel_preferences": {"status": "success", "data": {"location": ..., "stay_dates": ..., "hotel_preferences": {...}}}
+        }
+    }
+
+    For Case other than trip planning:
+    {
+        "status": "success",
+        "data": "This AI agent is designed specifically to help plan trips. ..."
+    }
+"""
+def extract_trip_and_hotel_preferences(query: str, context: str):
+    try:
+        key, cached = _cached_fused(query, context)
+        if cached is not None:
+            return _fused_response(cached)
+        response_text = generate(_fused_prompt(query, context), MODEL_NAME, fused_generation_config)
+        return _fused_response(_store_fused(key, response_text))
+    except Exception as e:
+        return {"status": "error", "message": str(e)}
+
+# Async variant of extract_trip_and_hotel_preferences
+async def extract_trip_and_hotel_preferences_async(query: str, context: str):
+    try:
+        key, cached = _cached_fused(query, context)
+        if cached is not None:
+            return _fused_response(cached)
+        response_text = await generate_async(_fused_prompt(query, context), MODEL_NAME, fused_generation_config)
+        return _fused_response(_store_fused(key, response_text))
+    except Exception as e:
+        return {"status": "error", "message": str(e)}
+
+def _fused_prompt(query, context):
+    return FUSED_PLANNING_PROMPT.format(not_a_trip=NOT_A_TRIP_MESSAGE, context=context, query=query)
+
+def _cached_fused(query, context):
+    key = llm_cache_key(FUSED_PLANNING_PROMPT, MODEL_NAME, fused_generation_config,
+                        json.dumps({"query": query, "context": context}))
+    hit, parsed = get_llm_cache().get(key)
+    return key, (parsed if hit else None)
+
+def _store_fused(key, response_text):
+    parsed = json.loads(clean_response_text(response_text))
+    get_llm_cache().set(key, parsed)
+    return parsed
+
+def _fused_response(parsed):
+    if not parsed.get("is_trip") or not parsed.get("trip"):
+        return {"status": "success", "data": parsed.get("message") or NOT_A_TRIP_MESSAGE}
+    return {
+        "status": "success",
+        "data": {
+            "trip": parsed["trip"],
+            "hotel_preferences": {"status": "success", "data": parsed.get("hotel_preferences")},
+        },
+    }
@@ -0,0 +1,118 @@
+import os
+import numpy as np
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Directory with model.onnx and tokenizer.json of the embedding model. Defaults to the export of
+# all-MiniLM-L6-v2 that Chroma downloads for its default embedding function (same weights as the
+# SentenceTransformer model). Other models: optimum-cli export onnx --model sentence-transformers/<name> <dir>
+EMBEDDING_ONNX_PATH = os.getenv(
+    "EMBEDDING_ONNX_PATH", os.path.expanduser("~/.cache/chroma/onnx_models/all-MiniLM-L6-v2/onnx"))
+# Run a dynamically int8-quantized copy of the model (created next to model.onnx on first use)
+EMBEDDING_ONNX_QUANTIZE = os.getenv("EMBEDDING_ONNX_QUANTIZE", "true").lower() == "true"
+# Intra-op threads per inference, 0 lets onnxruntime use every core
+EMBEDDING_ONNX_THREADS = int(os.getenv("EMBEDDING_ONNX_THREADS", "0"))
+# sentence-transformers truncates all-MiniLM-L6-v2 input at 256 word pieces
+MAX_SEQUENCE_LENGTH = 256
+
+
+class OnnxEmbeddingFunction:
+    """
+    Sentence embeddings with ONNX Runtime instead of PyTorch.
+
+    Same output as SentenceTransformerEmbeddingFunction for the same model (mean pooled,
+    L2-normalized), computed on CPU with an optionally int8-quantized graph. Texts are sorted by
+    length and padded per batch to the longest one, so short preference chunks don't pay for
+    256-token padding.
+
+    Args:
+        model_dir (str): Directory with model.onnx and tokenizer.json
+        quantize (bool): Use the int8 model (falls back to float32 if it can't be created)
+        batch_size (int): Texts per inference call
+        threads (int): Intra-op threads, 0 for the onnxruntime default
+    """
+
+    def __init__(self, model_dir: str = EMBEDDING_ONNX_PATH, quantize: bool = EMBEDDING_ONNX_QUANTIZE,
+                 batch_size: int = 32, threads: int = EMBEDDING_ONNX_THREADS):
+        from tokenizers import Tokenizer
+        model_path = os.path.join(model_dir, "model.onnx")
+        if not os.path.exists(model_path) and model_dir == EMBEDDING_ONNX_PATH:
+            _download_default_model()
+        if quantize:
+            model_path = get_quantized_model(model_path)
+        self.model_path = model_path
+        self.batch_size = batch_size
+
+        self._tokenizer = Tokenizer.from_file(os.path.join(model_dir, "tokenizer.json"))
+        self._tokenizer.enable_truncation(max_length=MAX_SEQUENCE_LENGTH)
+        self._tokenizer.enable_padding(pad_id=0, pad_token="[PAD]")
+        self._session = _create_session(model_path, threads)
+        self._input_names = {model_input.name for model_input in self._session.get_inputs()}
+
+    def __call__(self, input):
+        texts = list(input)
+        vectors = [None] * len(texts)
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        for start in range(0, len(order), self.batch_size):
+            batch = order[start:start + self.batch_size]
+            for i, vector in zip(batch, self._embed([texts[i] for i in batch])):
+                vectors[i] = vector
+        return vectors
+
+    def _embed(self, texts):
+        encoded = self._tokenizer.encode_batch(texts)
+        input_ids = np.array([e.ids for e in encoded], dtype=np.int64)
+        attention_mask = np.array([e.attention_mask for e in encoded], dtype=np.int64)
+        feed = {"input_ids": input_ids, "attention_mask": attention_mask}
+        if "token_type_ids" in self._input_names:
+            feed["token_type_ids"] = np.zeros_like(input_ids)
+        hidden = self._session.run(None, feed)[0]
+
+        mask = attention_mask[:, :, None].astype(np.float32)
+        pooled = (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+        pooled /= np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+        return list(pooled.astype(np.float32))
+
+    @staticmethod
+    def name():
+        return "trip_planner_onnx"
+
+    def get_config(self):
+        return {"model_path": self.model_path}
+
+
+def _create_session(model_path, threads):
+    import onnxruntime
+    options = onnxruntime.SessionOptions()
+    options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+    options.intra_op_num_threads = threads
+    options.log_severity_level = 3
+    return onnxruntime.InferenceSession(model_path, options, providers=["CPUExecutionProvider"])
+
+
+# Returns the path of the int8 copy of an ONNX model, quantizing it on first use. Weights of
+# the MatMul/Gemm layers become int8 (dynamic quantization: activations are quantized per call),
+# which makes the file ~4x smaller and CPU inference faster. Needs the onnx package; without
+# it the float32 model is used.
+def get_quantized_model(model_path):
+    quantized_path = model_path[:-len(".onnx")] + "_int8.onnx"
+    if os.path.exists(quantized_path):
+        return quantized_path
+    try:
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+        # Several workers may start at once: write to a private file and rename it into place
+        partial_path = f"{quantized_path}.{os.getpid()}.partial"
+        quantize_dynamic(model_path, partial_path, weight_type=QuantType.QInt8)
+        os.replace(partial_path, quantized_path)
+        print(f"✅ Quantized {model_path} to int8")
+        return quantized_path
+    except Exception as e:
+        print("⚠️ Couldn't quantize the embedding model, using float32:", e)
+        return model_path
+
+
+# Fetches the all-MiniLM-L6-v2 export Chroma uses for its default embedding function
+def _download_default_model():
+    from chromadb.utils.embedding_functions import ONNXMiniLM_L6_V2
+    ONNXMiniLM_L6_V2()._download_model_if_not_exists()
@@ -0,0 +1,120 @@
+import os
+import json
+import time
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+QUERY_EMBEDDING_CACHE_SIZE = int(os.getenv("QUERY_EMBEDDING_CACHE_SIZE", "1024"))
+RETRIEVAL_CACHE_SIZE = int(os.getenv("RETRIEVAL_CACHE_SIZE", "4096"))
+# Writes from this process invalidate results immediately; the TTL bounds how long a result
+# can outlive writes made by another process (e.g. a separate indexing job)
+RETRIEVAL_CACHE_TTL = float(os.getenv("RETRIEVAL_CACHE_TTL", "300"))
+
+
+class RetrievalCache:
+    """
+    Caches for retrieve_context: query text -> embedding, and
+    (collection, query, filters, collection version) -> retrieved context
+
+    The collection version is bumped by the indexer on every write, so results computed
+    before a write are never served after it.
+
+    Args:
+        max_embeddings (int): Size of the query embedding LRU
+        max_results (int): Size of the retrieval result LRU
+        ttl (float): Seconds a retrieval result stays valid
+    """
+
+    def __init__(self,
+                 max_embeddings: int = QUERY_EMBEDDING_CACHE_SIZE,
+                 max_results: int = RETRIEVAL_CACHE_SIZE,
+                 ttl: float = RETRIEVAL_CACHE_TTL):
+        self.max_embeddings = max_embeddings
+        self.max_results = max_results
+        self.ttl = ttl
+        self.version = 0
+        self.embedding_hits = 0
+        self.embedding_misses = 0
+        self.hits = 0
+        self.misses = 0
+        self._embeddings = OrderedDict()
+        self._results = OrderedDict()
+        self._lock = threading.Lock()
+
+    def embed_query(self, query: str, embed: Callable[[List[str]], List]) -> List[float]:
+        """Embedding of the query, computed with embed (a Chroma embedding function) on a miss"""
+        with self._lock:
+            embedding = self._embeddings.get(query)
+            if embedding is not None:
+                self._embeddings.move_to_end(query)
+                self.embedding_hits += 1
+                return embedding
+            self.embedding_misses += 1
+
+        embedding = list(embed([query])[0])
+        with self._lock:
+            self._embeddings[query] = embedding
+            while len(self._embeddings) > self.max_embeddings:
+                self._embeddings.popitem(last=False)
+        return embedding
+
+    def key(self, collection: str, query: str, where: Optional[Dict] = None) -> Tuple:
+        return (collection, query, json.dumps(where, sort_keys=True), self.version)
+
+    def get(self, key: Tuple) -> Tuple[bool, Optional[str]]:
+        """
+        Look a retrieval up by key (see key())
+
+        Returns:
+            Tuple[bool, Optional[str]]: (hit, context)
+        """
+        with self._lock:
+            entry = self._results.get(key)
+            if entry is None or entry[1] <= time.monotonic() or key[-1] != self.version:
+                self._results.pop(key, None)
+                self.misses += 1
+                return False, None
+            self._results.move_to_end(key)
+            self.hits += 1
+            return True, entry[0]
+
+    def set(self, key: Tuple, context: str):
+        """Store a retrieval, unless the collection was written since the key was made"""
+        with self._lock:
+            if key[-1] != self.version:
+                return
+            self._results[key] = (context, time.monotonic() + self.ttl)
+            while len(self._results) > self.max_results:
+                self._results.popitem(last=False)
+
+    def invalidate(self):
+        """Called after writes to the collection: every cached retrieval is stale"""
+        with self._lock:
+            self.version += 1
+            self._results.clear()
+
+    def clear(self):
+        with self._lock:
+            self._embeddings.clear()
+            self._results.clear()
+
+    def stats(self) -> Dict:
+        """Hit/miss counters for monitoring"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            embedding_lookups = self.embedding_hits + self.embedding_misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 3) if lookups else 0.0,
+                "embedding_hits": self.embedding_hits,
+                "embedding_misses": self.embedding_misses,
+                "embedding_hit_ratio": round(self.embedding_hits / embedding_lookups, 3) if embedding_lookups else 0.0,
+                "version": self.version,
+                "size": len(self._results),
+            }
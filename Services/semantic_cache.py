@@ -0,0 +1,143 @@
+import os
+import re
+import sys
+import time
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional
+import numpy as np
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+# Cosine similarity above which a previously answered query is reused. Queries naming
+# different places still score ~0.8-0.9 with MiniLM, so this stays high.
+SEMANTIC_CACHE_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.95"))
+SEMANTIC_CACHE_SIZE = int(os.getenv("SEMANTIC_CACHE_SIZE", "2048"))
+
+
+def normalize_query(query: str) -> str:
+    """Normalize a query so case, spacing and trailing punctuation don't defeat exact matches"""
+    return re.sub(r"\s+", " ", query.strip().lower()).rstrip(".!? ")
+
+
+class SemanticCache:
+    """
+    Query -> response cache that also answers near-identical queries
+
+    Lookups try an exact match on the normalized query first, then the nearest previously
+    answered query by embedding cosine similarity. A neighbour is reused when it is above the
+    threshold and, when given, accept(query, response) agrees.
+
+    Args:
+        embed (Callable): Embeds a list of texts (e.g. the Chroma embedding function)
+        threshold (float): Minimum cosine similarity for a semantic hit
+        max_entries (int): Queries kept, least recently used are evicted
+        accept (Callable): Extra check of a semantic hit, e.g. that the new query names
+            the same places as the cached response
+    """
+
+    def __init__(self,
+                 embed: Callable[[List[str]], List],
+                 threshold: float = SEMANTIC_CACHE_THRESHOLD,
+                 max_entries: int = SEMANTIC_CACHE_SIZE,
+                 accept: Optional[Callable[[str, Any], bool]] = None):
+        self.embed = embed
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.accept = accept
+        self.exact_hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+        self.saved_seconds = 0.0
+        # normalized query -> (response, embedding, seconds the response took to produce)
+        self._entries = OrderedDict()
+        # Stacked embeddings of _entries (rebuilt lazily after changes) for one matrix product
+        self._matrix = None
+        self._keys = []
+        self._lock = threading.Lock()
+
+    def get(self, query: str) -> Optional[Any]:
+        """Cached response for the query or a near-identical one, None on a miss"""
+        key = normalize_query(query)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.exact_hits += 1
+                self.saved_seconds += entry[2]
+                return entry[0]
+            if not self._entries:
+                # Nothing to be near to: don't load the embedding model for a cold cache
+                self.misses += 1
+                return None
+
+        embedding = self._embed(key)
+        if embedding is not None:
+            with self._lock:
+                key, entry = self._nearest(embedding)
+                if entry is not None and (self.accept is None or self.accept(query, entry[0])):
+                    # Only a reused neighbour counts as recently used, not every close one
+                    self._entries.move_to_end(key)
+                    self.semantic_hits += 1
+                    self.saved_seconds += entry[2]
+                    return entry[0]
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def set(self, query: str, response: Any, seconds: float = 0.0):
+        """Remember a response, and how long producing it took (for the saved latency stat)"""
+        key = normalize_query(query)
+        embedding = self._embed(key)
+        with self._lock:
+            self._entries[key] = (response, embedding, seconds)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self._matrix = None
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._matrix = None
+
+    def stats(self) -> Dict:
+        """Hit/miss counters and the LLM time the hits saved, for monitoring"""
+        with self._lock:
+            hits = self.exact_hits + self.semantic_hits
+            lookups = hits + self.misses
+            return {
+                "exact_hits": self.exact_hits,
+                "semantic_hits": self.semantic_hits,
+                "misses": self.misses,
+                "hit_ratio": round(hits / lookups, 3) if lookups else 0.0,
+                "saved_seconds": round(self.saved_seconds, 3),
+                "size": len(self._entries)
+            }
+
+    def _embed(self, text: str) -> Optional[np.ndarray]:
+        # Without the embedding model the cache still serves exact matches
+        try:
+            vector = np.asarray(self.embed([text])[0], dtype=np.float32)
+        except Exception as e:
+            print("❌ Semantic cache could not embed the query, exact matches only:", e, sys.exc_info())
+            return None
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    # (key, entry) of the most similar cached query above the threshold, (None, None) if there is none
+    def _nearest(self, embedding: np.ndarray):
+        if self._matrix is None:
+            self._keys = [key for key, entry in self._entries.items() if entry[1] is not None]
+            self._matrix = np.stack([self._entries[key][1] for key in self._keys]) if self._keys else None
+        if self._matrix is None:
+            return None, None
+        scores = self._matrix @ embedding
+        best = int(np.argmax(scores))
+        if scores[best] < self.threshold:
+            return None, None
+        key = self._keys[best]
+        return key, self._entries[key]
@@ -0,0 +1,158 @@
+import os
+import json
+import threading
+from collections import OrderedDict
+from typing import List, Optional, Sequence
+from urllib.parse import quote
+import numpy as np
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+# Serve retrieve_context from VectorIndex files (written by the indexer) instead of ChromaDB
+VECTOR_INDEX_ENABLED = os.getenv("VECTOR_INDEX_ENABLED", "false").lower() == "true"
+VECTOR_INDEX_PATH = os.getenv("VECTOR_INDEX_PATH", "vector_index")
+# Users with more chunks than this are left to ChromaDB's HNSW index
+VECTOR_INDEX_MAX_ROWS = int(os.getenv("VECTOR_INDEX_MAX_ROWS", "2048"))
+# float16 halves the files, at a small recall cost (see benchmark_embedding_backends.py)
+VECTOR_INDEX_DTYPE = os.getenv("VECTOR_INDEX_DTYPE", "float32")
+# Users whose matrices stay mapped in this process
+VECTOR_INDEX_CACHE_SIZE = int(os.getenv("VECTOR_INDEX_CACHE_SIZE", "1024"))
+
+
+class VectorIndex:
+    """
+    Exact nearest-neighbour search over small per-key (per-user) sets of chunk embeddings.
+
+    Each key is stored as <key>.npy, a contiguous matrix of L2-normalized embeddings, next to
+    <key>.json with the chunk texts. Matrices are memory-mapped on first search, so opening the
+    index costs nothing and the OS page cache shares them between processes. A search is one
+    matrix-vector product plus argpartition; on normalized vectors that ranks like Chroma's
+    L2 distance. search() returns None when it can't answer (key not written, or too many rows)
+    so the caller can fall back to ChromaDB.
+
+    Args:
+        path (str): Directory of the index files
+        max_rows (int): Keys with more chunks than this are not stored
+        dtype (str): Storage type of the matrices, float32 or float16
+        cache_size (int): Keys kept mapped in memory
+    """
+
+    def __init__(self,
+                 path: str = VECTOR_INDEX_PATH,
+                 max_rows: int = VECTOR_INDEX_MAX_ROWS,
+                 dtype: str = VECTOR_INDEX_DTYPE,
+                 cache_size: int = VECTOR_INDEX_CACHE_SIZE):
+        self.path = path
+        self.max_rows = max_rows
+        self.dtype = np.dtype(dtype)
+        self.cache_size = cache_size
+        self.hits = 0
+        self.fallbacks = 0
+        self._loaded = OrderedDict()
+        self._lock = threading.Lock()
+
+    def search(self, key: str, query_embedding: Sequence[float], k: int = 3) -> Optional[List[str]]:
+        """Texts of the k chunks nearest to the query, best first, or None to use ChromaDB"""
+        entry = self._load(key)
+        if entry is None:
+            with self._lock:
+                self.fallbacks += 1
+            return None
+        matrix, documents = entry
+        with self._lock:
+            self.hits += 1
+        if not documents:
+            return []
+
+        query = np.asarray(query_embedding, dtype=np.float32)
+        query /= max(float(np.linalg.norm(query)), 1e-12)
+        scores = matrix.astype(np.float32, copy=False) @ query
+        if len(scores) > k:
+            top = np.argpartition(-scores, k - 1)[:k]
+        else:
+            top = np.arange(len(scores))
+        return [documents[i] for i in top[np.argsort(-scores[top])]]
+
+    def write(self, key: str, embeddings: Sequence[Sequence[float]], documents: List[str]) -> bool:
+        """Replaces the chunks stored for key; returns False (and removes key) when over max_rows"""
+        if len(documents) > self.max_rows:
+            self.remove(key)
+            return False
+        if documents:
+            matrix = np.asarray(embeddings, dtype=np.float32).reshape(len(documents), -1)
+        else:
+            matrix = np.zeros((0, 0), dtype=np.float32)
+        matrix /= np.clip(np.linalg.norm(matrix, axis=1, keepdims=True), 1e-12, None)
+
+        os.makedirs(self.path, exist_ok=True)
+        matrix_path, documents_path = self._paths(key)
+        # Readers in other processes may be mapping the old files: write aside and rename into place
+        partial = f".{os.getpid()}.partial"
+        with open(matrix_path + partial, "wb") as f:
+            np.save(f, np.ascontiguousarray(matrix, dtype=self.dtype))
+        with open(documents_path + partial, "w", encoding="utf-8") as f:
+            json.dump(documents, f)
+        os.replace(matrix_path + partial, matrix_path)
+        os.replace(documents_path + partial, documents_path)
+        with self._lock:
+            self._loaded.pop(key, None)
+        return True
+
+    def remove(self, key: str):
+        for path in self._paths(key):
+            if os.path.exists(path):
+                os.remove(path)
+        with self._lock:
+            self._loaded.pop(key, None)
+
+    def has(self, key: str) -> bool:
+        return all(os.path.exists(path) for path in self._paths(key))
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.fallbacks
+            return {
+                "hits": self.hits,
+                "fallbacks": self.fallbacks,
+                "hit_ratio": round(self.hits / total, 4) if total else 0.0,
+                "loaded": len(self._loaded),
+            }
+
+    def _paths(self, key):
+        name = quote(str(key), safe="")
+        return os.path.join(self.path, f"{name}.npy"), os.path.join(self.path, f"{name}.json")
+
+    def _load(self, key):
+        matrix_path, documents_path = self._paths(key)
+        try:
+            # Files rewritten (renamed into place, so a new inode) since they were mapped are mapped again
+            stamp = tuple((stat.st_ino, stat.st_mtime_ns) for stat in map(os.stat, (matrix_path, documents_path)))
+        except FileNotFoundError:
+            return None
+
+        with self._lock:
+            cached = self._loaded.get(key)
+            if cached is not None and cached[0] == stamp:
+                self._loaded.move_to_end(key)
+                return cached[1]
+
+        try:
+            matrix = np.load(matrix_path, mmap_mode="r")
+            with open(documents_path, "r", encoding="utf-8") as f:
+                documents = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Vector index for {key} unreadable, using ChromaDB:", e)
+            return None
+        # A rewrite may land between the two reads: skip a pair that doesn't line up (the changed
+        # stamp makes the next search load it again)
+        if documents and matrix.shape[0] != len(documents):
+            return None
+
+        with self._lock:
+            self._loaded[key] = (stamp, (matrix, documents))
+            self._loaded.move_to_end(key)
+            while len(self._loaded) > self.cache_size:
+                self._loaded.popitem(last=False)
+        return matrix, documents
@@ -0,0 +1,224 @@
+import os
+import re
+import json
+import time
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+WEATHER_CACHE_PATH = os.getenv("WEATHER_CACHE_PATH", "weather_cache.sqlite3")
+GEOCODE_CACHE_SIZE = int(os.getenv("GEOCODE_CACHE_SIZE", "1024"))
+# City coordinates never change, so keep them for a long time. Unknown locations are
+# kept for less time in case the geocoding data gets fixed upstream.
+GEOCODE_CACHE_TTL = float(os.getenv("GEOCODE_CACHE_TTL", str(30 * 24 * 3600)))
+GEOCODE_NEGATIVE_TTL = float(os.getenv("GEOCODE_NEGATIVE_TTL", str(24 * 3600)))
+FORECAST_CACHE_SIZE = int(os.getenv("FORECAST_CACHE_SIZE", "512"))
+# 2 decimal places is ~1 km, well inside one forecast grid cell
+FORECAST_COORD_PRECISION = int(os.getenv("FORECAST_COORD_PRECISION", "2"))
+# OpenWeatherMap publishes the 5 day / 3 hour forecast on 3-hour UTC boundaries
+FORECAST_UPDATE_HOURS = 3
+
+
+def normalize_location(location: str) -> str:
+    """Normalize a location so "Amritsar ,  Punjab" and "amritsar, punjab" share a cache key"""
+    location = re.sub(r"\s+", " ", location.strip().lower())
+    return re.sub(r"\s*,\s*", ",", location)
+
+
+class GeocodeCache:
+    """
+    Location -> coordinates cache
+
+    An in-memory LRU in front of a small SQLite table, so lookups survive restarts.
+    "No coordinates found" results are cached too (as None) with a shorter TTL.
+
+    Args:
+        path (str): SQLite file to persist entries in, None for memory only
+        max_entries (int): Size of the in-memory LRU
+        ttl (float): Seconds a found location stays valid
+        negative_ttl (float): Seconds an unknown location stays valid
+    """
+
+    def __init__(self,
+                 path: Optional[str] = WEATHER_CACHE_PATH,
+                 max_entries: int = GEOCODE_CACHE_SIZE,
+                 ttl: float = GEOCODE_CACHE_TTL,
+                 negative_ttl: float = GEOCODE_NEGATIVE_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.hits = 0
+        self.misses = 0
+        self.negative_hits = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+
+        if path:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute("""
+                CREATE TABLE IF NOT EXISTS geocode_cache (
+                    location TEXT PRIMARY KEY,
+                    coords TEXT,
+                    expires_at REAL NOT NULL
+                )
+            """)
+            self._db.commit()
+
+    def get(self, location: str) -> Tuple[bool, Optional[Dict]]:
+        """
+        Look a location up
+
+        Returns:
+            Tuple[bool, Optional[Dict]]: (hit, coords). coords is None for a cached
+            "no coordinates found" result.
+        """
+        key = normalize_location(location)
+        now = time.time()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None and self._db is not None:
+                row = self._db.execute(
+                    "SELECT coords, expires_at FROM geocode_cache WHERE location = ?", (key,)
+                ).fetchone()
+                if row is not None:
+                    entry = (json.loads(row[0]) if row[0] is not None else None, row[1])
+                    self._remember(key, entry)
+
+            if entry is None or entry[1] <= now:
+                if entry is not None:
+                    self._forget(key)
+                self.misses += 1
+                return False, None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            if entry[0] is None:
+                self.negative_hits += 1
+            return True, entry[0]
+
+    def set(self, location: str, coords: Optional[Dict]):
+        """Store coordinates for a location, or None when the location does not exist"""
+        key = normalize_location(location)
+        ttl = self.ttl if coords is not None else self.negative_ttl
+        entry = (coords, time.time() + ttl)
+
+        with self._lock:
+            self._remember(key, entry)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO geocode_cache (location, coords, expires_at) VALUES (?, ?, ?)",
+                    (key, json.dumps(coords) if coords is not None else None, entry[1])
+                )
+                self._db.commit()
+
+    def clear(self):
+        """Drop every entry, in memory and on disk"""
+        with self._lock:
+            self._entries.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM geocode_cache")
+                self._db.commit()
+
+    def stats(self) -> Dict:
+        """Hit/miss counters for monitoring"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "negative_hits": self.negative_hits,
+                "hit_ratio": round(self.hits / lookups, 3) if lookups else 0.0,
+                "size": len(self._entries)
+            }
+
+    def _remember(self, key: str, entry: Tuple):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _forget(self, key: str):
+        self._entries.pop(key, None)
+        if self._db is not None:
+            self._db.execute("DELETE FROM geocode_cache WHERE location = ?", (key,))
+            self._db.commit()
+
+
+def next_forecast_update(now: Optional[float] = None) -> float:
+    """Unix time of the next 3-hour UTC boundary, when the upstream forecast is refreshed"""
+    now = time.time() if now is None else now
+    period = FORECAST_UPDATE_HOURS * 3600
+    return (int(now) // period + 1) * period
+
+
+class ForecastCache:
+    """
+    (lat, lon, units) -> aggregated daily forecast records
+
+    Coordinates are rounded so nearby lookups of the same city share an entry, and every
+    entry expires on the next 3-hour boundary, when the upstream forecast changes anyway.
+    Only the already-aggregated daily records are stored, so a hit skips both the HTTP call
+    and the per-day grouping.
+
+    Args:
+        max_entries (int): Size of the in-memory LRU
+        precision (int): Decimal places the coordinates are rounded to
+    """
+
+    def __init__(self, max_entries: int = FORECAST_CACHE_SIZE, precision: int = FORECAST_COORD_PRECISION):
+        self.max_entries = max_entries
+        self.precision = precision
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def key(self, lat: float, lon: float, units: str = "metric") -> Tuple:
+        return (round(lat, self.precision), round(lon, self.precision), units)
+
+    def get(self, lat: float, lon: float, units: str = "metric") -> Optional[List[Dict]]:
+        """Cached daily records for the coordinates, or None on a miss"""
+        key = self.key(lat, lon, units)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[1] <= time.time():
+                self._entries.pop(key, None)
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def set(self, lat: float, lon: float, records: List[Dict], units: str = "metric"):
+        """Store daily records until the next upstream forecast update"""
+        key = self.key(lat, lon, units)
+
+        with self._lock:
+            self._entries[key] = (records, next_forecast_update())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict:
+        """Hit/miss counters for monitoring"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 3) if lookups else 0.0,
+                "size": len(self._entries)
+            }
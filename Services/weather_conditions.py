@@ -0,0 +1,158 @@
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Dict, FrozenSet, Optional
+
+# OpenWeatherMap condition codes (weather[0].id), see https://openweathermap.org/weather-conditions
+# Everything below is built once at import; matching a forecast day is a single set lookup.
+
+THUNDERSTORM = frozenset({200, 201, 202, 210, 211, 212, 221, 230, 231, 232})
+DRIZZLE = frozenset({300, 301, 302, 310, 311, 312, 313, 314, 321})
+RAIN = frozenset({500, 501, 502, 503, 504, 511, 520, 521, 522, 531})
+SNOW = frozenset({600, 601, 602, 611, 612, 613, 615, 616, 620, 621, 622})
+CLEAR = frozenset({800})
+CLOUDS = frozenset({801, 802, 803, 804})
+
+# Condition code -> "main" as the API reports it (lowercased like the daily records)
+CODE_TO_MAIN = MappingProxyType({
+    **{code: "thunderstorm" for code in THUNDERSTORM},
+    **{code: "drizzle" for code in DRIZZLE},
+    **{code: "rain" for code in RAIN},
+    **{code: "snow" for code in SNOW},
+    701: "mist", 711: "smoke", 721: "haze", 731: "dust", 741: "fog",
+    751: "sand", 761: "dust", 762: "ash", 771: "squall", 781: "tornado",
+    **{code: "clear" for code in CLEAR},
+    **{code: "clouds" for code in CLOUDS},
+})
+
+MAIN_TO_CODES = MappingProxyType({
+    main: frozenset(code for code, m in CODE_TO_MAIN.items() if m == main)
+    for main in set(CODE_TO_MAIN.values())
+})
+
+# Requested condition -> condition codes it accepts
+CONDITION_CODES = MappingProxyType({
+    # The conditions the planner documents
+    "sunny": CLEAR,
+    "cloudy": CLOUDS,
+    "rainy": RAIN | DRIZZLE,
+    "snowy": SNOW,
+    "stormy": THUNDERSTORM,
+    "foggy": frozenset({701, 721, 741}),
+    "windy": frozenset({771, 781}),
+    # Finer-grained terms users also write
+    "clear": CLEAR,
+    "partly cloudy": frozenset({801, 802}),
+    "overcast": frozenset({804}),
+    "rain": RAIN,
+    "drizzle": DRIZZLE,
+    "light rain": frozenset({300, 301, 310, 500, 520}),
+    "heavy rain": frozenset({502, 503, 504, 522, 531}),
+    "snow": SNOW,
+    "sleet": frozenset({611, 612, 613}),
+    "thunderstorm": THUNDERSTORM,
+    "storm": THUNDERSTORM,
+    "fog": frozenset({741}),
+    "mist": frozenset({701}),
+    "haze": frozenset({721}),
+    "dry": CLEAR | CLOUDS,
+})
+
+# Temperature words and the daily mean temperature (°C) they imply, as (min, max)
+TEMPERATURE_WORDS = MappingProxyType({
+    "hot": (30.0, None),
+    "warm": (25.0, None),
+    "mild": (15.0, 25.0),
+    "cool": (None, 20.0),
+    "cold": (None, 10.0),
+})
+
+_NUMBER = r"(-?\d+(?:\.\d+)?)\s*(?:°|degrees?|deg)?\s*c?\b"
+_BETWEEN = re.compile(r"between\s+" + _NUMBER + r"\s*(?:and|-|to)\s*" + _NUMBER)
+_ABOVE = re.compile(r"(?:above|over|warmer than|more than|at least|>=?)\s*" + _NUMBER)
+_BELOW = re.compile(r"(?:below|under|colder than|less than|at most|<=?)\s*" + _NUMBER)
+_FILLER = re.compile(r"\b(?:and|with|a|an|the|on|day|days|weather|temperature|temperatures|temps?|celsius)\b|[,;]")
+
+
+@dataclass(frozen=True)
+class ConditionPreference:
+    """
+    A compiled weather preference, e.g. "sunny and warm above 25C"
+
+    Attributes:
+        text (str): The preference as requested
+        codes (FrozenSet[int]): Accepted condition codes, None when any condition is fine
+        term (str): Unrecognized condition words, matched by substring like before
+        min_temp (float): Lowest accepted daily mean temperature (°C)
+        max_temp (float): Highest accepted daily mean temperature (°C)
+    """
+    text: str
+    codes: Optional[FrozenSet[int]] = None
+    term: Optional[str] = None
+    min_temp: Optional[float] = None
+    max_temp: Optional[float] = None
+
+    def matches(self, record: Dict) -> bool:
+        """Check a daily forecast record (from WeatherService) against the preference"""
+        if self.min_temp is not None and record.get("temperature", self.min_temp) < self.min_temp:
+            return False
+        if self.max_temp is not None and record.get("temperature", self.max_temp) > self.max_temp:
+            return False
+        return self.matches_condition(record.get("condition", ""), record.get("condition_id"))
+
+    def matches_condition(self, condition: str, condition_id: Optional[int] = None) -> bool:
+        """Check a forecast condition ("main", and its code when known)"""
+        if self.codes is not None:
+            if condition_id is not None:
+                return condition_id in self.codes
+            return not self.codes.isdisjoint(MAIN_TO_CODES.get(condition, ()))
+        if self.term:
+            return condition == self.term or self.term in condition or bool(condition and condition in self.term)
+        return True
+
+
+@lru_cache(maxsize=256)
+def compile_preference(text: str) -> ConditionPreference:
+    """
+    Parse a weather preference into a ConditionPreference
+
+    Examples:
+        "sunny"                      -> clear sky days
+        "sunny and warm above 25C"   -> clear sky days with a mean above 25°C
+        "rainy, below 20 degrees"    -> rain / drizzle days with a mean below 20°C
+        "mild"                       -> any condition, 15-25°C
+    """
+    words = text.lower().strip()
+    min_temp = max_temp = None
+
+    between = _BETWEEN.search(words)
+    if between:
+        min_temp, max_temp = sorted((float(between.group(1)), float(between.group(2))))
+        words = words.replace(between.group(0), " ")
+    above = _ABOVE.search(words)
+    if above:
+        min_temp = float(above.group(1))
+        words = words.replace(above.group(0), " ")
+    below = _BELOW.search(words)
+    if below:
+        max_temp = float(below.group(1))
+        words = words.replace(below.group(0), " ")
+
+    # Temperature words only apply when no explicit number was given for that bound
+    for word, (low, high) in TEMPERATURE_WORDS.items():
+        if re.search(rf"\b{word}\b", words):
+            words = re.sub(rf"\b{word}\b", " ", words)
+            if low is not None and min_temp is None:
+                min_temp = low
+            if high is not None and max_temp is None:
+                max_temp = high
+
+    term = re.sub(r"\s+", " ", _FILLER.sub(" ", words)).strip()
+    if not term:
+        return ConditionPreference(text, min_temp=min_temp, max_temp=max_temp)
+    if term in CONDITION_CODES:
+        return ConditionPreference(text, codes=CONDITION_CODES[term], min_temp=min_temp, max_temp=max_temp)
+    if term in MAIN_TO_CODES:
+        return ConditionPreference(text, codes=MAIN_TO_CODES[term], min_temp=min_temp, max_temp=max_temp)
+    return ConditionPreference(text, term=term, min_temp=min_temp, max_temp=max_temp)
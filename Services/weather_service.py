@@ -1,63 +1,126 @@
 import os
+import asyncio
+import threading
+import weakref
 import httpx
 import json
 from datetime import datetime, timedelta
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Sequence, Tuple
 from dotenv import load_dotenv
 from httpx import HTTPStatusError
+from Services.forecast_aggregation import aggregate_daily_columnar, aggregate_daily_columnar_batch
+from Services.weather_conditions import compile_preference
+from Services.weather_cache import GeocodeCache, ForecastCache, normalize_location
 
 # Load environment variables
 load_dotenv()
 
+# Connection pool defaults, overridable from .env
+WEATHER_MAX_CONNECTIONS = int(os.getenv("WEATHER_MAX_CONNECTIONS", "20"))
+WEATHER_MAX_KEEPALIVE = int(os.getenv("WEATHER_MAX_KEEPALIVE", "10"))
+WEATHER_KEEPALIVE_EXPIRY = float(os.getenv("WEATHER_KEEPALIVE_EXPIRY", "30.0"))
+# Batch lookups: max in-flight requests and how often a 429 is retried
+WEATHER_MAX_CONCURRENCY = int(os.getenv("WEATHER_MAX_CONCURRENCY", "5"))
+WEATHER_MAX_RETRIES = int(os.getenv("WEATHER_MAX_RETRIES", "3"))
+# Popular destinations to fetch at startup, separated by ";" (e.g. "Amritsar, Punjab;Goa")
+WEATHER_PREWARM_LOCATIONS = os.getenv("WEATHER_PREWARM_LOCATIONS", "")
+
 class WeatherService:
-    def __init__(self):
+    def __init__(self,
+                 max_connections: Optional[int] = None,
+                 max_keepalive_connections: Optional[int] = None,
+                 keepalive_expiry: Optional[float] = None,
+                 timeout: float = 30.0,
+                 geocode_cache: Optional[GeocodeCache] = None,
+                 forecast_cache: Optional[ForecastCache] = None):
         self.api_key = os.getenv("OPENWEATHER_API_KEY")
         self.base_url = "http://api.openweathermap.org/data/2.5"
+        self.geo_url = "http://api.openweathermap.org/geo/1.0/direct"
         
         if not self.api_key:
             raise ValueError("OPENWEATHER_API_KEY not found in environment variables")
+        
+        # One long-lived pool of keep-alive connections instead of a new TCP connection per call
+        self.limits = httpx.Limits(
+            max_connections=max_connections or WEATHER_MAX_CONNECTIONS,
+            max_keepalive_connections=max_keepalive_connections or WEATHER_MAX_KEEPALIVE,
+            keepalive_expiry=keepalive_expiry or WEATHER_KEEPALIVE_EXPIRY
+        )
+        self.timeout = httpx.Timeout(timeout, connect=10.0)
+        self.client = httpx.Client(limits=self.limits, timeout=self.timeout)
+        # httpx.AsyncClient is bound to the event loop it was first used on,
+        # so keep one per running loop
+        self._async_clients = weakref.WeakKeyDictionary()
+        # Coordinates never change, so only the first lookup of a location goes upstream
+        self.geocode_cache = geocode_cache if geocode_cache is not None else GeocodeCache()
+        # Forecasts only change every 3 hours, so share them between users until then
+        self.forecast_cache = forecast_cache if forecast_cache is not None else ForecastCache()
+    
+    def get_async_client(self) -> httpx.AsyncClient:
+        """Get the pooled async client for the running event loop"""
+        loop = asyncio.get_running_loop()
+        client = self._async_clients.get(loop)
+        if client is None:
+            client = httpx.AsyncClient(limits=self.limits, timeout=self.timeout)
+            self._async_clients[loop] = client
+        return client
+    
+    def close(self):
+        """Close the pooled sync client (async clients are closed per event loop with aclose())"""
+        self.client.close()
+    
+    async def aclose(self):
+        """Close the pooled async client of the running event loop
+        
+        An AsyncClient is not closed when its loop ends, so code that runs and then discards a
+        loop (asyncio.run, server shutdown) calls this before the loop goes away.
+        """
+        client = self._async_clients.pop(asyncio.get_running_loop(), None)
+        if client is not None:
+            await client.aclose()
     
     def get_coordinates(self, location: str) -> Optional[Dict]:
         """Get coordinates for a location using OpenWeatherMap Geocoding API"""
         try:
-            url = "http://api.openweathermap.org/geo/1.0/direct"
+            cached, coords = self.geocode_cache.get(location)
+            if cached:
+                if coords is None:
+                    print(f"❌ No coordinates found for location: {location} (cached)")
+                return coords
+            
             params = {
                 "q": location,
                 "limit": 1,
                 "appid": self.api_key
             }
             
-            response = httpx.get(url, params=params, timeout=30.0)
-            
-            # Check for specific error status codes
-            if response.status_code == 401:
-                print(f"❌ API Key Error: Your OpenWeatherMap API key is invalid or expired")
-                print(f"   Please get a new API key from: https://openweathermap.org/api")
-                print(f"   Current key: {self.api_key[:8]}...")
-                return None
-            elif response.status_code == 429:
-                print(f"❌ Rate Limit Exceeded: You've exceeded the API call limit")
-                print(f"   Free tier allows 1000 calls/day")
-                return None
-            elif response.status_code == 400:
-                print(f"❌ Bad Request: Invalid location format '{location}'")
-                return None
+            response = self.client.get(self.geo_url, params=params)
+            return self._parse_coordinates(response, location)
             
-            response.raise_for_status()
+        except HTTPStatusError as e:
+            print(f"❌ HTTP Error {e.response.status_code}: {e}")
+            return None
+        except Exception as e:
+            print(f"❌ Error getting coordinates for {location}: {e}")
+            return None
+    
+    async def get_coordinates_async(self, location: str) -> Optional[Dict]:
+        """Async variant of get_coordinates using the pooled AsyncClient"""
+        try:
+            cached, coords = self.geocode_cache.get(location)
+            if cached:
+                if coords is None:
+                    print(f"❌ No coordinates found for location: {location} (cached)")
+                return coords
             
-            data = response.json()
-            if data:
-                return {
-                    "lat": data[0]["lat"],
-                    "lon": data[0]["lon"],
-                    "name": data[0]["name"],
-                    "state": data[0].get("state", ""),
-                    "country": data[0]["country"]
-                }
-            else:
-                print(f"❌ No coordinates found for location: {location}")
-                print(f"   Try: {location.split(',')[0]} (just city name)")
-                return None
+            params = {
+                "q": location,
+                "limit": 1,
+                "appid": self.api_key
+            }
+            
+            response = await self._get_async(self.geo_url, params)
+            return self._parse_coordinates(response, location)
             
         except HTTPStatusError as e:
             print(f"❌ HTTP Error {e.response.status_code}: {e}")
@@ -66,9 +129,65 @@ class WeatherService:
             print(f"❌ Error getting coordinates for {location}: {e}")
             return None
     
+    async def _get_async(self, url: str, params: Dict) -> httpx.Response:
+        """GET with the pooled AsyncClient, backing off and retrying on 429 Too Many Requests"""
+        client = self.get_async_client()
+        response = await client.get(url, params=params)
+        for attempt in range(WEATHER_MAX_RETRIES):
+            if response.status_code != 429:
+                break
+            retry_after = response.headers.get("Retry-After", "")
+            delay = float(retry_after) if retry_after.isdigit() else 2 ** attempt
+            print(f"⏳ Rate limited, retrying in {delay:.0f}s")
+            await asyncio.sleep(delay)
+            response = await client.get(url, params=params)
+        return response
+    
+    def _parse_coordinates(self, response: httpx.Response, location: str) -> Optional[Dict]:
+        """Turn a geocoding response into a coordinates dict (None on errors / no match)
+        
+        Found locations and "no coordinates found" answers are cached, errors are not.
+        """
+        # Check for specific error status codes
+        if response.status_code == 401:
+            print(f"❌ API Key Error: Your OpenWeatherMap API key is invalid or expired")
+            print(f"   Please get a new API key from: https://openweathermap.org/api")
+            print(f"   Current key: {self.api_key[:8]}...")
+            return None
+        elif response.status_code == 429:
+            print(f"❌ Rate Limit Exceeded: You've exceeded the API call limit")
+            print(f"   Free tier allows 1000 calls/day")
+            return None
+        elif response.status_code == 400:
+            print(f"❌ Bad Request: Invalid location format '{location}'")
+            return None
+        
+        response.raise_for_status()
+        
+        data = response.json()
+        if data:
+            coords = {
+                "lat": data[0]["lat"],
+                "lon": data[0]["lon"],
+                "name": data[0]["name"],
+                "state": data[0].get("state", ""),
+                "country": data[0]["country"]
+            }
+            self.geocode_cache.set(location, coords)
+            return coords
+        else:
+            print(f"❌ No coordinates found for location: {location}")
+            print(f"   Try: {location.split(',')[0]} (just city name)")
+            self.geocode_cache.set(location, None)
+            return None
+    
     def get_weather_forecast(self, lat: float, lon: float, days: int = 30) -> Optional[List[Dict]]:
         """Get weather forecast for the next N days"""
         try:
+            forecasts = self.forecast_cache.get(lat, lon, "metric")
+            if forecasts is not None:
+                return forecasts[:days]
+            
             url = f"{self.base_url}/forecast"
             params = {
                 "lat": lat,
@@ -77,49 +196,75 @@ class WeatherService:
                 "units": "metric"  # Use Celsius
             }
             
-            response = httpx.get(url, params=params, timeout=30.0)
+            response = self.client.get(url, params=params)
             response.raise_for_status()
             
-            data = response.json()
-            forecasts = []
-            
-            # Group forecasts by day (OpenWeatherMap provides 3-hour forecasts)
-            daily_forecasts = {}
-            
-            for item in data["list"]:
-                date = datetime.fromtimestamp(item["dt"]).strftime("%Y-%m-%d")
-                if date not in daily_forecasts:
-                    daily_forecasts[date] = []
-                daily_forecasts[date].append(item)
-            
-            # Process each day's forecasts
-            for date, hourly_forecasts in daily_forecasts.items():
-                # Get the most common weather condition for the day
-                conditions = [f["weather"][0]["main"].lower() for f in hourly_forecasts]
-                condition_counts = {}
-                for condition in conditions:
-                    condition_counts[condition] = condition_counts.get(condition, 0) + 1
-                
-                # Get the dominant condition
-                dominant_condition = max(condition_counts.items(), key=lambda x: x[1])[0]
-                
-                # Get average temperature
-                avg_temp = sum(f["main"]["temp"] for f in hourly_forecasts) / len(hourly_forecasts)
-                
-                forecasts.append({
-                    "date": date,
-                    "condition": dominant_condition,
-                    "description": hourly_forecasts[0]["weather"][0]["description"],
-                    "temperature": round(avg_temp, 1),
-                    "humidity": hourly_forecasts[0]["main"]["humidity"]
-                })
+            forecasts = self._aggregate_forecast(response.json())
+            self.forecast_cache.set(lat, lon, forecasts, "metric")
+            return forecasts[:days]
+            
+        except Exception as e:
+            print(f"Error getting weather forecast: {e}")
+            return None
+    
+    async def get_weather_forecast_async(self, lat: float, lon: float, days: int = 30) -> Optional[List[Dict]]:
+        """Async variant of get_weather_forecast using the pooled AsyncClient"""
+        try:
+            forecasts = self.forecast_cache.get(lat, lon, "metric")
+            if forecasts is not None:
+                return forecasts[:days]
             
+            forecasts = self._aggregate_forecast(await self._fetch_forecast_async(lat, lon))
+            self.forecast_cache.set(lat, lon, forecasts, "metric")
             return forecasts[:days]
             
         except Exception as e:
             print(f"Error getting weather forecast: {e}")
             return None
     
+    async def _fetch_forecast_async(self, lat: float, lon: float) -> Dict:
+        """Raw /forecast response (5 days of 3-hour slots) for the coordinates"""
+        url = f"{self.base_url}/forecast"
+        params = {
+            "lat": lat,
+            "lon": lon,
+            "appid": self.api_key,
+            "units": "metric"  # Use Celsius
+        }
+        
+        response = await self._get_async(url, params)
+        response.raise_for_status()
+        return response.json()
+    
+    def _aggregate_forecast(self, data: Dict) -> List[Dict]:
+        """Roll the 3-hour forecast entries up into one record per day"""
+        return aggregate_daily_columnar(data["list"])
+    
+    def prewarm(self, locations: List[str]) -> int:
+        """
+        Fetch coordinates and forecasts for popular destinations ahead of the first request
+        
+        Args:
+            locations (List[str]): Locations to warm (e.g., ["Amritsar, Punjab", "Goa"])
+        
+        Returns:
+            int: Number of locations whose forecast is now cached
+        """
+        warmed = 0
+        for location in locations:
+            coords = self.get_coordinates(location)
+            if coords and self.get_weather_forecast(coords["lat"], coords["lon"]):
+                warmed += 1
+        print(f"Prewarmed weather for {warmed}/{len(locations)} locations")
+        return warmed
+    
+    def cache_stats(self) -> Dict:
+        """Geocoding and forecast cache counters"""
+        return {
+            "geocode": self.geocode_cache.stats(),
+            "forecast": self.forecast_cache.stats()
+        }
+    
     def get_relevant_dates(self, location: str, condition: str, days: int = 30) -> List[str]:
         """
         Simple function to get relevant dates for a weather condition in a location
@@ -152,47 +297,198 @@ class WeatherService:
                 print("Could not get weather forecast")
                 return []
             
-            # Filter dates based on weather condition
-            condition = condition.lower().strip()
-            relevant_dates = []
+            return self._filter_dates(forecasts, location, condition)
+            
+        except Exception as e:
+            print(f"Error getting relevant dates: {e}")
+            return []
+    
+    async def get_relevant_dates_async(self, location: str, condition: str, days: int = 30) -> List[str]:
+        """
+        Async variant of get_relevant_dates, for use from an asyncio pipeline
+        
+        Args:
+            location (str): City name, can include state/country (e.g., "San Francisco, CA")
+            condition (str): Weather condition to search for (e.g., "sunny", "rainy")
+            days (int): Number of days to look ahead (default 30, max 30)
+        
+        Returns:
+            List[str]: List of dates in YYYY-MM-DD format where the weather condition matches
+        """
+        try:
+            print(f"Searching for {condition} days in {location} for the next {days} days")
+            
+            # Limit days to 30 (OpenWeatherMap free tier limit)
+            days = min(days, 30)
+            
+            coords = await self.get_coordinates_async(location)
+            if not coords:
+                print(f"Could not find coordinates for {location}")
+                return []
+            
+            print(f"Found coordinates: {coords['lat']:.4f}, {coords['lon']:.4f}")
             
-            for forecast in forecasts:
-                forecast_condition = forecast["condition"]
-                
-                # Check if the forecast condition matches the requested condition
-                if self._matches_condition(forecast_condition, condition):
-                    relevant_dates.append(forecast["date"])
+            forecasts = await self.get_weather_forecast_async(coords["lat"], coords["lon"], days)
+            if not forecasts:
+                print("Could not get weather forecast")
+                return []
             
-            print(f"Found {len(relevant_dates)} relevant dates for {condition} weather in {location}")
-            return relevant_dates
+            return self._filter_dates(forecasts, location, condition)
             
         except Exception as e:
             print(f"Error getting relevant dates: {e}")
             return []
     
-    def _matches_condition(self, forecast_condition: str, requested_condition: str) -> bool:
-        """Check if forecast condition matches requested condition"""
-        # Create mapping for common weather conditions
-        condition_mapping = {
-            "sunny": ["clear", "clear sky"],
-            "cloudy": ["clouds", "scattered clouds", "broken clouds", "overcast clouds"],
-            "rainy": ["rain", "light rain", "moderate rain", "heavy rain", "drizzle"],
-            "snowy": ["snow", "light snow", "moderate snow", "heavy snow"],
-            "stormy": ["thunderstorm", "storm"],
-            "foggy": ["fog", "mist", "haze"],
-            "windy": ["wind", "breeze"]
-        }
+    def get_weather_dates_batch(self, requests: Sequence[Tuple], max_concurrency: Optional[int] = None) -> List[List[str]]:
+        """
+        Blocking wrapper around get_weather_dates_batch_async, for code without an event loop
         
-        # Check exact match first
-        if forecast_condition == requested_condition:
-            return True
+        Example:
+            >>> service.get_weather_dates_batch([("Amritsar", "sunny", 7), ("Shimla", "sunny", 7)])
+            [['2024-01-15', '2024-01-16'], ['2024-01-16']]
+        """
+        async def run_batch():
+            try:
+                return await self.get_weather_dates_batch_async(requests, max_concurrency)
+            finally:
+                # The loop goes away with asyncio.run, so close its pooled client with it
+                await self.aclose()
+        
+        return asyncio.run(run_batch())
+    
+    async def get_weather_dates_batch_async(self, requests: Sequence[Tuple], max_concurrency: Optional[int] = None) -> List[List[str]]:
+        """
+        Relevant dates for many (location, condition, days) requests at once
         
-        # Check mapped conditions
-        if requested_condition in condition_mapping:
-            return forecast_condition in condition_mapping[requested_condition]
+        Each distinct location is geocoded and its forecast fetched once, concurrently, with at
+        most max_concurrency requests in flight, and every condition asked for that location is
+        evaluated against the same forecast. Fetched forecasts are aggregated together in one
+        columnar pass.
         
-        # Check if requested condition is contained in forecast condition
-        return requested_condition in forecast_condition or forecast_condition in requested_condition
+        Args:
+            requests (Sequence[Tuple]): (location, condition) or (location, condition, days) tuples
+            max_concurrency (int): Max in-flight API calls (default WEATHER_MAX_CONCURRENCY)
+        
+        Returns:
+            List[List[str]]: Matching dates for each request, in the order given
+        """
+        semaphore = asyncio.Semaphore(max_concurrency or WEATHER_MAX_CONCURRENCY)
+        
+        async def fetch_forecast(location: str) -> Tuple[Optional[List[Dict]], Optional[Dict]]:
+            """(cached daily records, None) or (None, raw forecast) for a location, (None, None) on errors"""
+            try:
+                async with semaphore:
+                    coords = await self.get_coordinates_async(location)
+                if not coords:
+                    print(f"Could not find coordinates for {location}")
+                    return None, None
+                forecasts = self.forecast_cache.get(coords["lat"], coords["lon"], "metric")
+                if forecasts is not None:
+                    return forecasts, None
+                async with semaphore:
+                    raw = await self._fetch_forecast_async(coords["lat"], coords["lon"])
+                return None, {"coords": coords, "list": raw["list"]}
+            except Exception as e:
+                print(f"Error getting weather forecast for {location}: {e}")
+                return None, None
+        
+        # Deduplicate locations, keeping the first spelling of each. A malformed request (e.g. a
+        # None location) only loses its own dates, not those of the rest of the batch.
+        locations = {}
+        keys = []
+        for request in requests:
+            try:
+                key = normalize_location(request[0])
+                locations.setdefault(key, request[0])
+            except Exception as e:
+                print(f"Error in weather request {request!r}: {e}")
+                key = None
+            keys.append(key)
+        
+        results = await asyncio.gather(*(fetch_forecast(location) for location in locations.values()))
+        forecasts_by_location = {key: forecasts for key, (forecasts, _) in zip(locations.keys(), results)}
+        
+        # Roll all freshly fetched forecasts up in one columnar pass and cache them
+        fetched = [(key, raw) for key, (_, raw) in zip(locations.keys(), results) if raw is not None]
+        daily = aggregate_daily_columnar_batch([raw["list"] for _, raw in fetched])
+        for (key, raw), forecasts in zip(fetched, daily):
+            self.forecast_cache.set(raw["coords"]["lat"], raw["coords"]["lon"], forecasts, "metric")
+            forecasts_by_location[key] = forecasts
+        
+        dates = []
+        for request, key in zip(requests, keys):
+            forecasts = forecasts_by_location.get(key) if key is not None else None
+            try:
+                location, condition = request[0], request[1]
+                days = min(request[2] if len(request) > 2 else 30, 30)
+                dates.append(self._filter_dates(forecasts[:days], location, condition) if forecasts else [])
+            except Exception as e:
+                print(f"Error in weather request {request!r}: {e}")
+                dates.append([])
+        return dates
+    
+    def _filter_dates(self, forecasts: List[Dict], location: str, condition: str) -> List[str]:
+        """Filter daily forecast records down to the dates matching the requested condition
+        
+        condition can be a plain condition ("sunny") or a compound preference
+        ("sunny and warm above 25C"), see Services/weather_conditions.py.
+        """
+        preference = compile_preference(condition.lower().strip())
+        relevant_dates = [forecast["date"] for forecast in forecasts if preference.matches(forecast)]
+        
+        print(f"Found {len(relevant_dates)} relevant dates for {condition} weather in {location}")
+        return relevant_dates
+    
+    def _matches_condition(self, forecast_condition: str, requested_condition: str) -> bool:
+        """Check if forecast condition matches requested condition"""
+        return compile_preference(requested_condition).matches_condition(forecast_condition)
+
+
+# Process-wide shared service so every lookup reuses the same connection pool
+_weather_service = None
+_weather_service_lock = threading.Lock()
+# Set by use_batched_weather_requests()
+_weather_batcher = None
+
+def get_weather_service() -> WeatherService:
+    """Get (and lazily create) the process-wide WeatherService instance"""
+    global _weather_service
+    if _weather_service is None:
+        with _weather_service_lock:
+            if _weather_service is None:
+                _weather_service = WeatherService()
+    return _weather_service
+
+
+async def aclose_weather_service():
+    """Close the shared service's async client for the running loop, if the service exists"""
+    if _weather_service is not None:
+        await _weather_service.aclose()
+
+
+def prewarm_weather(locations: Optional[List[str]] = None) -> int:
+    """Warm the shared service's caches, by default for WEATHER_PREWARM_LOCATIONS"""
+    if locations is None:
+        locations = [l.strip() for l in WEATHER_PREWARM_LOCATIONS.split(";") if l.strip()]
+    if not locations:
+        return 0
+    try:
+        return get_weather_service().prewarm(locations)
+    except Exception as e:
+        print(f"Error: {e}")
+        return 0
+
+
+def use_batched_weather_requests(max_batch_size: int = 32, max_wait_ms: float = 5.0):
+    """
+    Make get_weather_dates_async coalesce concurrent calls into get_weather_dates_batch_async
+    calls, so requests for the same city share one geocode + forecast fetch. For servers
+    running a single event loop.
+    """
+    global _weather_batcher
+    from Services.batching import MicroBatcher
+    _weather_batcher = MicroBatcher(get_weather_dates_batch_async, max_batch_size=max_batch_size, max_wait_ms=max_wait_ms)
+    return _weather_batcher
 
 
 # Simple function interface for easy use
@@ -213,8 +509,50 @@ def get_weather_dates(location: str, condition: str, days: int = 30) -> List[str
         ['2024-01-15', '2024-01-16', '2024-01-20']
     """
     try:
-        weather_service = WeatherService()
+        weather_service = get_weather_service()
         return weather_service.get_relevant_dates(location, condition, days)
     except Exception as e:
         print(f"Error: {e}")
         return []
+
+
+async def get_weather_dates_async(location: str, condition: str, days: int = 30) -> List[str]:
+    """
+    Async variant of get_weather_dates
+    
+    Example:
+        >>> await get_weather_dates_async("San Francisco, CA", "sunny", 15)
+        ['2024-01-15', '2024-01-16', '2024-01-20']
+    """
+    try:
+        if _weather_batcher is not None:
+            return await _weather_batcher.submit((location, condition, days))
+        weather_service = get_weather_service()
+        return await weather_service.get_relevant_dates_async(location, condition, days)
+    except Exception as e:
+        print(f"Error: {e}")
+        return []
+
+
+def get_weather_dates_batch(requests: Sequence[Tuple]) -> List[List[str]]:
+    """
+    Relevant dates for many (location, condition, days) requests, one list per request
+    
+    Example:
+        >>> get_weather_dates_batch([("Amritsar", "sunny", 7), ("Amritsar", "rainy", 7), ("Goa", "sunny")])
+        [['2024-01-15'], ['2024-01-17'], ['2024-01-15', '2024-01-16']]
+    """
+    try:
+        return get_weather_service().get_weather_dates_batch(requests)
+    except Exception as e:
+        print(f"Error: {e}")
+        return [[] for _ in requests]
+
+
+async def get_weather_dates_batch_async(requests: Sequence[Tuple]) -> List[List[str]]:
+    """Async variant of get_weather_dates_batch"""
+    try:
+        return await get_weather_service().get_weather_dates_batch_async(requests)
+    except Exception as e:
+        print(f"Error: {e}")
+        return [[] for _ in requests]
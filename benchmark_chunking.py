@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Benchmark of the fixed 500/480 character chunker against the sentence chunker
+
+Builds a synthetic preference corpus (one paragraph per user), chunks it with both chunkers
+streaming from disk, embeds every chunk and then asks for random sentences of the corpus.
+A query is a hit when one of its 3 nearest chunks contains the sentence intact, which is
+what retrieve_context needs to hand the LLM a usable preference.
+
+Usage:
+    python benchmark_chunking.py [users] [--fake-embeddings]
+
+    --fake-embeddings  hashed bag-of-words vectors instead of the embedding model
+"""
+
+import os
+import sys
+import random
+import tempfile
+import time
+import numpy as np
+from Services.chunking import FixedSizeChunker, get_chunker
+from benchmark_user_retrieval import fake_embedding_function, synthetic_preferences
+
+EXTRAS = [
+    "I am allergic to feathers so I need synthetic pillows.",
+    "Late checkout matters more to me than breakfast.",
+    "Please avoid rooms facing the street because I am a light sleeper.",
+    "A kettle in the room is appreciated for early mornings.",
+    "I usually travel with my dog and need pet friendly rooms.",
+    "Quiet floors away from the elevator are preferred.",
+]
+
+
+def build_corpus(path, users, rng):
+    sentences = []
+    with open(path, "w", encoding="utf-8") as f:
+        for _ in range(users):
+            lines = synthetic_preferences(rng).splitlines() + rng.sample(EXTRAS, 2)
+            sentences.extend(lines)
+            f.write("\n".join(lines) + "\n\n")
+    return sentences
+
+
+def run(name, chunker, corpus, sentences, embed, rng, queries=200):
+    start = time.perf_counter()
+    with open(corpus, "r", encoding="utf-8") as f:
+        chunks = list(chunker.iter_chunks(f))
+    chunk_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    vectors = np.asarray(embed(chunks), dtype=np.float32)
+    embed_time = time.perf_counter() - start
+
+    hits = 0
+    for sentence in rng.sample(sentences, queries):
+        query = np.asarray(embed([sentence])[0], dtype=np.float32)
+        top = np.argsort(-(vectors @ query))[:3]
+        # Compare ignoring line breaks, the fixed chunker keeps them while sentences are joined
+        hits += any(sentence in " ".join(chunks[i].split()) for i in top)
+    return name, len(chunks), chunk_time, embed_time, hits / queries
+
+
+if __name__ == "__main__":
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    users = int(args[0]) if args else 2000
+    if "--fake-embeddings" in sys.argv:
+        embed = fake_embedding_function
+    else:
+        from Services.embeddings import get_embedding_function
+        embed = get_embedding_function()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        corpus = os.path.join(workdir, "preferences.txt")
+        sentences = build_corpus(corpus, users, random.Random(users))
+        print(f"Corpus: {users} users, {os.path.getsize(corpus) / 1024:.0f} KiB")
+        results = [
+            run("fixed 500/480", FixedSizeChunker(), corpus, sentences, embed, random.Random(1)),
+            run("sentence", get_chunker("sentence"), corpus, sentences, embed, random.Random(1)),
+        ]
+
+    print(f"\n📊 Chunking ({users} users)")
+    print(f"   {'chunker':<14} {'chunks':>7} {'chunk (s)':>10} {'embed (s)':>10} {'hit@3':>6}")
+    for name, count, chunk_time, embed_time, hit_rate in results:
+        print(f"   {name:<14} {count:>7} {chunk_time:>10.2f} {embed_time:>10.2f} {hit_rate:>6.0%}")
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Benchmark of the embedding backends on the preference corpus
+
+Chunks a synthetic preference corpus with the sentence chunker and embeds it with:
+- "sentence_transformers": the PyTorch model (the default EMBEDDING_RUNTIME)
+- "onnx":                   ONNX Runtime, float32 graph
+- "onnx-int8":              ONNX Runtime, dynamically int8-quantized graph
+Each backend runs in a fresh interpreter, so model load time and peak RSS are its own.
+
+recall@10 compares each backend's 10 nearest chunks for random corpus sentences with those
+of the reference (sentence_transformers when available, else onnx). "fp16" is the same
+backend with its vectors rounded to float16, i.e. what a half-size index would return.
+
+Usage:
+    python benchmark_embedding_backends.py [users] [--backends sentence_transformers,onnx,onnx-int8]
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import resource
+import tempfile
+import subprocess
+import numpy as np
+
+BACKENDS = ["sentence_transformers", "onnx", "onnx-int8"]
+
+
+def load_backend(backend):
+    if backend == "sentence_transformers":
+        from chromadb.utils import embedding_functions
+        from Services.embeddings import EMBEDDING_MODEL
+        return embedding_functions.SentenceTransformerEmbeddingFunction(model_name=EMBEDDING_MODEL)
+    from Services.onnx_embeddings import OnnxEmbeddingFunction
+    return OnnxEmbeddingFunction(quantize=backend == "onnx-int8")
+
+
+# Runs in the child interpreter: embeds chunks and queries, saves the vectors, prints the timings
+def child(backend, workdir):
+    with open(os.path.join(workdir, "corpus.json"), encoding="utf-8") as f:
+        corpus = json.load(f)
+
+    start = time.perf_counter()
+    embed = load_backend(backend)
+    embed(["warmup"])
+    load_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    chunks = np.asarray(embed(corpus["chunks"]), dtype=np.float32)
+    embed_time = time.perf_counter() - start
+    queries = np.asarray(embed(corpus["queries"]), dtype=np.float32)
+
+    np.save(os.path.join(workdir, f"{backend}_chunks.npy"), chunks)
+    np.save(os.path.join(workdir, f"{backend}_queries.npy"), queries)
+    print(json.dumps({"load_s": load_time, "per_s": len(chunks) / embed_time,
+                      "rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024}))
+
+
+def run_backend(backend, workdir):
+    result = subprocess.run([sys.executable, __file__, "--child", backend, workdir], capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError((result.stderr.strip().splitlines() or [f"exit code {result.returncode}"])[-1])
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def top_k(chunks, queries, k=10):
+    scores = queries.astype(np.float32) @ chunks.astype(np.float32).T
+    return np.argpartition(-scores, k, axis=1)[:, :k]
+
+
+def recall(found, expected):
+    return np.mean([len(set(f) & set(e)) / len(e) for f, e in zip(found, expected)])
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["--child"]:
+        child(sys.argv[2], sys.argv[3])
+        sys.exit()
+
+    from Services.chunking import get_chunker
+    from benchmark_chunking import build_corpus
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("users", type=int, nargs="?", default=2000)
+    parser.add_argument("--backends", default=",".join(BACKENDS))
+    args = parser.parse_args()
+    users, backends = args.users, args.backends.split(",")
+
+    with tempfile.TemporaryDirectory() as workdir:
+        path = os.path.join(workdir, "preferences.txt")
+        rng = random.Random(users)
+        sentences = build_corpus(path, users, rng)
+        with open(path, encoding="utf-8") as f:
+            chunks = list(get_chunker("sentence").iter_chunks(f))
+        with open(os.path.join(workdir, "corpus.json"), "w", encoding="utf-8") as f:
+            json.dump({"chunks": chunks, "queries": rng.sample(sentences, 200)}, f)
+        print(f"Corpus: {users} users, {len(chunks)} chunks")
+
+        results = {}
+        for backend in backends:
+            try:
+                results[backend] = run_backend(backend, workdir)
+            except RuntimeError as e:
+                print(f"   {backend}: failed: {e}")
+
+        reference = next((b for b in ["sentence_transformers", "onnx"] if b in results), None)
+        if reference is None:
+            sys.exit("❌ No reference backend (sentence_transformers or onnx) could run")
+        load = lambda backend, part: np.load(os.path.join(workdir, f"{backend}_{part}.npy"))
+        expected = top_k(load(reference, "chunks"), load(reference, "queries"))
+
+        print(f"\n📊 Embedding backends (recall@10 against {reference})")
+        print(f"   {'backend':<22} {'load (s)':>9} {'chunks/s':>9} {'RSS (MB)':>9} {'recall@10':>10} "
+              f"{'fp16 recall':>12} {'index f32/f16 (MB)':>19}")
+        for backend, stats in results.items():
+            vectors, queries = load(backend, "chunks"), load(backend, "queries")
+            half = vectors.astype(np.float16)
+            print(f"   {backend:<22} {stats['load_s']:>9.2f} {stats['per_s']:>9.0f} {stats['rss_mb']:>9.0f} "
+                  f"{recall(top_k(vectors, queries), expected):>10.1%} "
+                  f"{recall(top_k(half, queries.astype(np.float16)), expected):>12.1%} "
+                  f"{vectors.nbytes / 2 ** 20:>9.2f} / {half.nbytes / 2 ** 20:<7.2f}")
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Benchmark of the daily forecast roll-up: per-slot Python loop vs NumPy columnar path
+
+Usage:
+    python benchmark_forecast_aggregation.py [cities]
+"""
+
+import sys
+import random
+import time
+from Services.forecast_aggregation import aggregate_daily_loop, aggregate_daily_columnar, aggregate_daily_columnar_batch
+
+CONDITIONS = [
+    (800, "Clear", "clear sky"),
+    (802, "Clouds", "scattered clouds"),
+    (500, "Rain", "light rain"),
+    (300, "Drizzle", "drizzle"),
+    (211, "Thunderstorm", "thunderstorm"),
+    (701, "Mist", "mist"),
+]
+
+
+def make_forecast(seed, slots=40, start=1_755_475_200):
+    """Synthetic /forecast "list" with the same shape as OpenWeatherMap's (40 x 3-hour slots)"""
+    rng = random.Random(seed)
+    items = []
+    for i in range(slots):
+        code, main, description = rng.choice(CONDITIONS)
+        items.append({
+            "dt": start + i * 3 * 3600,
+            "main": {"temp": round(rng.uniform(10, 40), 2), "humidity": rng.randint(20, 95)},
+            "weather": [{"id": code, "main": main, "description": description}],
+        })
+    return items
+
+
+def run(aggregate, forecasts):
+    start = time.perf_counter()
+    results = [aggregate(items) for items in forecasts]
+    return results, time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    cities = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    forecasts = [make_forecast(seed) for seed in range(cities)]
+
+    # Warm up both paths once
+    aggregate_daily_loop(forecasts[0])
+    aggregate_daily_columnar(forecasts[0])
+
+    loop_results, loop_time = run(aggregate_daily_loop, forecasts)
+    columnar_results, columnar_time = run(aggregate_daily_columnar, forecasts)
+    start = time.perf_counter()
+    batch_results = aggregate_daily_columnar_batch(forecasts)
+    batch_time = time.perf_counter() - start
+    assert loop_results == columnar_results, "columnar aggregation differs from the loop"
+    assert loop_results == batch_results, "batched columnar aggregation differs from the loop"
+
+    print(f"📊 Daily aggregation of {cities} forecasts ({cities * 40} slots)")
+    print(f"   Python loop: {loop_time * 1000:.1f} ms ({loop_time / cities * 1e6:.1f} µs/forecast)")
+    print(f"   NumPy:       {columnar_time * 1000:.1f} ms ({columnar_time / cities * 1e6:.1f} µs/forecast)")
+    print(f"   NumPy batch: {batch_time * 1000:.1f} ms ({batch_time / cities * 1e6:.1f} µs/forecast)")
+    print(f"   Speedup:     {loop_time / columnar_time:.2f}x per forecast, {loop_time / batch_time:.2f}x batched")
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Benchmark of the two-call extraction (process_query + generate_hotel_preferences) against the
+fused single call (extract_trip_and_hotel_preferences)
+
+Runs each query through both paths with the response caches disabled and reports Gemini
+calls, prompt/response tokens and wall time per plan.
+
+Usage:
+    python benchmark_fused_extraction.py [--stub]
+
+    --stub  simulated Gemini (STUB_BASE_MS + STUB_MS_PER_TOKEN per prompt/response token)
+            instead of the API, to compare round trips without a GOOGLE_API_KEY
+"""
+
+import sys
+import json
+import time
+import asyncio
+import statistics
+from Services import hotel_service, llm_service
+from Services.chunking import estimate_tokens
+from Services.llm_cache import LLMResponseCache
+
+QUERIES = [
+    "Plan a trip from Bangalore to Goa on a sunny weekend",
+    "Book a flight from Delhi to Manali on a snowy day this month",
+    "I want to travel from Mumbai to Amritsar, Punjab on a rainy day",
+    "Find a 5-star hotel with a spa in Udaipur for next weekend",
+]
+
+STUB_BASE_MS = 400
+STUB_MS_PER_TOKEN = 1.5
+
+calls = []
+
+
+def stub_answer(prompt):
+    if "is_trip" in prompt:
+        return json.dumps({
+            "is_trip": True, "message": None,
+            "trip": {"source": "Bangalore", "destination": "Goa", "weather_preference": "sunny",
+                     "travel_dates": "weekend", "other_info": None},
+            "hotel_preferences": {"location": "Goa", "stay_dates": None,
+                                  "hotel_preferences": {"rating": "4", "amenities": ["pool", "gym"], "price_range": "under 5000"}},
+        })
+    if "extracts hotel preferences" in prompt:
+        return json.dumps({"location": "Goa", "stay_dates": None,
+                           "hotel_preferences": {"rating": "4", "amenities": ["pool", "gym"], "price_range": "under 5000"}})
+    return json.dumps({"source": "Bangalore", "destination": "Goa", "weather_preference": "sunny",
+                       "travel_dates": "weekend", "hotel_preferences": None, "other_info": None})
+
+
+def counting(generate_async, stub):
+    async def wrapper(prompt, model_name, generation_config):
+        if stub:
+            text = stub_answer(prompt)
+            await asyncio.sleep((STUB_BASE_MS + STUB_MS_PER_TOKEN * (estimate_tokens(prompt) + estimate_tokens(text))) / 1000)
+        else:
+            text = await generate_async(prompt, model_name, generation_config)
+        calls.append((estimate_tokens(prompt), estimate_tokens(text)))
+        return text
+    return wrapper
+
+
+async def two_calls(query, context):
+    await llm_service.process_query_async(query)
+    await hotel_service.generate_hotel_preferences_async(context)
+
+
+async def fused(query, context):
+    await llm_service.extract_trip_and_hotel_preferences_async(query, context)
+
+
+async def measure(name, path, context):
+    times = []
+    calls.clear()
+    for query in QUERIES:
+        start = time.perf_counter()
+        await path(query, context)
+        times.append((time.perf_counter() - start) * 1000)
+    plans = len(QUERIES)
+    return (name, len(calls) / plans, sum(c[0] for c in calls) / plans,
+            sum(c[1] for c in calls) / plans, statistics.median(times))
+
+
+async def main(stub):
+    # Every call goes to the model: no intent cache, and a response cache that never hits
+    llm_service.SEMANTIC_CACHE_ENABLED = False
+    never_hits = LLMResponseCache(":memory:", ttl=-1)
+    llm_service.get_llm_cache = hotel_service.get_llm_cache = lambda: never_hits
+    llm_service.generate_async = counting(llm_service.generate_async, stub)
+    hotel_service.generate_async = counting(hotel_service.generate_async, stub)
+
+    with open("hotel_preferences.txt", "r", encoding="utf-8") as f:
+        context = f.read()
+
+    return [
+        await measure("two calls", two_calls, context),
+        await measure("fused", fused, context),
+    ]
+
+
+if __name__ == "__main__":
+    stub = "--stub" in sys.argv
+    results = asyncio.run(main(stub))
+
+    print(f"\n📊 Extraction per plan ({'stubbed' if stub else 'Gemini'}, {len(QUERIES)} queries)")
+    print(f"   {'path':<10} {'calls':>6} {'prompt tok':>11} {'output tok':>11} {'p50 (ms)':>9}")
+    for name, n_calls, prompt_tokens, output_tokens, p50 in results:
+        print(f"   {name:<10} {n_calls:>6.1f} {prompt_tokens:>11.0f} {output_tokens:>11.0f} {p50:>9.0f}")
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Benchmark of vector versus hybrid (vector + BM25) retrieval of hotel preference context
+
+Every synthetic user has one chunk per field HOTEL_PREFERENCES_PROMPT asks for (location,
+stay dates, rating, amenities, price range) and a few chunks of unrelated travel chatter.
+The field chunks are written the way people describe their stays ("Four stars at least",
+"Can spend up to 5000 rupees a night"), in several phrasings each.
+
+Every user also makes one trip request, given as the intent process_query would extract:
+a destination (the user's stored city half of the time, another one otherwise) and, each
+with probability 1/2, travel dates, a star rating, amenities and a budget, drawn independently
+of the user's stored preferences. Both modes retrieve the context generate_hotel_preferences
+gets for it, as the default planner asks for it (retrieve_context's default query, plus the
+request's hotel_constraints in hybrid mode), and are scored on:
+- field coverage: share of the user's field chunks in the context, i.e. facts the LLM can extract
+- filler: share of the context that is chatter instead of field chunks
+- chunks and prompt tokens sent to Gemini (estimated, HOTEL_PREFERENCES_PROMPT included)
+
+Usage:
+    python benchmark_hybrid_retrieval.py [users] [--fake-embeddings]
+
+    --fake-embeddings  hashed bag-of-words vectors instead of the embedding model
+"""
+
+import os
+import sys
+import random
+import tempfile
+import statistics
+import chromadb
+from Services import hotel_service
+from Services.chunking import estimate_tokens
+from Services.lexical_index import LexicalIndex
+from benchmark_user_retrieval import AMENITIES, CITIES, fake_embedding_function
+
+# Several phrasings per field, none of them using the field's name from the prompt
+FIELD_PHRASINGS = {
+    "location": ["We want to be somewhere in {city}.", "Thinking of {city} this time.",
+                 "Somewhere around {city} would be perfect."],
+    "stay_dates": ["Travelling {when}.", "We can only get away {when}.", "Planning to go {when}."],
+    "rating": ["{stars} stars at least.", "Nothing below {stars} stars please.", "A {stars}-star place is fine."],
+    "amenities": ["Must have {amenities}.", "We need {amenities} where we sleep.", "{amenities} are a must."],
+    "price_range": ["Can spend up to {budget} rupees a night.", "Nothing over {budget} rupees nightly.",
+                    "Our limit is {budget} rupees for each night."],
+}
+WHEN = ["next weekend", "this month", "during Diwali", "over the school break"]
+STARS = {3: "Three", 4: "Four", 5: "Five"}
+BUDGETS = [2000, 3500, 5000, 8000]
+
+FILLER = [
+    "I always carry a book for the flight.",
+    "My family enjoys trying street food in every new city.",
+    "Last year we visited the mountains and loved the views.",
+    "I usually take photos of old buildings.",
+    "We like to plan our days loosely and stay flexible.",
+    "My kids get excited about train journeys.",
+    "I prefer window seats on long drives.",
+    "Evenings are for calling friends back home.",
+]
+
+
+def preference_chunks(rng):
+    values = {
+        "city": rng.choice(CITIES),
+        "when": rng.choice(WHEN),
+        "stars": rng.choice(list(STARS.values())),
+        "amenities": ", ".join(rng.sample(AMENITIES, 3)),
+        "budget": rng.choice(BUDGETS),
+    }
+    chunks = [rng.choice(phrasings).format(**values) for phrasings in FIELD_PHRASINGS.values()]
+    return values["city"], [chunk[0].upper() + chunk[1:] for chunk in chunks]
+
+
+# The intent process_query would extract from the user's trip request
+def trip_request(rng, city):
+    hotel = {}
+    if rng.random() < 0.5:
+        hotel["rating"] = rng.choice(list(STARS))
+    if rng.random() < 0.5:
+        hotel["amenities"] = rng.sample(AMENITIES, rng.randint(1, 2))
+    if rng.random() < 0.5:
+        hotel["price_range"] = f"under {rng.choice(BUDGETS)} rupees"
+    return {
+        "source": "Delhi",
+        "destination": city if rng.random() < 0.5 else rng.choice(CITIES),
+        "weather_preference": rng.choice(["sunny", "rainy", "cloudy"]),
+        "travel_dates": rng.choice(WHEN) if rng.random() < 0.5 else None,
+        "hotel_preferences": hotel or None,
+    }
+
+
+def run(mode, users):
+    hotel_service.RETRIEVAL_MODE = mode
+    hotel_service.retrieval_cache.clear()
+    coverage, filler, chunks, tokens = [], [], [], []
+    for user_id, (facts, trip) in users.items():
+        context = hotel_service.retrieve_context(user_id=user_id, constraints=hotel_service.hotel_constraints(trip))
+        lines = context.split("\n") if context else []
+        found = sum(fact in lines for fact in facts)
+        coverage.append(found / len(facts))
+        filler.append((len(lines) - found) / len(lines) if lines else 0.0)
+        chunks.append(len(lines))
+        tokens.append(estimate_tokens(hotel_service.HOTEL_PREFERENCES_PROMPT.format(context=context)))
+    return statistics.mean(coverage), statistics.mean(filler), statistics.mean(chunks), statistics.mean(tokens)
+
+
+if __name__ == "__main__":
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    count = int(args[0]) if args else 200
+    if "--fake-embeddings" in sys.argv:
+        hotel_service.get_embedding_function = lambda: fake_embedding_function
+
+    rng = random.Random(count)
+    with tempfile.TemporaryDirectory() as workdir:
+        client = chromadb.PersistentClient(path=os.path.join(workdir, "chroma"))
+        hotel_service._collection = client.get_or_create_collection(name="bench_hybrid", embedding_function=None)
+        lexical_index = LexicalIndex(os.path.join(workdir, "lexical.sqlite3"))
+        hotel_service.get_lexical_index = lambda: lexical_index
+        hotel_service.RETRIEVAL_MODE = "hybrid"
+
+        users = {}
+        for user_id in range(count):
+            city, facts = preference_chunks(rng)
+            chunks = facts + rng.sample(FILLER, rng.randint(3, 6))
+            rng.shuffle(chunks)
+            hotel_service._sync_sources([{"source": f"user_{user_id}.txt", "chunks": chunks,
+                                          "id_prefix": f"user_{user_id}_chunk", "user_id": user_id}])
+            users[user_id] = (facts, trip_request(rng, city))
+
+        results = [(mode, *run(mode, users)) for mode in ("vector", "hybrid")]
+
+    print(f"\n📊 Hotel preference context ({count} users, 5 field chunks + 3-6 filler chunks each)")
+    print(f"   {'mode':<8} {'field coverage':>15} {'filler':>7} {'chunks':>7} {'prompt tokens':>14}")
+    for mode, coverage, filler, chunks, tokens in results:
+        print(f"   {mode:<8} {coverage:>15.1%} {filler:>7.1%} {chunks:>7.2f} {tokens:>14.1f}")
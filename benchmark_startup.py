@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+"""
+Cold start benchmark for the planner's modules
+
+Each measurement runs in a fresh interpreter:
+- "lazy import":  importing index + hotel_service, which is what app.py / planner.py pay
+                  before the first prompt is handled
+- "eager import": the same plus hotel_service.warmup(), i.e. building Gemini, ChromaDB and
+                  the SentenceTransformer model up front like the modules used to at import
+
+Usage:
+    python benchmark_startup.py [runs]
+"""
+
+import sys
+import subprocess
+import statistics
+
+SNIPPETS = {
+    "lazy import": "import index, Services.hotel_service",
+    "eager import": "import index, Services.hotel_service as h; h.warmup()",
+}
+
+
+def measure(snippet):
+    code = f"import time; t = time.perf_counter(); {snippet}; print(time.perf_counter() - t)"
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+if __name__ == "__main__":
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+
+    print(f"🚀 Cold start, median of {runs} fresh interpreters")
+    for name, snippet in SNIPPETS.items():
+        try:
+            times = [measure(snippet) for _ in range(runs)]
+            print(f"   {name:<13} {statistics.median(times) * 1000:8.1f} ms")
+        except RuntimeError as e:
+            print(f"   {name:<13} failed: {e}")
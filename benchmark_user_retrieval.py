@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Benchmark of per-user preference retrieval latency versus the number of indexed users
+
+Builds a synthetic preference corpus for each size in a temporary ChromaDB, bulk indexes it
+with bulk_index_preferences and times retrieve_context(query, user_id) for random users.
+
+Usage:
+    python benchmark_user_retrieval.py [sizes...] [--fake-embeddings]
+
+    --fake-embeddings  hashed bag-of-words vectors instead of the embedding model, to measure
+                       the index / filter cost alone (and to run without downloading a model)
+    --vector-index     serve users from the memory-mapped exact index (Services/vector_index.py)
+                       instead of ChromaDB; results are not cached, so each query is searched
+"""
+
+import os
+import sys
+import json
+import random
+import hashlib
+import tempfile
+import statistics
+import time
+import chromadb
+from Services import hotel_service
+from Services.vector_index import VectorIndex
+
+CITIES = ["Amritsar, Punjab", "Goa", "Manali", "Jaipur", "Shimla", "Udaipur", "Rishikesh", "Kochi"]
+AMENITIES = ["pool", "gym", "breakfast", "spa", "free parking", "airport shuttle", "sea view", "wifi"]
+QUERIES = ["hotel preferences", "budget", "amenities like pool and gym", "preferred location"]
+
+
+def synthetic_preferences(rng):
+    amenities = ", ".join(rng.sample(AMENITIES, 3))
+    return (
+        f"User prefers {rng.randint(3, 5)}-star hotels with amenities like {amenities}.\n"
+        f"Budget should be under {rng.choice([2000, 3500, 5000, 8000, 12000])} rupees.\n"
+        f"Location is {rng.choice(CITIES)}.\n"
+        f"Stay dates are {rng.choice(['next weekend', 'this month', 'during Diwali'])}.\n"
+    )
+
+
+def fake_embedding_function(texts, dims=384):
+    vectors = []
+    for text in texts:
+        vector = [0.0] * dims
+        for word in text.lower().split():
+            vector[int(hashlib.md5(word.encode()).hexdigest(), 16) % dims] += 1.0
+        norm = sum(v * v for v in vector) ** 0.5 or 1.0
+        vectors.append([v / norm for v in vector])
+    return vectors
+
+
+def run(users, workdir, queries=200):
+    rng = random.Random(users)
+    corpus = os.path.join(workdir, f"preferences_{users}.jsonl")
+    with open(corpus, "w", encoding="utf-8") as f:
+        for user_id in range(users):
+            f.write(json.dumps({"user_id": user_id, "text": synthetic_preferences(rng)}) + "\n")
+
+    client = chromadb.PersistentClient(path=os.path.join(workdir, f"chroma_{users}"))
+    hotel_service._collection = client.get_or_create_collection(name=f"bench_{users}", embedding_function=None)
+    if "--vector-index" in sys.argv:
+        hotel_service.vector_index = VectorIndex(os.path.join(workdir, f"vectors_{users}"))
+
+    start = time.perf_counter()
+    hotel_service.bulk_index_preferences(corpus)
+    index_time = time.perf_counter() - start
+
+    latencies = []
+    for _ in range(queries):
+        user_id = rng.randrange(users)
+        if "--vector-index" in sys.argv:
+            hotel_service.retrieval_cache.invalidate()
+        start = time.perf_counter()
+        context = hotel_service.retrieve_context(rng.choice(QUERIES), user_id=user_id)
+        latencies.append((time.perf_counter() - start) * 1000)
+        assert context, f"no context for user {user_id}"
+
+    latencies.sort()
+    return index_time, statistics.median(latencies), latencies[int(len(latencies) * 0.95) - 1]
+
+
+if __name__ == "__main__":
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    sizes = [int(a) for a in args] or [100, 1000, 5000]
+    if "--fake-embeddings" in sys.argv:
+        hotel_service.get_embedding_function = lambda: fake_embedding_function
+
+    results = []
+    with tempfile.TemporaryDirectory() as workdir:
+        for users in sizes:
+            results.append((users, *run(users, workdir)))
+
+    print(f"\n📊 retrieve_context(query, user_id) latency")
+    print(f"   {'users':>7} {'index (s)':>10} {'p50 (ms)':>9} {'p95 (ms)':>9}")
+    for users, index_time, p50, p95 in results:
+        print(f"   {users:>7} {index_time:>10.1f} {p50:>9.2f} {p95:>9.2f}")
@@ -0,0 +1,88 @@
+"""
+    Embedding server: one model instance for every process on the host
+
+    uvicorn embedding_server:app --host 127.0.0.1 --port 8100
+    uvicorn embedding_server:app --uds /tmp/trip-planner-embeddings.sock
+    # or: python embedding_server.py   (EMBEDDING_SERVER_HOST, EMBEDDING_SERVER_PORT, EMBEDDING_SERVER_SOCKET)
+
+    Clients (planner, server.py workers, indexing jobs) set EMBEDDING_BACKEND=remote and
+    EMBEDDING_SERVER_URL (http://127.0.0.1:8100 or unix:///tmp/trip-planner-embeddings.sock)
+    instead of each loading SentenceTransformer. Requests arriving together are embedded in one
+    forward pass: a batch closes at EMBEDDING_SERVER_MAX_BATCH requests or
+    EMBEDDING_SERVER_MAX_WAIT_MS after its first request, whichever comes first.
+
+    POST /embed   {"texts": ["...", "..."]}  ->  {"embeddings": [[...], [...]]}
+    GET  /health
+"""
+
+import os
+import asyncio
+import threading
+from contextlib import asynccontextmanager
+from typing import List
+from dotenv import load_dotenv
+from fastapi import FastAPI
+from pydantic import BaseModel
+from Services import embeddings
+from Services.batching import MicroBatcher
+
+load_dotenv()
+
+EMBEDDING_SERVER_HOST = os.getenv("EMBEDDING_SERVER_HOST", "127.0.0.1")
+EMBEDDING_SERVER_PORT = int(os.getenv("EMBEDDING_SERVER_PORT", "8100"))
+# Listen on this Unix socket instead of host:port when set
+EMBEDDING_SERVER_SOCKET = os.getenv("EMBEDDING_SERVER_SOCKET")
+# Requests per model call, and how long the first request of a batch waits for company
+EMBEDDING_SERVER_MAX_BATCH = int(os.getenv("EMBEDDING_SERVER_MAX_BATCH", "64"))
+EMBEDDING_SERVER_MAX_WAIT_MS = float(os.getenv("EMBEDDING_SERVER_MAX_WAIT_MS", "5"))
+
+# One forward pass at a time: concurrent passes on a CPU only compete for the same cores
+_model_lock = threading.Lock()
+
+
+class EmbedRequest(BaseModel):
+    texts: List[str]
+
+
+def _embed_texts(items):
+    # Always the in-process model, whatever EMBEDDING_BACKEND says (the server is the remote backend)
+    embed = embeddings.get_local_embedding_function()
+    with _model_lock:
+        return [[[float(x) for x in vector] for vector in vectors] for vectors in embeddings.embed_batch(embed, items)]
+
+
+async def _embed_batch(items):
+    return await asyncio.to_thread(_embed_texts, items)
+
+
+batcher = MicroBatcher(_embed_batch, max_batch_size=EMBEDDING_SERVER_MAX_BATCH, max_wait_ms=EMBEDDING_SERVER_MAX_WAIT_MS)
+
+
+@asynccontextmanager
+async def lifespan(app):
+    # Load the model before taking traffic
+    await asyncio.to_thread(_embed_texts, [["warmup"]])
+    yield
+
+
+app = FastAPI(title="Trip Planner embeddings", lifespan=lifespan)
+
+
+@app.post("/embed")
+async def embed(request: EmbedRequest):
+    if not request.texts:
+        return {"embeddings": []}
+    return {"embeddings": await batcher.submit(request.texts)}
+
+
+@app.get("/health")
+async def health():
+    return {"status": "ok", "model": embeddings.EMBEDDING_MODEL, "batching": batcher.stats()}
+
+
+if __name__ == "__main__":
+    import uvicorn
+    if EMBEDDING_SERVER_SOCKET:
+        uvicorn.run("embedding_server:app", uds=EMBEDDING_SERVER_SOCKET)
+    else:
+        uvicorn.run("embedding_server:app", host=EMBEDDING_SERVER_HOST, port=EMBEDDING_SERVER_PORT)
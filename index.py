@@ -1,18 +1,26 @@
 import os 
 import httpx 
 import json
-from Services.llm_service import process_query
-from Services.weather_service import get_weather_dates
-from Services.db_service import get_holidays_dates
+from Services.llm_service import process_query, process_query_async
+from Services.weather_service import get_weather_dates, get_weather_dates_async
+from Services.db_service import get_common_available_dates
+from Services.calendar_cache import get_cached_holidays_dates, get_cached_holidays_dates_async
 from dotenv import load_dotenv 
-from openai import OpenAI 
 
 #Load environment variables from .env file 
 load_dotenv() 
 api_key = os.getenv("OPENAI_API_KEY") 
 
-# Create client with custom timeout settings 
-client = OpenAI( api_key=api_key, timeout=httpx.Timeout(60.0, connect=10.0) ) 
+_client = None
+
+# Create client with custom timeout settings on first use (nothing calls OpenAI yet,
+# so there is no reason to pay for importing and building it at startup)
+def get_openai_client():
+    global _client
+    if _client is None:
+        from openai import OpenAI
+        _client = OpenAI( api_key=api_key, timeout=httpx.Timeout(60.0, connect=10.0) )
+    return _client
 
 # Function to get response from LLM
 def get_response_from_llm(prompt): 
@@ -20,25 +28,40 @@ def get_response_from_llm(prompt):
     # In future, I will call LLM to get the response
     try: 
         response = process_query(prompt)
-        print(f"1.) Fetching response from LLM for the prompt: {prompt}")
-        print(f"Raw LLM response: {response}")
-        parsed_response = json.loads(response)
-        
-        if parsed_response["status"] == "success":
-            # If the data is a string (error message), return it as is
-            if isinstance(parsed_response["data"], str):
-                return parsed_response["data"]
-            # If the data is a dict (successful trip planning), return the parsed data
-            else:
-                return parsed_response["data"]
-        else:
-            return parsed_response.get("message", "Unknown error occurred")
+        return parse_llm_response(prompt, response)
             
     except Exception as e: 
         print(f"Error occurred: {e}") 
         return None 
 
 
+# Async variant of get_response_from_llm (awaits Gemini instead of blocking a thread)
+async def get_response_from_llm_async(prompt):
+    try:
+        response = await process_query_async(prompt)
+        return parse_llm_response(prompt, response)
+
+    except Exception as e:
+        print(f"Error occurred: {e}")
+        return None
+
+
+def parse_llm_response(prompt, response):
+    print(f"1.) Fetching response from LLM for the prompt: {prompt}")
+    print(f"Raw LLM response: {response}")
+    parsed_response = json.loads(response)
+    
+    if parsed_response["status"] == "success":
+        # If the data is a string (error message), return it as is
+        if isinstance(parsed_response["data"], str):
+            return parsed_response["data"]
+        # If the data is a dict (successful trip planning), return the parsed data
+        else:
+            return parsed_response["data"]
+    else:
+        return parsed_response.get("message", "Unknown error occurred")
+
+
 # Function to get relevant dates based on weather condition
 # This function receives a destination and a weather condition in string format
 # and returns a list of relevant dates.
@@ -58,17 +81,52 @@ def get_relevant_dates_based_on_weather(destination, condition, days = 30):
         return []
 
 
+# Async variant of get_relevant_dates_based_on_weather, uses the pooled async HTTP client
+async def get_relevant_dates_based_on_weather_async(destination, condition, days = 30):
+    try:
+        print(f"2.) Fetching relevant dates for {destination} with condition {condition}")
+        relevant_dates = await get_weather_dates_async(destination, condition, days)
+        print(f"Relevant dates: {relevant_dates}")
+        return relevant_dates
+    except Exception as e:
+        print(f"Error occurred while fetching dates: {e}")
+        return []
+
+
 # Function to get available dates from your calendar
 def get_available_dates(employee_id):
     # Right now, I'm returning static response without querying calendar to build my app
     # In future, I will query calendar to get the available dates
     try:
         print(f"3.) Querying calendar for employee ID: {employee_id}")
-        available_dates = get_holidays_dates(employee_id)
+        available_dates = get_cached_holidays_dates(employee_id)
         return available_dates
     except Exception as e:
         print(f"Error occurred while fetching available dates: {e}")
         return []
+
+
+# Async variant of get_available_dates, misses are loaded through the asyncpg pool
+async def get_available_dates_async(employee_id):
+    try:
+        print(f"3.) Querying calendar for employee ID: {employee_id}")
+        available_dates = await get_cached_holidays_dates_async(employee_id)
+        return available_dates
+    except Exception as e:
+        print(f"Error occurred while fetching available dates: {e}")
+        return []
+
+
+
+# Function to get the dates a whole team is free on, among the dates with the right weather
+# Returns {"dates": [...], "windows": [{"start", "end", "days"}, ...]} computed in SQL
+def get_team_available_dates(employee_ids, relevant_dates=None, min_window=1):
+    try:
+        print(f"3.) Querying calendar for employee IDs: {employee_ids}")
+        return get_common_available_dates(employee_ids, relevant_dates, min_window=min_window)
+    except Exception as e:
+        print(f"Error occurred while fetching team available dates: {e}")
+        return {"dates": [], "windows": []}
     
 
 # Function to search for hotels with rating > 4 on available sunny days
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Load test of the HTTP service (server.py) against local stubs of the external APIs
+
+The app runs in-process behind httpx's ASGI transport with:
+    Gemini          stub model answering after --llm-ms (streaming in 4 chunks)
+    OpenWeatherMap  httpx.MockTransport answering after --weather-ms
+    Postgres        the SQLite stand-in (DB_BACKEND=sqlite) in a temporary file
+    MiniLM          hashed bag-of-words vectors
+so the numbers measure the service itself: batching, caching, pools and the event loop.
+
+Usage:
+    python loadtest.py [--endpoint plan|weather|holidays|mixed] [--concurrency 32] [--requests 500]
+                       [--llm-ms 300] [--weather-ms 80]
+"""
+
+import os
+import io
+import json
+import time
+import atexit
+import shutil
+import random
+import sqlite3
+import asyncio
+import argparse
+import tempfile
+import statistics
+import contextlib
+from datetime import date, timedelta
+
+WORKDIR = tempfile.mkdtemp(prefix="loadtest_")
+atexit.register(shutil.rmtree, WORKDIR, ignore_errors=True)
+# Configure the services for the stubs before they are imported
+os.environ.update({
+    "OPENWEATHER_API_KEY": "stub",
+    "GOOGLE_API_KEY": "stub",
+    "DB_BACKEND": "sqlite",
+    "DB_SQLITE_PATH": os.path.join(WORKDIR, "holidays.sqlite3"),
+    "HOLIDAY_CACHE_LISTEN": "false",
+    "WEATHER_CACHE_PATH": os.path.join(WORKDIR, "weather_cache.sqlite3"),
+    "LLM_CACHE_PATH": os.path.join(WORKDIR, "llm_cache.sqlite3"),
+    "SERVER_WARMUP": "false",
+})
+
+import httpx
+import chromadb
+import server
+from Services import embeddings, hotel_service, llm_client, weather_service
+from benchmark_user_retrieval import fake_embedding_function
+
+CITIES = {"Goa": (15.49, 73.82), "Manali": (32.24, 77.19), "Jaipur": (26.91, 75.79), "Shimla": (31.10, 77.17),
+          "Udaipur": (24.58, 73.71), "Kochi": (9.93, 76.26), "Amritsar": (31.63, 74.87), "Rishikesh": (30.09, 78.27)}
+CONDITIONS = ["sunny", "rainy", "cloudy"]
+WEATHER = [(800, "Clear", "clear sky"), (500, "Rain", "light rain"), (803, "Clouds", "broken clouds")]
+EMPLOYEES = range(1001, 1051)
+
+
+class StubModel:
+    """Answers like Gemini would, after llm_ms"""
+
+    llm_ms = 300
+
+    async def generate_content_async(self, prompt, stream=False):
+        text = self._answer(prompt)
+        if not stream:
+            await asyncio.sleep(self.llm_ms / 1000)
+            return type("Response", (), {"text": text})()
+        return self._stream(text)
+
+    async def _stream(self, text):
+        size = len(text) // 4 + 1
+        for i in range(0, len(text), size):
+            await asyncio.sleep(self.llm_ms / 4000)
+            yield type("Chunk", (), {"text": text[i:i + size]})()
+
+    @staticmethod
+    def _answer(prompt):
+        if "extracts hotel preferences" in prompt:
+            return json.dumps({"location": "Goa", "stay_dates": None,
+                               "hotel_preferences": {"rating": 4, "amenities": ["pool"], "price_range": "under 5000"}})
+        query = prompt.rsplit("User query:", 1)[-1]
+        city = next((c for c in CITIES if c in query), "Goa")
+        condition = next((c for c in CONDITIONS if c in query), "sunny")
+        return json.dumps({"source": "Delhi", "destination": city, "weather_preference": condition,
+                           "travel_dates": None, "hotel_preferences": None, "other_info": None})
+
+
+def make_weather_transport(weather_ms):
+    async def handler(request):
+        await asyncio.sleep(weather_ms / 1000)
+        if request.url.path.endswith("/direct"):
+            city = request.url.params["q"]
+            lat, lon = CITIES.get(city, (20.0, 78.0))
+            return httpx.Response(200, json=[{"lat": lat, "lon": lon, "name": city, "country": "IN"}])
+        rng = random.Random(request.url.params["lat"])
+        start = int(time.time()) // 10800 * 10800
+        items = []
+        for i in range(40):
+            code, main, description = rng.choice(WEATHER)
+            items.append({"dt": start + i * 10800, "weather": [{"id": code, "main": main, "description": description}],
+                          "main": {"temp": rng.uniform(15, 35), "humidity": rng.randint(30, 90)}})
+        return httpx.Response(200, json={"list": items})
+    return httpx.MockTransport(handler)
+
+
+def setup_stubs(llm_ms, weather_ms):
+    StubModel.llm_ms = llm_ms
+    llm_client.get_model = lambda model_name, generation_config: StubModel()
+
+    transport = make_weather_transport(weather_ms)
+    service = weather_service.get_weather_service()
+    service.get_async_client = lambda: service._async_clients.setdefault(
+        asyncio.get_running_loop(), httpx.AsyncClient(transport=transport))
+
+    conn = sqlite3.connect(os.environ["DB_SQLITE_PATH"])
+    conn.execute("CREATE TABLE holidays_table (employee_id INTEGER, holidays TEXT)")
+    conn.executemany("INSERT INTO holidays_table VALUES (?, ?)", [
+        (employee_id, (date.today() + timedelta(days=d)).isoformat())
+        for employee_id in EMPLOYEES for d in random.Random(employee_id).sample(range(1, 6), 3)
+    ])
+    conn.commit()
+    conn.close()
+
+    embeddings._embedding_function = fake_embedding_function
+    hotel_service._collection = chromadb.EphemeralClient().get_or_create_collection(
+        name="loadtest_preferences", embedding_function=None)
+
+
+def make_request(endpoint, rng):
+    city, condition = rng.choice(list(CITIES)), rng.choice(CONDITIONS)
+    if endpoint == "mixed":
+        endpoint = rng.choice(["plan", "weather", "holidays"])
+    if endpoint == "plan":
+        return endpoint, "POST", "/plan", {"prompt": f"Plan a trip from Delhi to {city} on a {condition} day",
+                                           "employee_id": rng.choice(EMPLOYEES)}
+    if endpoint == "weather":
+        return endpoint, "POST", "/weather/dates", {"location": city, "condition": condition, "days": 5}
+    return endpoint, "GET", f"/holidays/{rng.choice(EMPLOYEES)}", None
+
+
+async def run(endpoint, concurrency, total):
+    latencies = {}
+    rng = random.Random(0)
+    requests = [make_request(endpoint, rng) for _ in range(total)]
+
+    async with server.lifespan(server.app):
+        transport = httpx.ASGITransport(app=server.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://loadtest", timeout=60) as client:
+            async def worker():
+                while requests:
+                    name, method, path, body = requests.pop()
+                    start = time.perf_counter()
+                    response = await client.request(method, path, json=body)
+                    response.raise_for_status()
+                    latencies.setdefault(name, []).append((time.perf_counter() - start) * 1000)
+
+            start = time.perf_counter()
+            await asyncio.gather(*(worker() for _ in range(concurrency)))
+            elapsed = time.perf_counter() - start
+            health = (await client.get("/health")).json()
+    return latencies, elapsed, health
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p / 100))]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--endpoint", default="mixed", choices=["plan", "weather", "holidays", "mixed"])
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--llm-ms", type=float, default=300)
+    parser.add_argument("--weather-ms", type=float, default=80)
+    args = parser.parse_args()
+
+    setup_stubs(args.llm_ms, args.weather_ms)
+    # The pipeline logs every step, keep the report readable
+    with contextlib.redirect_stdout(io.StringIO()):
+        latencies, elapsed, health = asyncio.run(run(args.endpoint, args.concurrency, args.requests))
+
+    print(f"\n📊 {args.requests} requests, concurrency {args.concurrency}, "
+          f"stub latency LLM {args.llm_ms:.0f} ms / weather {args.weather_ms:.0f} ms")
+    print(f"   {'endpoint':<10} {'requests':>8} {'p50 (ms)':>9} {'p99 (ms)':>9}")
+    for name, values in sorted(latencies.items()):
+        print(f"   {name:<10} {len(values):>8} {statistics.median(values):>9.1f} {percentile(values, 99):>9.1f}")
+    print(f"   throughput: {args.requests / elapsed:.1f} requests/s")
+    print(f"   batching: {json.dumps(health['batching'])}")
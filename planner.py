@@ -0,0 +1,239 @@
+import os
+import asyncio
+import json
+import time
+import index as index
+from Services.hotel_service import (
+    load_and_index_preferences, retrieve_context, generate_hotel_preferences, generate_hotel_preferences_async,
+    hotel_constraints
+)
+from Services.llm_service import extract_trip_and_hotel_preferences_async, process_query_stream_async
+from Services.weather_service import aclose_weather_service
+
+# Fused mode retrieves the preference context first and extracts the trip entities and the
+# hotel preferences in a single Gemini call instead of two
+PLANNER_FUSED_EXTRACTION = os.getenv("PLANNER_FUSED_EXTRACTION", "false").lower() == "true"
+# Streaming mode parses the intent while Gemini writes it and starts the weather lookup as
+# soon as destination and weather_preference are out
+PLANNER_STREAMING = os.getenv("PLANNER_STREAMING", "false").lower() == "true"
+
+
+# Runs the RAG part of the pipeline (index -> retrieve -> extract) as one stage
+# constraints: terms of the trip request (hotel_constraints), used by hybrid retrieval
+def get_hotel_preferences(preferences_file="hotel_preferences.txt", constraints=None):
+    load_and_index_preferences(preferences_file)
+    context = retrieve_context(constraints=constraints)
+    return generate_hotel_preferences(context)
+
+
+# Async variant: indexing and retrieval (ChromaDB, blocking) run in a worker thread,
+# the Gemini call is awaited
+async def get_hotel_preferences_async(preferences_file="hotel_preferences.txt", constraints=None):
+    await asyncio.to_thread(load_and_index_preferences, preferences_file)
+    context = await asyncio.to_thread(retrieve_context, constraints=constraints)
+    return await generate_hotel_preferences_async(context)
+
+
+# The hotel stage of the concurrent planners: like the weather and calendar stages, a failure
+# (Gemini error, missing preferences file) is reported in its result instead of failing the plan
+async def _hotel_preferences_stage(preferences_file, constraints=None):
+    try:
+        return await get_hotel_preferences_async(preferences_file, constraints=constraints)
+    except Exception as e:
+        print("❌ Error getting hotel preferences:", e)
+        return {"status": "error", "message": str(e)}
+
+
+# Index + retrieve only, the context the fused extraction needs
+def get_hotel_preference_context(preferences_file="hotel_preferences.txt"):
+    load_and_index_preferences(preferences_file)
+    return retrieve_context()
+
+
+# Awaits one stage and records its wall time (ms) in timings
+async def _timed(timings, name, awaitable):
+    start = time.perf_counter()
+    try:
+        return await awaitable
+    finally:
+        timings[name] = round((time.perf_counter() - start) * 1000, 1)
+
+
+# Async end-to-end planner
+# Only the final date intersection depends on the weather and calendar stages, and the
+# hotel-preference RAG depends on neither, so once the LLM has extracted the trip entities
+# the three stages run concurrently and the request takes roughly as long as the slowest one.
+# Returns:
+"""
+    For Success Case:
+    {
+        "status": "success",
+        "data": {
+            "trip": {... entities from process_query ...},
+            "weather_dates": ['2025-08-18', '2025-08-20'],
+            "available_dates": ['2025-08-18', '2025-08-21'],
+            "intersection_dates": ['2025-08-18'],
+            "hotel_preferences": {"status": "success", "data": {...}}
+        },
+        "timings": {"intent": 812.4, "weather": 640.2, "calendar": 35.1, "hotel_preferences": 1450.9, "total": 2265.3}
+    }
+
+    In streaming mode timings also has "intent_first_field" (ms until the first intent field
+    was parsed) and "intent_weather_fields" (ms until destination and weather_preference were,
+    i.e. when the weather stage started).
+
+    In fused mode the timings are {"retrieval", "intent", "weather", "calendar", "total"}:
+    "intent" covers both extractions and there is no separate "hotel_preferences" stage.
+
+    For Case other than trip planning:
+    {
+        "status": "success",
+        "data": "This AI agent is designed specifically to help plan trips. ...",
+        "timings": {"intent": 790.3, "total": 790.4}
+    }
+"""
+async def plan_trip_async(prompt, employee_id, days=30, preferences_file="hotel_preferences.txt", fused=None,
+                          stream=None):
+    if fused if fused is not None else PLANNER_FUSED_EXTRACTION:
+        return await _plan_trip_fused_async(prompt, employee_id, days, preferences_file)
+    if stream if stream is not None else PLANNER_STREAMING:
+        return await _plan_trip_streaming_async(prompt, employee_id, days, preferences_file)
+
+    timings = {}
+    start = time.perf_counter()
+
+    # 1.) Extract entities from the prompt, everything else depends on it
+    data = await _timed(timings, "intent", index.get_response_from_llm_async(prompt))
+    if data is None:
+        timings["total"] = round((time.perf_counter() - start) * 1000, 1)
+        return {"status": "error", "message": "Could not get a response from the LLM", "timings": timings}
+    if isinstance(data, str):
+        timings["total"] = round((time.perf_counter() - start) * 1000, 1)
+        return {"status": "success", "data": data, "timings": timings}
+
+    # 2.) Fan out the independent stages and join them
+    dates, available_dates, hotel_preference = await asyncio.gather(
+        _timed(timings, "weather", index.get_relevant_dates_based_on_weather_async(
+            data.get("destination"), data.get("weather_preference"), days=days)),
+        _timed(timings, "calendar", index.get_available_dates_async(employee_id)),
+        _timed(timings, "hotel_preferences", _hotel_preferences_stage(preferences_file, hotel_constraints(data))),
+    )
+
+    # 3.) Intersection of relevant dates and available holidays
+    return _plan_result(data, dates, available_dates, hotel_preference, timings, start)
+
+
+# Fused variant of plan_trip_async: retrieval, one Gemini call, then weather and calendar
+async def _plan_trip_fused_async(prompt, employee_id, days, preferences_file):
+    timings = {}
+    start = time.perf_counter()
+
+    # 1.) The user's stored preferences, so one call can extract everything
+    context = await _timed(timings, "retrieval", asyncio.to_thread(get_hotel_preference_context, preferences_file))
+
+    # 2.) Trip entities and hotel preferences together
+    result = await _timed(timings, "intent", extract_trip_and_hotel_preferences_async(prompt, context))
+    if result["status"] != "success" or isinstance(result["data"], str):
+        timings["total"] = round((time.perf_counter() - start) * 1000, 1)
+        return {**result, "timings": timings}
+    data = result["data"]["trip"]
+
+    # 3.) Weather and calendar in parallel
+    dates, available_dates = await asyncio.gather(
+        _timed(timings, "weather", index.get_relevant_dates_based_on_weather_async(
+            data.get("destination"), data.get("weather_preference"), days=days)),
+        _timed(timings, "calendar", index.get_available_dates_async(employee_id)),
+    )
+    return _plan_result(data, dates, available_dates, result["data"]["hotel_preferences"], timings, start)
+
+
+# Streaming variant of plan_trip_async
+# Calendar and hotel preferences start with the first parsed field (the answer is trip JSON,
+# not a refusal), weather as soon as destination and weather_preference are complete. The
+# hotel stage starts before the request's terms are known, so it retrieves without them.
+async def _plan_trip_streaming_async(prompt, employee_id, days, preferences_file):
+    timings = {}
+    start = time.perf_counter()
+    fields = {}
+    tasks = {}
+
+    def start_stage(name, coroutine):
+        tasks[name] = asyncio.ensure_future(_timed(timings, name, coroutine))
+
+    def start_calendar_and_hotel_stages():
+        start_stage("calendar", index.get_available_dates_async(employee_id))
+        start_stage("hotel_preferences", _hotel_preferences_stage(preferences_file))
+
+    def on_field(path, value):
+        fields[path] = value
+        if "calendar" not in tasks:
+            start_calendar_and_hotel_stages()
+        if "weather" not in tasks and "destination" in fields and "weather_preference" in fields:
+            timings["intent_weather_fields"] = round((time.perf_counter() - start) * 1000, 1)
+            start_stage("weather", index.get_relevant_dates_based_on_weather_async(
+                fields["destination"], fields["weather_preference"], days=days))
+
+    try:
+        # 1.) Stream the entities, starting stages as their inputs arrive
+        response, metrics = await _timed(timings, "intent", process_query_stream_async(prompt, on_field=on_field))
+        timings["intent_first_field"] = metrics["first_field_ms"]
+        data = index.parse_llm_response(prompt, response)
+        if data is None or isinstance(data, str):
+            timings["total"] = round((time.perf_counter() - start) * 1000, 1)
+            if data is None:
+                return {"status": "error", "message": "Could not get a response from the LLM", "timings": timings}
+            return {"status": "success", "data": data, "timings": timings}
+
+        # 2.) Start whatever the stream didn't (e.g. a field was missing) and join
+        if "calendar" not in tasks:
+            start_calendar_and_hotel_stages()
+        if "weather" not in tasks:
+            start_stage("weather", index.get_relevant_dates_based_on_weather_async(
+                data.get("destination"), data.get("weather_preference"), days=days))
+        dates, available_dates, hotel_preference = await asyncio.gather(
+            tasks["weather"], tasks["calendar"], tasks["hotel_preferences"])
+
+        # 3.) Intersection of relevant dates and available holidays
+        return _plan_result(data, dates, available_dates, hotel_preference, timings, start)
+    finally:
+        # Stages started for a refusal, or left running when the intent or another stage
+        # failed (or the request was cancelled), must not outlive the request
+        pending = [task for task in tasks.values() if not task.done()]
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+
+
+def _plan_result(data, dates, available_dates, hotel_preference, timings, start):
+    intersection_dates = sorted(set(dates) & set(available_dates))
+    timings["total"] = round((time.perf_counter() - start) * 1000, 1)
+
+    return {
+        "status": "success",
+        "data": {
+            "trip": data,
+            "weather_dates": dates,
+            "available_dates": available_dates,
+            "intersection_dates": intersection_dates,
+            "hotel_preferences": hotel_preference,
+        },
+        "timings": timings,
+    }
+
+
+# Blocking wrapper for scripts that are not already running an event loop
+# The loop goes away with asyncio.run, so the weather service's async client for it is closed too
+def plan_trip(prompt, employee_id, days=30, preferences_file="hotel_preferences.txt", fused=None, stream=None):
+    async def run():
+        try:
+            return await plan_trip_async(prompt, employee_id, days=days, preferences_file=preferences_file,
+                                         fused=fused, stream=stream)
+        finally:
+            await aclose_weather_service()
+
+    return asyncio.run(run())
+
+
+if __name__ == "__main__":
+    result = plan_trip("Book a flight from Banglore to Amritsar on rainy day of this month", 1001)
+    print(json.dumps(result, indent=4))
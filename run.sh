@@ -48,8 +48,14 @@ REQUIRED_PACKAGES=(
   python-dotenv
   openai
   psycopg2-binary
+  asyncpg
   chromadb
   sentence_transformers
+  onnxruntime
+  onnx
+  numpy
+  fastapi
+  uvicorn
 )
 
 for pkg in "${REQUIRED_PACKAGES[@]}"; do
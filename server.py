@@ -0,0 +1,113 @@
+"""
+    HTTP service mode for the trip planner
+
+    uvicorn server:app --host 0.0.0.0 --port 8000 --workers 4
+    # or: python server.py   (SERVER_HOST, SERVER_PORT, SERVER_WORKERS)
+
+    Each worker process keeps its models, connection pools and caches warm across requests,
+    and coalesces concurrent work: embedding calls into one model batch, weather lookups into
+    one batched fetch per city, identical Gemini prompts into one call.
+
+    POST /plan                   {"prompt": "...", "employee_id": 1001, "days": 30}
+    POST /weather/dates          {"location": "Goa", "condition": "sunny", "days": 5}
+    GET  /holidays/{employee_id}
+    GET  /health
+"""
+
+import os
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Optional
+from dotenv import load_dotenv
+from fastapi import FastAPI
+from pydantic import BaseModel
+import index as index
+import planner
+from Services import embeddings, hotel_service, llm_client, llm_service, weather_service
+from Services.calendar_cache import get_holiday_cache
+
+load_dotenv()
+
+SERVER_HOST = os.getenv("SERVER_HOST", "0.0.0.0")
+SERVER_PORT = int(os.getenv("SERVER_PORT", "8000"))
+SERVER_WORKERS = int(os.getenv("SERVER_WORKERS", "1"))
+# Load Gemini, ChromaDB and the embedding model before taking traffic
+SERVER_WARMUP = os.getenv("SERVER_WARMUP", "true").lower() == "true"
+# How long a request waits for others to share a batch with
+BATCH_MAX_WAIT_MS = float(os.getenv("BATCH_MAX_WAIT_MS", "5"))
+
+
+class PlanRequest(BaseModel):
+    prompt: str
+    employee_id: int
+    days: int = 30
+    fused: Optional[bool] = None
+    stream: Optional[bool] = None
+
+
+class WeatherDatesRequest(BaseModel):
+    location: str
+    condition: str
+    days: int = 5
+
+
+@asynccontextmanager
+async def lifespan(app):
+    app.state.embedding_batcher = embeddings.use_batched_embeddings(max_wait_ms=BATCH_MAX_WAIT_MS)
+    app.state.weather_batcher = weather_service.use_batched_weather_requests(max_wait_ms=BATCH_MAX_WAIT_MS)
+    if SERVER_WARMUP:
+        try:
+            await asyncio.to_thread(hotel_service.warmup)
+            await asyncio.to_thread(weather_service.prewarm_weather)
+        except Exception as e:
+            # Serve anyway, the failing resource is retried on first use
+            print("❌ Warmup failed:", e)
+    yield
+    await weather_service.aclose_weather_service()
+
+
+app = FastAPI(title="Trip Planner", lifespan=lifespan)
+
+
+@app.post("/plan")
+async def plan(request: PlanRequest):
+    return await planner.plan_trip_async(request.prompt, request.employee_id, days=request.days,
+                                         fused=request.fused, stream=request.stream)
+
+
+@app.post("/weather/dates")
+async def weather_dates(request: WeatherDatesRequest):
+    dates = await index.get_relevant_dates_based_on_weather_async(request.location, request.condition, days=request.days)
+    return {"location": request.location, "condition": request.condition, "dates": dates}
+
+
+@app.get("/holidays/{employee_id}")
+async def holidays(employee_id: int):
+    return {"employee_id": employee_id, "dates": await index.get_available_dates_async(employee_id)}
+
+
+@app.get("/health")
+async def health():
+    # Reporting must not create the weather service, which raises without an API key
+    weather = weather_service._weather_service
+    return {
+        "status": "ok",
+        "caches": {
+            "geocode": weather.geocode_cache.stats() if weather is not None else None,
+            "forecast": weather.forecast_cache.stats() if weather is not None else None,
+            "holidays": get_holiday_cache().stats(),
+            "retrieval": hotel_service.retrieval_cache.stats(),
+            "intent": llm_service.intent_cache.stats(),
+            "vector_index": hotel_service.vector_index.stats() if hotel_service.vector_index is not None else None,
+        },
+        "batching": {
+            "embeddings": app.state.embedding_batcher.stats(),
+            "weather": app.state.weather_batcher.stats(),
+            "coalesced_llm_calls": llm_client.coalesced_calls,
+        },
+    }
+
+
+if __name__ == "__main__":
+    import uvicorn
+    uvicorn.run("server:app", host=SERVER_HOST, port=SERVER_PORT, workers=SERVER_WORKERS)
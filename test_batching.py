@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Tests for the async and threaded micro-batchers
+"""
+
+import time
+import asyncio
+import threading
+from Services.batching import MicroBatcher, ThreadedMicroBatcher
+
+
+def test_micro_batcher_coalesces_concurrent_calls():
+    batches = []
+
+    async def double(items):
+        batches.append(list(items))
+        return [item * 2 for item in items]
+
+    async def run():
+        batcher = MicroBatcher(double, max_batch_size=4, max_wait_ms=10)
+        results = await asyncio.gather(*(batcher.submit(i) for i in range(6)))
+        return results, batcher.stats()
+
+    results, stats = asyncio.run(run())
+    assert results == [0, 2, 4, 6, 8, 10]
+    assert batches == [[0, 1, 2, 3], [4, 5]]
+    assert stats == {"batches": 2, "items": 6, "avg_batch_size": 3.0}
+
+
+def test_micro_batcher_propagates_errors():
+    async def fail(items):
+        raise ValueError("upstream down")
+
+    async def run():
+        batcher = MicroBatcher(fail, max_wait_ms=1)
+        return await asyncio.gather(batcher.submit(1), batcher.submit(2), return_exceptions=True)
+
+    assert [type(r) for r in asyncio.run(run())] == [ValueError, ValueError]
+
+
+def test_threaded_micro_batcher_coalesces_concurrent_threads():
+    batches = []
+
+    def embed(items):
+        batches.append(len(items))
+        time.sleep(0.01)
+        return [f"vector({item})" for item in items]
+
+    batcher = ThreadedMicroBatcher(embed, max_batch_size=8, max_wait_ms=20)
+    results = {}
+
+    def call(i):
+        results[i] = batcher.submit(i)
+
+    threads = [threading.Thread(target=call, args=(i,)) for i in range(20)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == {i: f"vector({i})" for i in range(20)}
+    assert sum(batches) == 20
+    assert len(batches) < 20
+    assert max(batches) <= 8
+
+
+if __name__ == "__main__":
+    test_micro_batcher_coalesces_concurrent_calls()
+    test_micro_batcher_propagates_errors()
+    test_threaded_micro_batcher_coalesces_concurrent_threads()
+    print("✅ Batching tests passed")
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Tests for the preference text chunkers (no model download needed)
+"""
+
+import io
+from Services.chunking import FixedSizeChunker, SentenceChunker, estimate_tokens, get_chunker
+
+TEXT = (
+    "I prefer boutique hotels near the old town. A rooftop pool is a must in summer.\n"
+    "Breakfast should be included!\n"
+    "\n"
+    "For business trips I stay close to the office. Fast wifi and a desk matter most? Yes.\n"
+)
+
+
+def test_fixed_chunker_matches_original_slicing():
+    chunker = FixedSizeChunker()
+    for text in ["", "x" * 480, "x" * 490, "x" * 500, "abc\n" * 700]:
+        assert chunker.chunk(text) == [text[i:i+500] for i in range(0, len(text), 480)]
+        assert list(chunker.iter_chunks(io.StringIO(text))) == chunker.chunk(text)
+
+
+def test_sentences_are_never_cut():
+    chunks = SentenceChunker(max_tokens=20, count_tokens=estimate_tokens).chunk(TEXT)
+    assert chunks == [
+        "I prefer boutique hotels near the old town. A rooftop pool is a must in summer.",
+        "Breakfast should be included!",
+        "For business trips I stay close to the office. Fast wifi and a desk matter most? Yes.",
+    ]
+    assert all(estimate_tokens(chunk) <= 20 for chunk in chunks)
+
+
+def test_paragraphs_are_packed_while_they_fit():
+    chunks = SentenceChunker(max_tokens=200, count_tokens=estimate_tokens).chunk(TEXT)
+    assert chunks == [
+        "I prefer boutique hotels near the old town. A rooftop pool is a must in summer. "
+        "Breakfast should be included!\n\n"
+        "For business trips I stay close to the office. Fast wifi and a desk matter most? Yes."
+    ]
+    # A paragraph that fits a chunk of its own is never split
+    chunks = SentenceChunker(max_tokens=25, count_tokens=estimate_tokens).chunk(TEXT)
+    assert len(chunks) == 2
+    assert chunks[0].endswith("Breakfast should be included!")
+    assert chunks[1].startswith("For business trips")
+
+
+def test_overlap_repeats_trailing_sentences():
+    chunks = SentenceChunker(max_tokens=20, overlap_tokens=10, count_tokens=estimate_tokens).chunk(TEXT)
+    assert chunks[1] == "A rooftop pool is a must in summer. Breakfast should be included!"
+    # Nothing is carried across paragraphs
+    assert chunks[2].startswith("For business trips")
+
+
+def test_long_sentences_are_split_on_words():
+    text = " ".join(f"word{i}" for i in range(25)) + "."
+    chunks = SentenceChunker(max_tokens=10, count_tokens=estimate_tokens).chunk(text)
+    assert len(chunks) == 3
+    assert " ".join(chunks) == text
+    assert all(estimate_tokens(chunk) <= 10 for chunk in chunks)
+
+
+def test_streaming_matches_whole_text():
+    chunker = SentenceChunker(max_tokens=20, count_tokens=estimate_tokens)
+    assert list(chunker.iter_chunks(io.StringIO(TEXT))) == chunker.chunk(TEXT)
+
+
+def test_get_chunker_by_name():
+    assert isinstance(get_chunker("fixed"), FixedSizeChunker)
+    assert get_chunker("sentence", max_tokens=50, count_tokens=len).max_tokens == 50
+    try:
+        get_chunker("paragraphs")
+        assert False, "expected ValueError"
+    except ValueError:
+        pass
+
+
+if __name__ == "__main__":
+    test_fixed_chunker_matches_original_slicing()
+    test_sentences_are_never_cut()
+    test_paragraphs_are_packed_while_they_fit()
+    test_overlap_repeats_trailing_sentences()
+    test_long_sentences_are_split_on_words()
+    test_streaming_matches_whole_text()
+    test_get_chunker_by_name()
+    print("✅ Chunking tests passed")
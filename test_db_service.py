@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""
+Tests for the holidays queries against the SQLite stand-in (no Postgres needed)
+
+Run against a real database instead with test_db.py.
+"""
+
+import asyncio
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from datetime import date, timedelta
+import psycopg2
+from psycopg2 import pool as pg_pool
+from Services import db_service
+from Services.calendar_cache import HolidayCache
+
+EMPLOYEE_ID = 1001
+
+
+def make_db(path, holidays):
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE holidays_table (employee_id INTEGER, holidays TEXT)")
+    conn.executemany("INSERT INTO holidays_table VALUES (?, ?)", holidays)
+    conn.commit()
+    conn.close()
+
+
+@contextmanager
+def use_sqlite(path):
+    originals = (db_service.DB_BACKEND, db_service.DB_SQLITE_PATH)
+    db_service.DB_BACKEND = "sqlite"
+    db_service.DB_SQLITE_PATH = path
+    try:
+        yield
+    finally:
+        db_service.DB_BACKEND, db_service.DB_SQLITE_PATH = originals
+
+
+class FakeConnection:
+    def __init__(self, closed=0):
+        self.closed = closed
+        self.last_checked = time.monotonic()
+
+
+class FakePool:
+    """Stands in for the psycopg2 pool: hands out FakeConnections and records what comes back"""
+
+    def __init__(self, closed=0):
+        self.closed = closed
+        self.returned = []
+
+    def getconn(self):
+        return FakeConnection(self.closed)
+
+    def putconn(self, conn, close=False):
+        self.returned.append(close)
+
+
+@contextmanager
+def use_pool(pool, size, timeout):
+    originals = (db_service._pool, db_service._pool_slots, db_service.DB_POOL_MAX, db_service.DB_POOL_TIMEOUT)
+    db_service._pool = pool
+    db_service._pool_slots = threading.BoundedSemaphore(size)
+    db_service.DB_POOL_MAX = size
+    db_service.DB_POOL_TIMEOUT = timeout
+    try:
+        yield
+    finally:
+        db_service._pool, db_service._pool_slots, db_service.DB_POOL_MAX, db_service.DB_POOL_TIMEOUT = originals
+
+
+def upcoming(days):
+    return (date.today() + timedelta(days=days)).isoformat()
+
+
+def test_get_holidays_dates_returns_upcoming_sorted():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "holidays.sqlite3")
+        make_db(path, [
+            (EMPLOYEE_ID, upcoming(5)),
+            (EMPLOYEE_ID, upcoming(-3)),
+            (EMPLOYEE_ID, upcoming(1)),
+            (1002, upcoming(2)),
+        ])
+        with use_sqlite(path):
+            assert db_service.get_holidays_dates(EMPLOYEE_ID) == [upcoming(1), upcoming(5)]
+            assert asyncio.run(db_service.get_holidays_dates_async(EMPLOYEE_ID)) == [upcoming(1), upcoming(5)]
+
+
+def test_get_holidays_dates_errors_return_empty_list():
+    with tempfile.TemporaryDirectory() as tmp:
+        with use_sqlite(os.path.join(tmp, "missing_table.sqlite3")):
+            assert db_service.get_holidays_dates(EMPLOYEE_ID) == []
+
+
+def test_get_holidays_for_employees():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "holidays.sqlite3")
+        make_db(path, [
+            (1001, upcoming(1)), (1001, upcoming(2)), (1001, upcoming(-1)),
+            (1002, upcoming(2)), (1002, upcoming(9)),
+            (1003, upcoming(3)),
+        ])
+        with use_sqlite(path):
+            assert db_service.get_holidays_for_employees([1001, 1002, 1004]) == {
+                1001: [upcoming(1), upcoming(2)],
+                1002: [upcoming(2), upcoming(9)],
+                1004: [],
+            }
+            assert db_service.get_holidays_for_employees([1002], (upcoming(0), upcoming(5))) == {1002: [upcoming(2)]}
+
+
+def test_get_common_available_dates_and_windows():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "holidays.sqlite3")
+        team_days = [1, 2, 3, 6, 8, 9]
+        make_db(path, [(1001, upcoming(d)) for d in team_days + [4]] + [(1002, upcoming(d)) for d in team_days])
+        with use_sqlite(path):
+            result = db_service.get_common_available_dates([1001, 1002], min_window=2)
+            assert result["dates"] == [upcoming(d) for d in team_days]
+            assert result["windows"] == [
+                {"start": upcoming(1), "end": upcoming(3), "days": 3},
+                {"start": upcoming(8), "end": upcoming(9), "days": 2},
+            ]
+
+            # Only the dates with the right weather
+            sunny = [upcoming(d) for d in (2, 3, 4, 9)]
+            result = db_service.get_common_available_dates([1001, 1002], sunny)
+            assert result["dates"] == [upcoming(2), upcoming(3), upcoming(9)]
+            assert [w["days"] for w in result["windows"]] == [2, 1]
+
+
+def test_holiday_cache_serves_from_memory_until_invalidated():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "holidays.sqlite3")
+        make_db(path, [(EMPLOYEE_ID, upcoming(1))])
+        with use_sqlite(path):
+            cache = HolidayCache(ttl=60)
+
+            assert cache.get(EMPLOYEE_ID) == [upcoming(1)]
+            conn = sqlite3.connect(path)
+            conn.execute("INSERT INTO holidays_table VALUES (?, ?)", (EMPLOYEE_ID, upcoming(2)))
+            conn.commit()
+            conn.close()
+
+            # Still the cached answer, until the change is notified
+            assert cache.get(EMPLOYEE_ID) == [upcoming(1)]
+            cache.invalidate(EMPLOYEE_ID)
+            assert cache.get(EMPLOYEE_ID) == [upcoming(1), upcoming(2)]
+            assert asyncio.run(cache.get_async(EMPLOYEE_ID)) == [upcoming(1), upcoming(2)]
+            assert cache.stats()["hits"] == 2
+            assert cache.stats()["misses"] == 2
+
+
+def test_holiday_cache_ttl_fallback_and_errors():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "holidays.sqlite3")
+        make_db(path, [(EMPLOYEE_ID, upcoming(1))])
+        with use_sqlite(path):
+            cache = HolidayCache(ttl=-1)
+            cache.get(EMPLOYEE_ID)
+            cache.get(EMPLOYEE_ID)
+            assert cache.stats()["misses"] == 2
+
+            # Errors propagate and are not cached as "no holidays"
+            with use_sqlite(os.path.join(tmp, "missing_table.sqlite3")):
+                cache = HolidayCache(ttl=60)
+                try:
+                    cache.get(EMPLOYEE_ID)
+                    assert False, "expected a database error"
+                except sqlite3.OperationalError:
+                    pass
+                assert cache.stats()["size"] == 0
+
+
+def test_get_connection_waits_for_a_free_connection():
+    pool = FakePool()
+    with use_pool(pool, size=1, timeout=0.05):
+        with db_service.get_connection():
+            # The only connection is borrowed: a second borrower gives up after DB_POOL_TIMEOUT
+            try:
+                with db_service.get_connection():
+                    assert False, "expected the pool to be exhausted"
+            except pg_pool.PoolError:
+                pass
+
+        # ...and gets it as soon as it comes back
+        db_service.DB_POOL_TIMEOUT = 1.0
+        borrowed = threading.Event()
+
+        def borrow_briefly():
+            with db_service.get_connection():
+                borrowed.set()
+                time.sleep(0.05)
+
+        thread = threading.Thread(target=borrow_briefly)
+        thread.start()
+        borrowed.wait()
+        start = time.perf_counter()
+        with db_service.get_connection():
+            assert time.perf_counter() - start >= 0.03
+        thread.join()
+        assert pool.returned == [False, False, False]
+
+
+def test_get_connection_raises_when_no_connection_is_healthy():
+    pool = FakePool(closed=1)
+    with use_pool(pool, size=2, timeout=0.05):
+        try:
+            with db_service.get_connection():
+                assert False, "expected no healthy connection"
+        except psycopg2.OperationalError:
+            pass
+        # Every stale connection was discarded, and the slot was given back
+        assert pool.returned == [True, True, True]
+        assert db_service._pool_slots.acquire(timeout=0)
+
+
+def test_async_queries_fall_back_to_psycopg2_without_asyncpg():
+    calls = []
+
+    def fake_query_holidays_dates(employee_id):
+        calls.append(employee_id)
+        return [upcoming(1)]
+
+    originals = (db_service.DB_BACKEND, db_service._asyncpg, db_service._asyncpg_checked,
+                 db_service.query_holidays_dates)
+    db_service.DB_BACKEND = "postgres"
+    db_service._asyncpg, db_service._asyncpg_checked = None, True
+    db_service.query_holidays_dates = fake_query_holidays_dates
+    try:
+        assert asyncio.run(db_service.get_holidays_dates_async(EMPLOYEE_ID)) == [upcoming(1)]
+        assert calls == [EMPLOYEE_ID]
+    finally:
+        (db_service.DB_BACKEND, db_service._asyncpg, db_service._asyncpg_checked,
+         db_service.query_holidays_dates) = originals
+
+
+if __name__ == "__main__":
+    test_get_holidays_dates_returns_upcoming_sorted()
+    test_get_holidays_dates_errors_return_empty_list()
+    test_get_holidays_for_employees()
+    test_get_common_available_dates_and_windows()
+    test_holiday_cache_serves_from_memory_until_invalidated()
+    test_holiday_cache_ttl_fallback_and_errors()
+    test_get_connection_waits_for_a_free_connection()
+    test_get_connection_raises_when_no_connection_is_healthy()
+    test_async_queries_fall_back_to_psycopg2_without_asyncpg()
+    print("✅ DB service tests passed")
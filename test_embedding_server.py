@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Tests for the embedding server and its client (stand-in model, no SentenceTransformer needed)
+"""
+
+import json
+import asyncio
+import httpx
+import embedding_server
+from Services import embeddings
+
+
+def test_concurrent_requests_share_one_model_call():
+    calls = []
+
+    def fake_model(texts):
+        calls.append(list(texts))
+        return [[float(len(text)), 1.0] for text in texts]
+
+    async def run():
+        transport = httpx.ASGITransport(app=embedding_server.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            bodies = [{"texts": ["a" * n, "b" * (n + 1)]} for n in range(1, 6)] + [{"texts": []}]
+            return await asyncio.gather(*(client.post("/embed", json=body) for body in bodies))
+
+    original = embeddings._embedding_function
+    embeddings._embedding_function = fake_model
+    try:
+        responses = asyncio.run(run())
+    finally:
+        embeddings._embedding_function = original
+
+    assert [response.json()["embeddings"] for response in responses] == \
+        [[[float(n), 1.0], [float(n + 1), 1.0]] for n in range(1, 6)] + [[]]
+    # Five requests, one forward pass over their ten texts
+    assert len(calls) == 1 and len(calls[0]) == 10
+
+
+def test_remote_embedding_function_posts_texts_to_the_server():
+    requests = []
+
+    def handler(request):
+        requests.append((request.url.path, json.loads(request.content)))
+        return httpx.Response(200, json={"embeddings": [[0.5, 0.5] for _ in json.loads(request.content)["texts"]]})
+
+    embed = embeddings.RemoteEmbeddingFunction("http://embeddings.test", transport=httpx.MockTransport(handler))
+    assert embed(["sea view", "pool"]) == [[0.5, 0.5], [0.5, 0.5]]
+    assert embed([]) == []
+    assert requests == [("/embed", {"texts": ["sea view", "pool"]})]
+
+    original_backend, original_remote = embeddings.EMBEDDING_BACKEND, embeddings._remote_embedding_function
+    embeddings.EMBEDDING_BACKEND, embeddings._remote_embedding_function = "remote", embed
+    try:
+        assert embeddings.get_embedding_function() is embed
+    finally:
+        embeddings.EMBEDDING_BACKEND, embeddings._remote_embedding_function = original_backend, original_remote
+
+
+if __name__ == "__main__":
+    test_concurrent_requests_share_one_model_call()
+    test_remote_embedding_function_posts_texts_to_the_server()
+    print("✅ Embedding server tests passed")
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Tests for the daily forecast roll-up (no API key or network needed)
+"""
+
+from Services.forecast_aggregation import aggregate_daily_loop, aggregate_daily_columnar, aggregate_daily_columnar_batch
+
+START = 1_755_475_200  # 2025-08-18 00:00 UTC
+CODES = {"Rain": 500, "Clear": 800, "Clouds": 803, "Snow": 600}
+
+
+def slot(hours, main, temp, humidity=50, description=None):
+    return {
+        "dt": START + hours * 3600,
+        "main": {"temp": temp, "humidity": humidity},
+        "weather": [{"id": CODES[main], "main": main, "description": description or main.lower()}],
+    }
+
+
+FORECAST = [
+    slot(0, "Rain", 20.0, 80, "light rain"),
+    slot(3, "Clear", 24.5),
+    slot(6, "Clear", 31.25),
+    slot(9, "Rain", 28.0),
+    slot(24, "Clouds", 22.0, 60, "broken clouds"),
+    slot(27, "Rain", 23.0),
+    slot(48, "Clear", 30.0),
+]
+
+
+def test_columnar_matches_loop():
+    assert aggregate_daily_columnar(FORECAST) == aggregate_daily_loop(FORECAST)
+
+
+def test_daily_statistics():
+    # Three slots a minute apart around noon UTC, so they share a local date in any timezone
+    day = [slot(12, "Rain", 20.0, 80, "light rain"), slot(12, "Clear", 24.5), slot(12, "Clear", 28.0)]
+    for i, item in enumerate(day):
+        item["dt"] += i * 60
+
+    assert aggregate_daily_columnar(day) == [{
+        "date": aggregate_daily_loop(day)[0]["date"],
+        "condition": "clear",
+        "condition_id": 800,
+        "description": "light rain",
+        "temperature": 24.2,
+        "temp_min": 20.0,
+        "temp_max": 28.0,
+        "humidity": 80,
+    }]
+
+
+def test_ties_go_to_first_seen_condition():
+    tie = [slot(0, "Clouds", 20.0), slot(3, "Rain", 20.0)]
+    assert aggregate_daily_columnar(tie)[0]["condition"] == aggregate_daily_loop(tie)[0]["condition"]
+
+
+def test_batch_keeps_forecasts_apart():
+    other = [slot(0, "Snow", -2.0), slot(3, "Snow", -4.0)]
+    batch = aggregate_daily_columnar_batch([FORECAST, [], other])
+    assert batch == [aggregate_daily_loop(FORECAST), [], aggregate_daily_loop(other)]
+
+
+if __name__ == "__main__":
+    test_columnar_matches_loop()
+    test_daily_statistics()
+    test_ties_go_to_first_seen_condition()
+    test_batch_keeps_forecasts_apart()
+    print("✅ Forecast aggregation tests passed")
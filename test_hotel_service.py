@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Tests for the preference index (in-memory ChromaDB and a stand-in embedding function,
+so no model download or API key is needed)
+"""
+
+import os
+import json
+import uuid
+import tempfile
+from contextlib import contextmanager
+import chromadb
+from Services import hotel_service
+from Services.llm_cache import LLMResponseCache
+from Services.vector_index import VectorIndex
+from Services.lexical_index import LexicalIndex
+
+embedded = []
+
+
+def fake_embedding_function(texts):
+    # Bag-of-letters vectors: deterministic and good enough to tell texts apart
+    embedded.append(len(texts))
+    return [[float(text.lower().count(letter)) + 0.01 for letter in "abcdefghijklmnopqrstuvwxyz"] for text in texts]
+
+
+@contextmanager
+def use_fresh_collection():
+    embedded.clear()
+    originals = hotel_service.get_embedding_function, hotel_service._collection
+    hotel_service.get_embedding_function = lambda: fake_embedding_function
+    hotel_service._collection = chromadb.EphemeralClient().get_or_create_collection(
+        name=f"test_{uuid.uuid4().hex}",
+        embedding_function=None
+    )
+    try:
+        yield hotel_service._collection
+    finally:
+        hotel_service.get_embedding_function, hotel_service._collection = originals
+        hotel_service.retrieval_cache.clear()
+
+
+def test_index_chunks_only_embeds_new_or_changed_chunks():
+    with use_fresh_collection() as collection:
+        chunks = ["4-star hotels with a pool.", "Budget under 5000 rupees.", "Amritsar, Punjab."]
+
+        assert hotel_service.index_chunks("prefs.txt", chunks) == {"upserted": 3, "unchanged": 0, "deleted": 0}
+        assert hotel_service.index_chunks("prefs.txt", chunks) == {"upserted": 0, "unchanged": 3, "deleted": 0}
+        assert embedded == [3]
+
+        # The file shrank and one chunk changed
+        assert hotel_service.index_chunks("prefs.txt", ["4-star hotels with a gym.", chunks[1]]) == \
+            {"upserted": 1, "unchanged": 1, "deleted": 1}
+        assert embedded == [3, 1]
+        assert sorted(collection.get()["ids"]) == ["pref_chunk_1", "pref_chunk_2"]
+
+
+def test_bulk_index_and_per_user_retrieval():
+    with use_fresh_collection():
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "preferences.jsonl")
+            with open(path, "w", encoding="utf-8") as f:
+                for user_id, text in [(1001, "Budget under 5000 rupees."), (1002, "Likes beach resorts in Goa."), (1003, "Zzz quiet rooms.")]:
+                    f.write(json.dumps({"user_id": user_id, "text": text}) + "\n")
+
+            assert hotel_service.bulk_index_preferences(path, batch_size=2) == \
+                {"users": 3, "upserted": 3, "unchanged": 0, "deleted": 0}
+            assert embedded == [2, 1]
+            assert hotel_service.bulk_index_preferences(path)["unchanged"] == 3
+
+        assert hotel_service.retrieve_context("beach", user_id=1002) == "Likes beach resorts in Goa."
+        assert hotel_service.retrieve_context("beach", user_id="1001") == "Budget under 5000 rupees."
+        assert hotel_service.retrieve_context("beach") == ""
+
+
+def test_retrieval_is_cached_until_the_index_changes():
+    with use_fresh_collection():
+        hotel_service.retrieval_cache.clear()
+        hotel_service.index_chunks("prefs.txt", ["Budget under 5000 rupees."])
+        embedded.clear()
+
+        assert hotel_service.retrieve_context("hotel preferences") == "Budget under 5000 rupees."
+        assert hotel_service.retrieve_context("hotel preferences") == "Budget under 5000 rupees."
+        assert embedded == [1]
+        assert hotel_service.retrieval_cache.stats()["hits"] >= 1
+
+        # A write invalidates the result but not the query embedding
+        hotel_service.index_chunks("prefs.txt", ["Budget under 8000 rupees."])
+        assert hotel_service.retrieve_context("hotel preferences") == "Budget under 8000 rupees."
+        assert embedded == [1, 1]
+
+
+def test_vector_index_serves_small_users_and_chroma_the_rest():
+    with use_fresh_collection():
+        hotel_service.retrieval_cache.clear()
+        with tempfile.TemporaryDirectory() as tmp:
+            hotel_service.vector_index = index = VectorIndex(tmp, max_rows=2)
+            try:
+                hotel_service.index_chunks("a.txt", ["Budget under 5000 rupees."], id_prefix="user_1_chunk", user_id=1)
+                hotel_service.index_chunks("b.txt", ["Pool.", "Gym.", "Quiet beach rooms."], id_prefix="user_2_chunk", user_id=2)
+                assert index.has("1") and not index.has("2")
+
+                assert hotel_service.retrieve_context("budget", user_id=1) == "Budget under 5000 rupees."
+                assert sorted(hotel_service.retrieve_context("beach", user_id=2).split("\n")) == \
+                    ["Gym.", "Pool.", "Quiet beach rooms."]
+                assert (index.hits, index.fallbacks) == (1, 1)
+
+                # Re-indexing rewrites the user's file, and the next search sees it
+                hotel_service.index_chunks("a.txt", ["Budget under 8000 rupees.", "Sea view."], id_prefix="user_1_chunk", user_id=1)
+                assert sorted(hotel_service.retrieve_context("budget", user_id=1).split("\n")) == \
+                    ["Budget under 8000 rupees.", "Sea view."]
+                assert index.hits == 2
+            finally:
+                hotel_service.vector_index = None
+
+
+def test_hybrid_retrieval_keeps_the_requested_facts_and_drops_filler():
+    facts = ["Prefers 4-star hotels.", "Amenities: pool, gym and breakfast.", "Budget under 5000 rupees per night.",
+             "Location is Amritsar, Punjab.", "Stay dates are next weekend."]
+    filler = ["Travels with a camera.", "Enjoys long mornings over chai.", "Usually reads on trains."]
+    with use_fresh_collection():
+        hotel_service.retrieval_cache.clear()
+        lexical_index = LexicalIndex(":memory:")
+        originals = hotel_service.RETRIEVAL_MODE, hotel_service.get_lexical_index
+        try:
+            # Chunks indexed before hybrid mode are backfilled the next time their source is synced
+            hotel_service.index_chunks("p.txt", facts + filler, id_prefix="user_7_chunk", user_id=7)
+            hotel_service.RETRIEVAL_MODE, hotel_service.get_lexical_index = "hybrid", lambda: lexical_index
+            assert hotel_service.index_chunks("p.txt", facts + filler, id_prefix="user_7_chunk", user_id=7)["unchanged"] == 8
+            assert lexical_index.missing_users(["7"]) == set()
+
+            # The request's stay-related terms are matched, not its source or weather
+            trip = {"source": "Delhi", "destination": "Amritsar", "weather_preference": "sunny", "travel_dates": None,
+                    "hotel_preferences": {"rating": None, "amenities": ["pool"], "price_range": "under 5000 rupees"}}
+            constraints = hotel_service.hotel_constraints(trip)
+            assert constraints == "Amritsar pool under 5000 rupees"
+
+            # The facts the request names, and no filler
+            context = hotel_service.retrieve_context(user_id=7, constraints=constraints).split("\n")
+            assert sorted(context) == sorted([facts[1], facts[2], facts[3]])
+            assert not set(context) & set(filler)
+
+            # Another request, another (separately cached) context, led by the fact it names
+            context = hotel_service.retrieve_context(user_id=7, constraints="next weekend").split("\n")
+            assert context[0] == facts[4] and len(context) <= 3
+            # Without lexical matches the result is vector mode's
+            assert len(hotel_service.retrieve_context(user_id=7, constraints="xyz").split("\n")) == 3
+        finally:
+            hotel_service.RETRIEVAL_MODE, hotel_service.get_lexical_index = originals
+
+
+def test_generate_hotel_preferences_is_cached():
+    prompts = []
+
+    def fake_generate(prompt, model_name, generation_config):
+        prompts.append(prompt)
+        return '```json\n{"location": "Goa"}\n```'
+
+    originals = hotel_service.generate, hotel_service.get_llm_cache
+    hotel_service.generate = fake_generate
+    hotel_service.get_llm_cache = lambda cache=LLMResponseCache(":memory:"): cache
+    try:
+        for _ in range(3):
+            assert hotel_service.generate_hotel_preferences("Likes Goa.") == {"status": "success", "data": {"location": "Goa"}}
+        assert len(prompts) == 1 and "Likes Goa." in prompts[0]
+
+        hotel_service.generate_hotel_preferences("Likes Manali.")
+        assert len(prompts) == 2
+    finally:
+        hotel_service.generate, hotel_service.get_llm_cache = originals
+
+
+if __name__ == "__main__":
+    test_index_chunks_only_embeds_new_or_changed_chunks()
+    test_bulk_index_and_per_user_retrieval()
+    test_retrieval_is_cached_until_the_index_changes()
+    test_vector_index_serves_small_users_and_chroma_the_rest()
+    test_hybrid_retrieval_keeps_the_requested_facts_and_drops_filler()
+    test_generate_hotel_preferences_is_cached()
+    print("✅ Hotel service tests passed")
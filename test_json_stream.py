@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Tests for the incremental JSON parser used on streamed LLM responses
+"""
+
+import json
+from Services.json_stream import IncrementalJSONParser
+
+DOCUMENT = {
+    "source": "New York",
+    "destination": "Goa, \"the beach\"",
+    "weather_preference": "sunny",
+    "travel_dates": None,
+    "budget": -1.5e3,
+    "family": True,
+    "hotel_preferences": {"rating": 4, "amenities": ["pool", "gym"], "extra": {}, "tags": []},
+    "other_info": "closes with } and ]",
+}
+
+
+def feed_in_chunks(text, size):
+    parser = IncrementalJSONParser()
+    fields = []
+    for i in range(0, len(text), size):
+        fields += parser.feed(text[i:i + size])
+    return parser, fields
+
+
+def test_fields_are_reported_for_any_chunking():
+    text = "```json\n" + json.dumps(DOCUMENT, indent=2) + "\n```"
+    for size in (1, 2, 3, 7, 64, len(text)):
+        parser, fields = feed_in_chunks(text, size)
+        assert parser.done
+        assert fields == [
+            ("source", "New York"),
+            ("destination", "Goa, \"the beach\""),
+            ("weather_preference", "sunny"),
+            ("travel_dates", None),
+            ("budget", -1500.0),
+            ("family", True),
+            ("hotel_preferences.rating", 4),
+            ("hotel_preferences.amenities.0", "pool"),
+            ("hotel_preferences.amenities.1", "gym"),
+            ("other_info", "closes with } and ]"),
+        ]
+
+
+def test_fields_are_reported_as_soon_as_they_complete():
+    parser = IncrementalJSONParser()
+    assert parser.feed('{"destination": "Go') == []
+    assert parser.feed('a", "weather_preference": "sun') == [("destination", "Goa")]
+    assert parser.feed('ny", "rating": 4') == [("weather_preference", "sunny")]
+    # A number is only complete once something follows it
+    assert parser.feed("}") == [("rating", 4)]
+    assert parser.done
+
+
+def test_plain_text_reports_nothing():
+    parser, fields = feed_in_chunks("This AI agent is designed specifically to help plan trips. {x}", 5)
+    assert fields == [] and not parser.done
+    assert parser.text.startswith("This AI agent")
+
+
+def test_invalid_values_stop_the_parser_without_raising():
+    for text in ('{"destination": "Goa", "family": True, "source": "Delhi"}',
+                 '{"destination": "Goa", "budget": NaN1, "source": "Delhi"}',
+                 '{"destination": "Goa", "source": "\\x", "rating": 4}'):
+        parser, fields = feed_in_chunks(text, 3)
+        assert fields == [("destination", "Goa")] and not parser.done
+        assert parser.text == text
+
+
+if __name__ == "__main__":
+    test_fields_are_reported_for_any_chunking()
+    test_fields_are_reported_as_soon_as_they_complete()
+    test_plain_text_reports_nothing()
+    test_invalid_values_stop_the_parser_without_raising()
+    print("✅ JSON stream tests passed")
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Tests for the BM25 index and reciprocal rank fusion
+"""
+
+from Services.lexical_index import LexicalIndex, reciprocal_rank_fusion, tokenize
+
+
+def test_tokenize_keeps_facts_and_drops_stopwords():
+    assert tokenize("Budget should be under 5000 rupees.") == ["budget", "under", "5000", "rupee"]
+    assert tokenize("4-star hotels with a pool, gym, and breakfast") == ["4", "star", "hotel", "pool", "gym", "breakfast"]
+
+
+def test_bm25_search_is_scoped_to_the_user():
+    index = LexicalIndex(":memory:")
+    index.upsert(["u1_1", "u1_2", "u1_3", "u2_1"], [
+        "Budget should be under 5000 rupees.",
+        "I enjoy quiet mornings and long walks.",
+        "Amenities like pool, gym, and breakfast. The pool must be heated pool.",
+        "Budget under 5000 rupees, pool is a must.",
+    ], ["1", "1", "1", "2"])
+
+    assert [text for text, _ in index.search("budget rupees", "1")] == ["Budget should be under 5000 rupees."]
+    results = index.search("pool budget", "1", k=3)
+    assert [text for text, _ in results] == ["Amenities like pool, gym, and breakfast. The pool must be heated pool.",
+                                            "Budget should be under 5000 rupees."]
+    assert results[0][1] > results[1][1] > 0
+    assert index.search("the and with", "1") == []
+    assert index.missing_users(["1", "2", "3"]) == {"3"}
+
+    index.upsert(["u1_1"], ["Budget is flexible."], ["1"])
+    assert index.search("rupees", "1") == []
+    index.delete(["u2_1"])
+    assert index.search("pool", "2") == [] and index.missing_users(["2"]) == {"2"}
+    assert index.stats()["chunks"] == 3
+
+
+def test_fusion_keeps_what_rankings_agree_on():
+    dense = ["filler", "budget", "pool"]
+    # Both lexical rankings agree with dense on "budget" and "pool"; "filler" only dense ranks
+    fused = reciprocal_rank_fusion([dense, ["budget"], ["pool", "budget"]], max_results=5, min_score_ratio=0.6)
+    assert fused == ["budget", "pool"]
+    # Without lexical matches the dense ranking comes through unchanged
+    assert reciprocal_rank_fusion([dense, [], []], max_results=5, min_score_ratio=0.6) == dense
+    assert reciprocal_rank_fusion([dense], max_results=2) == ["filler", "budget"]
+    assert reciprocal_rank_fusion([[], []], max_results=3) == []
+
+
+if __name__ == "__main__":
+    test_tokenize_keeps_facts_and_drops_stopwords()
+    test_bm25_search_is_scoped_to_the_user()
+    test_fusion_keeps_what_rankings_agree_on()
+    print("✅ Lexical index tests passed")
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Tests for the persistent LLM response cache (no API key needed)
+"""
+
+import time
+from Services.llm_cache import LLMResponseCache, llm_cache_key
+
+
+def test_key_covers_template_model_config_and_context():
+    key = llm_cache_key("Context: {context}", "gemini-1.5-flash", {"temperature": 0.4}, "pool")
+    assert key == llm_cache_key("Context: {context}", "gemini-1.5-flash", {"temperature": 0.4}, "pool")
+    assert key != llm_cache_key("Context: {context}", "gemini-1.5-flash", {"temperature": 0.4}, "gym")
+    assert key != llm_cache_key("Context: {context}", "gemini-1.5-pro", {"temperature": 0.4}, "pool")
+    assert key != llm_cache_key("Context: {context}", "gemini-1.5-flash", {"temperature": 0.9}, "pool")
+    assert key != llm_cache_key("Preferences: {context}", "gemini-1.5-flash", {"temperature": 0.4}, "pool")
+
+
+def test_get_set_and_expiry():
+    cache = LLMResponseCache(":memory:", ttl=60)
+    assert cache.get("a") == (False, None)
+    cache.set("a", {"location": "Goa", "hotel_preferences": {"rating": 4}})
+    assert cache.get("a") == (True, {"location": "Goa", "hotel_preferences": {"rating": 4}})
+
+    cache.ttl = -1
+    cache.set("b", {"location": "Manali"})
+    assert cache.get("b") == (False, None)
+    assert cache.stats()["hits"] == 1
+
+
+def test_least_recently_used_entries_are_evicted():
+    cache = LLMResponseCache(":memory:", max_entries=2)
+    cache.set("a", 1)
+    time.sleep(0.01)
+    cache.set("b", 2)
+    time.sleep(0.01)
+    cache.get("a")
+    time.sleep(0.01)
+    cache.set("c", 3)
+    assert cache.get("b") == (False, None)
+    assert cache.get("a") == (True, 1)
+    assert cache.get("c") == (True, 3)
+    assert cache.stats()["size"] == 2
+
+
+if __name__ == "__main__":
+    test_key_covers_template_model_config_and_context()
+    test_get_set_and_expiry()
+    test_least_recently_used_entries_are_evicted()
+    print("✅ LLM cache tests passed")
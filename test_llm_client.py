@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Tests for the shared Gemini client (a stand-in genai module, no API key needed)
+"""
+
+import asyncio
+from Services import llm_client
+
+
+class ResourceExhausted(Exception):
+    code = 429
+
+
+class FakeModel:
+    created = 0
+    failures = 0
+    in_flight = 0
+    max_in_flight = 0
+
+    def __init__(self, model_name, generation_config=None):
+        FakeModel.created += 1
+        self.model_name = model_name
+
+    def generate_content(self, prompt):
+        if FakeModel.failures:
+            FakeModel.failures -= 1
+            raise ResourceExhausted("429 Resource has been exhausted")
+        return type("Response", (), {"text": f"{self.model_name}: {prompt}"})()
+
+    async def generate_content_async(self, prompt):
+        FakeModel.in_flight += 1
+        FakeModel.max_in_flight = max(FakeModel.max_in_flight, FakeModel.in_flight)
+        await asyncio.sleep(0.01)
+        FakeModel.in_flight -= 1
+        return self.generate_content(prompt)
+
+
+def use_fake_genai():
+    llm_client._genai = type("genai", (), {"GenerativeModel": FakeModel, "GenerationConfig": dict})
+    llm_client._models.clear()
+    FakeModel.created = FakeModel.failures = FakeModel.max_in_flight = 0
+
+
+def test_models_are_shared_per_name_and_config():
+    use_fake_genai()
+    config = {"temperature": 0.5, "top_k": 1}
+    assert llm_client.get_model("gemini-1.5-flash", config) is llm_client.get_model("gemini-1.5-flash", {"top_k": 1, "temperature": 0.5})
+    llm_client.get_model("gemini-1.5-flash", {"temperature": 0.4})
+    assert FakeModel.created == 2
+
+
+def test_rate_limited_calls_are_retried():
+    use_fake_genai()
+    sleeps = []
+    original_sleep = llm_client.time.sleep
+    llm_client.time.sleep = sleeps.append
+    try:
+        FakeModel.failures = 2
+        assert llm_client.generate("hi", "gemini-1.5-flash", {}) == "gemini-1.5-flash: hi"
+        assert sleeps == [1, 2]
+
+        FakeModel.failures = llm_client.LLM_MAX_RETRIES + 1
+        try:
+            llm_client.generate("hi", "gemini-1.5-flash", {})
+            assert False, "expected ResourceExhausted"
+        except ResourceExhausted:
+            pass
+    finally:
+        llm_client.time.sleep = original_sleep
+
+
+def test_generate_async_limits_concurrency():
+    use_fake_genai()
+
+    async def run():
+        prompts = [f"plan {i}" for i in range(3 * llm_client.LLM_MAX_CONCURRENCY)]
+        return await asyncio.gather(*(llm_client.generate_async(p, "gemini-1.5-flash", {}) for p in prompts))
+
+    results = asyncio.run(run())
+    assert results[0] == "gemini-1.5-flash: plan 0"
+    assert FakeModel.max_in_flight == llm_client.LLM_MAX_CONCURRENCY
+
+
+def test_clean_response_text():
+    assert llm_client.clean_response_text('```json\n{"a": 1}\n```') == '{"a": 1}'
+    assert llm_client.clean_response_text(' {"a": 1} ') == '{"a": 1}'
+
+
+if __name__ == "__main__":
+    test_models_are_shared_per_name_and_config()
+    test_rate_limited_calls_are_retried()
+    test_generate_async_limits_concurrency()
+    test_clean_response_text()
+    print("✅ LLM client tests passed")
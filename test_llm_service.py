@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Tests for the fused and streaming extraction paths of llm_service (stand-in Gemini, no API key needed)
+"""
+
+import json
+import asyncio
+from Services import llm_service
+from Services.llm_cache import LLMResponseCache
+
+
+def extract_with_fake_gemini(answer, queries):
+    # Runs extract_trip_and_hotel_preferences for each (query, context) against a canned
+    # answer and a private cache; returns the results and the (prompt, config) Gemini got
+    prompts = []
+    cache = LLMResponseCache(":memory:")
+
+    def fake_generate(prompt, model_name, generation_config):
+        prompts.append((prompt, generation_config))
+        return json.dumps(answer)
+
+    original_generate, original_get_llm_cache = llm_service.generate, llm_service.get_llm_cache
+    llm_service.generate, llm_service.get_llm_cache = fake_generate, lambda: cache
+    try:
+        return [llm_service.extract_trip_and_hotel_preferences(query, context) for query, context in queries], prompts
+    finally:
+        llm_service.generate, llm_service.get_llm_cache = original_generate, original_get_llm_cache
+
+
+def test_fused_extraction_returns_trip_and_hotel_preferences():
+    hotel = {"location": "Goa", "stay_dates": None,
+             "hotel_preferences": {"rating": "4", "amenities": ["pool"], "price_range": None}}
+    trip = {"source": "Bangalore", "destination": "Goa", "weather_preference": "sunny"}
+    query = ("Plan a trip from Bangalore to Goa", "Likes pools.")
+
+    results, prompts = extract_with_fake_gemini(
+        {"is_trip": True, "message": None, "trip": trip, "hotel_preferences": hotel}, [query, query])
+
+    assert results[0] == {"status": "success", "data": {
+        "trip": trip,
+        "hotel_preferences": {"status": "success", "data": hotel},
+    }}
+    # Same query and context: answered from the cache
+    assert results[1] == results[0]
+    assert len(prompts) == 1
+
+    prompt, config = prompts[0]
+    assert "Likes pools." in prompt and "Plan a trip from Bangalore to Goa" in prompt
+    assert config["response_mime_type"] == "application/json"
+    assert config["response_schema"] is llm_service.FUSED_RESPONSE_SCHEMA
+
+
+def test_fused_extraction_of_other_queries_returns_the_message():
+    results, _ = extract_with_fake_gemini(
+        {"is_trip": False, "message": None, "trip": None, "hotel_preferences": None}, [("What is 2 + 2?", "")])
+    assert results == [{"status": "success", "data": llm_service.NOT_A_TRIP_MESSAGE}]
+
+
+def fake_stream(chunks, delay=0.02):
+    async def stream_async(prompt, model_name, generation_config):
+        for chunk in chunks:
+            await asyncio.sleep(delay)
+            yield chunk
+    return stream_async
+
+
+def test_streamed_fields_arrive_before_the_response_completes():
+    chunks = ['```json\n{"source": "Delhi", "destination": "Go', 'a", "weather_preference": "sunny",',
+              ' "travel_dates": null, "other_info": "family trip"}', '\n```']
+    seen = []
+    original_stream, original_enabled = llm_service.stream_async, llm_service.SEMANTIC_CACHE_ENABLED
+    llm_service.stream_async, llm_service.SEMANTIC_CACHE_ENABLED = fake_stream(chunks), False
+    try:
+        response, metrics = asyncio.run(llm_service.process_query_stream_async(
+            "Plan a trip from Delhi to Goa", on_field=lambda path, value: seen.append((path, value))))
+    finally:
+        llm_service.stream_async, llm_service.SEMANTIC_CACHE_ENABLED = original_stream, original_enabled
+
+    assert json.loads(response)["data"]["destination"] == "Goa"
+    assert seen[:3] == [("source", "Delhi"), ("destination", "Goa"), ("weather_preference", "sunny")]
+    assert metrics["first_field_ms"] < metrics["fields_ms"]["weather_preference"] < metrics["total_ms"]
+    assert not metrics["cached"]
+
+
+if __name__ == "__main__":
+    test_fused_extraction_returns_trip_and_hotel_preferences()
+    test_fused_extraction_of_other_queries_returns_the_message()
+    test_streamed_fields_arrive_before_the_response_completes()
+    print("✅ LLM service tests passed")
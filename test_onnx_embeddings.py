@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Tests for the ONNX embedding backend (stand-in tokenizer and session, no model download needed)
+"""
+
+import os
+import tempfile
+import numpy as np
+from tokenizers import Tokenizer
+from tokenizers.models import WordLevel
+from tokenizers.pre_tokenizers import Whitespace
+from Services import onnx_embeddings
+
+VOCAB = {"[PAD]": 0, "[UNK]": 1, "pool": 2, "gym": 3, "sea": 4, "view": 5, "spa": 6}
+
+
+class FakeSession:
+    """Hidden state of a token = a fixed random vector per token id (like an embedding layer)"""
+
+    def __init__(self, model_path):
+        self.model_path = model_path
+        self.table = np.random.default_rng(0).normal(size=(len(VOCAB), 8)).astype(np.float32)
+        self.batches = []
+
+    def get_inputs(self):
+        return [type("Input", (), {"name": name})() for name in ("input_ids", "attention_mask")]
+
+    def run(self, output_names, feed):
+        self.batches.append(feed["input_ids"].shape)
+        return [self.table[feed["input_ids"]]]
+
+
+def make_model_dir(workdir):
+    tokenizer = Tokenizer(WordLevel(VOCAB, unk_token="[UNK]"))
+    tokenizer.pre_tokenizer = Whitespace()
+    tokenizer.save(os.path.join(workdir, "tokenizer.json"))
+    open(os.path.join(workdir, "model.onnx"), "wb").close()
+
+
+def test_embeddings_are_pooled_normalized_and_independent_of_batching():
+    original = onnx_embeddings._create_session
+    onnx_embeddings._create_session = lambda model_path, threads: FakeSession(model_path)
+    try:
+        with tempfile.TemporaryDirectory() as workdir:
+            make_model_dir(workdir)
+            embed = onnx_embeddings.OnnxEmbeddingFunction(workdir, quantize=False, batch_size=2)
+            texts = ["sea view pool gym spa", "pool", "gym spa", "view"]
+            vectors = embed(texts)
+            alone = [embed([text])[0] for text in texts]
+    finally:
+        onnx_embeddings._create_session = original
+
+    table = FakeSession("").table
+    expected = table[[VOCAB["gym"], VOCAB["spa"]]].mean(axis=0)
+    assert np.allclose(vectors[2], expected / np.linalg.norm(expected), atol=1e-6)
+    assert all(abs(np.linalg.norm(v) - 1) < 1e-5 for v in vectors)
+    # Padding never leaks into a vector: same result alone or next to longer texts, in input order
+    assert all(np.allclose(v, a, atol=1e-6) for v, a in zip(vectors, alone))
+    # Length-sorted batches are padded to their own longest text only
+    assert embed._session.batches[:2] == [(2, 1), (2, 5)]
+
+
+def test_quantization_falls_back_to_the_float_model():
+    with tempfile.TemporaryDirectory() as workdir:
+        model_path = os.path.join(workdir, "model.onnx")
+        with open(model_path, "wb") as f:
+            f.write(b"not a model")
+        assert onnx_embeddings.get_quantized_model(model_path) == model_path
+        # An existing int8 copy is reused as is
+        open(os.path.join(workdir, "model_int8.onnx"), "wb").close()
+        assert onnx_embeddings.get_quantized_model(model_path) == os.path.join(workdir, "model_int8.onnx")
+
+
+if __name__ == "__main__":
+    test_embeddings_are_pooled_normalized_and_independent_of_batching()
+    test_quantization_falls_back_to_the_float_model()
+    print("✅ ONNX embedding tests passed")
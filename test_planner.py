@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Tests for the concurrent planners (stand-in LLM, weather, calendar and RAG stages)
+"""
+
+import json
+import time
+import asyncio
+import planner
+
+events = []
+
+
+async def fake_process_query_stream_async(query, on_field=None):
+    start = time.perf_counter()
+    for path, value in [("source", "Delhi"), ("destination", "Goa"), ("weather_preference", "sunny"), ("travel_dates", None)]:
+        await asyncio.sleep(0.02)
+        on_field(path, value)
+    # The model keeps writing for a while after the fields the weather stage needs
+    await asyncio.sleep(0.2)
+    events.append("intent done")
+    data = {"source": "Delhi", "destination": "Goa", "weather_preference": "sunny", "travel_dates": None}
+    return json.dumps({"status": "success", "data": data}), {"first_field_ms": 20.0, "total_ms": (time.perf_counter() - start) * 1000}
+
+
+async def fake_weather(destination, condition, days=30):
+    events.append(f"weather {destination} {condition}")
+    return ["2025-08-18", "2025-08-20"]
+
+
+async def fake_calendar(employee_id):
+    return ["2025-08-18", "2025-08-21"]
+
+
+async def fake_hotel_preferences(preferences_file, constraints=None):
+    return {"status": "success", "data": {"location": "Goa"}}
+
+
+def run_default_plan(hotel_preferences):
+    async def fake_intent(prompt):
+        await asyncio.sleep(0.05)
+        return {"source": "Delhi", "destination": "Goa", "weather_preference": "sunny"}
+
+    async def slow_weather(destination, condition, days=30):
+        await asyncio.sleep(0.1)
+        return ["2025-08-18", "2025-08-20"]
+
+    async def slow_calendar(employee_id):
+        await asyncio.sleep(0.1)
+        return ["2025-08-18", "2025-08-21"]
+
+    originals = (planner.index.get_response_from_llm_async, planner.index.get_relevant_dates_based_on_weather_async,
+                 planner.index.get_available_dates_async, planner.get_hotel_preferences_async)
+    planner.index.get_response_from_llm_async = fake_intent
+    planner.index.get_relevant_dates_based_on_weather_async = slow_weather
+    planner.index.get_available_dates_async = slow_calendar
+    planner.get_hotel_preferences_async = hotel_preferences
+    try:
+        start = time.perf_counter()
+        result = planner.plan_trip("Plan a trip from Delhi to Goa on a sunny day", 1001, fused=False, stream=False)
+        return result, time.perf_counter() - start
+    finally:
+        (planner.index.get_response_from_llm_async, planner.index.get_relevant_dates_based_on_weather_async,
+         planner.index.get_available_dates_async, planner.get_hotel_preferences_async) = originals
+
+
+def test_default_plan_runs_the_stages_concurrently():
+    constraints_seen = []
+
+    async def slow_hotel_preferences(preferences_file, constraints=None):
+        constraints_seen.append(constraints)
+        await asyncio.sleep(0.1)
+        return {"status": "success", "data": {"location": "Goa"}}
+
+    result, elapsed = run_default_plan(slow_hotel_preferences)
+
+    # 50 ms intent, then three 100 ms stages side by side (350 ms if run one after another)
+    assert elapsed < 0.25
+    assert result["data"]["intersection_dates"] == ["2025-08-18"]
+    assert result["data"]["hotel_preferences"]["data"] == {"location": "Goa"}
+    assert set(result["timings"]) == {"intent", "weather", "calendar", "hotel_preferences", "total"}
+    # The hotel stage gets the stay-related terms of the request (not source or weather)
+    assert constraints_seen == ["Goa"]
+
+
+def test_a_failing_hotel_stage_keeps_the_dates():
+    async def failing_hotel_preferences(preferences_file, constraints=None):
+        raise FileNotFoundError("hotel_preferences.txt")
+
+    result, _ = run_default_plan(failing_hotel_preferences)
+
+    assert result["status"] == "success"
+    assert result["data"]["intersection_dates"] == ["2025-08-18"]
+    assert result["data"]["hotel_preferences"] == {"status": "error", "message": "hotel_preferences.txt"}
+
+
+def test_streaming_plan_starts_weather_before_the_intent_completes():
+    originals = (planner.process_query_stream_async, planner.index.get_relevant_dates_based_on_weather_async,
+                 planner.index.get_available_dates_async, planner.get_hotel_preferences_async)
+    planner.process_query_stream_async = fake_process_query_stream_async
+    planner.index.get_relevant_dates_based_on_weather_async = fake_weather
+    planner.index.get_available_dates_async = fake_calendar
+    planner.get_hotel_preferences_async = fake_hotel_preferences
+    try:
+        result = planner.plan_trip("Plan a trip from Delhi to Goa on a sunny day", 1001, stream=True)
+    finally:
+        (planner.process_query_stream_async, planner.index.get_relevant_dates_based_on_weather_async,
+         planner.index.get_available_dates_async, planner.get_hotel_preferences_async) = originals
+
+    assert events == ["weather Goa sunny", "intent done"]
+    assert result["data"]["intersection_dates"] == ["2025-08-18"]
+    assert result["data"]["hotel_preferences"]["data"] == {"location": "Goa"}
+    timings = result["timings"]
+    assert timings["intent_first_field"] <= timings["intent_weather_fields"] < timings["intent"] <= timings["total"]
+
+
+def run_streaming_plan(process_query_stream, available_dates, hotel_preferences):
+    async def plan():
+        try:
+            return await planner.plan_trip_async("Plan a trip from Delhi to Goa on a sunny day", 1001, stream=True)
+        finally:
+            # Whatever the outcome, no stage outlives the plan
+            assert asyncio.all_tasks() == {asyncio.current_task()}
+
+    originals = (planner.process_query_stream_async, planner.index.get_relevant_dates_based_on_weather_async,
+                 planner.index.get_available_dates_async, planner.get_hotel_preferences_async)
+    planner.process_query_stream_async = process_query_stream
+    planner.index.get_relevant_dates_based_on_weather_async = fake_weather
+    planner.index.get_available_dates_async = available_dates
+    planner.get_hotel_preferences_async = hotel_preferences
+    try:
+        return asyncio.run(plan())
+    finally:
+        (planner.process_query_stream_async, planner.index.get_relevant_dates_based_on_weather_async,
+         planner.index.get_available_dates_async, planner.get_hotel_preferences_async) = originals
+
+
+def test_streaming_plan_keeps_the_dates_when_the_hotel_stage_fails():
+    async def failing_hotel_preferences(preferences_file, constraints=None):
+        raise FileNotFoundError("hotel_preferences.txt")
+
+    result = run_streaming_plan(fake_process_query_stream_async, fake_calendar, failing_hotel_preferences)
+
+    assert result["status"] == "success"
+    assert result["data"]["intersection_dates"] == ["2025-08-18"]
+    assert result["data"]["hotel_preferences"] == {"status": "error", "message": "hotel_preferences.txt"}
+
+
+def test_streaming_plan_cancels_its_stages_when_the_intent_fails():
+    cancelled = []
+
+    async def failing_stream(query, on_field=None):
+        on_field("source", "Delhi")
+        await asyncio.sleep(0.01)
+        raise ConnectionError("stream interrupted")
+
+    async def slow_calendar(employee_id):
+        try:
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            cancelled.append("calendar")
+            raise
+
+    start = time.perf_counter()
+    try:
+        run_streaming_plan(failing_stream, slow_calendar, fake_hotel_preferences)
+        assert False, "expected the stream error"
+    except ConnectionError:
+        pass
+
+    assert cancelled == ["calendar"]
+    assert time.perf_counter() - start < 1
+
+
+if __name__ == "__main__":
+    test_default_plan_runs_the_stages_concurrently()
+    test_a_failing_hotel_stage_keeps_the_dates()
+    test_streaming_plan_starts_weather_before_the_intent_completes()
+    test_streaming_plan_keeps_the_dates_when_the_hotel_stage_fails()
+    test_streaming_plan_cancels_its_stages_when_the_intent_fails()
+    print("✅ Planner tests passed")
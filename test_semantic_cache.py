@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Tests for the semantic intent cache (stand-in embeddings, no model download or API key needed)
+"""
+
+import json
+from Services import llm_service
+from Services.semantic_cache import SemanticCache
+
+embedded = []
+
+
+def fake_embed(texts):
+    # Bag-of-words over a tiny vocabulary: near-identical queries get near-identical vectors
+    embedded.extend(texts)
+    vocabulary = ["plan", "trip", "to", "goa", "manali", "sunny", "weekend", "rainy", "a", "on", "please"]
+    return [[float(text.split().count(word)) for word in vocabulary] for text in texts]
+
+
+def test_exact_match_skips_the_embedding():
+    cache = SemanticCache(fake_embed)
+    cache.set("Plan a trip to Goa on a sunny weekend", {"destination": "Goa"}, seconds=1.5)
+    embedded.clear()
+
+    assert cache.get("  plan a trip to goa on a SUNNY weekend. ") == {"destination": "Goa"}
+    assert embedded == []
+    assert cache.stats()["exact_hits"] == 1
+    assert cache.stats()["saved_seconds"] == 1.5
+
+
+def test_trailing_punctuation_and_spaces_are_ignored():
+    cache = SemanticCache(fake_embed)
+    cache.set("plan a trip to goa", {"destination": "Goa"})
+    embedded.clear()
+
+    assert cache.get("Plan a trip to Goa !") == {"destination": "Goa"}
+    assert cache.get("plan a trip to goa ?! ") == {"destination": "Goa"}
+    assert embedded == []
+
+
+def test_a_cold_cache_does_not_embed():
+    cache = SemanticCache(fake_embed)
+    embedded.clear()
+
+    assert cache.get("Plan a trip to Goa on a sunny weekend") is None
+    assert embedded == []
+    assert cache.stats()["misses"] == 1
+
+    # The first set is what embeds, and later lookups are semantic again
+    cache.set("Plan a trip to Goa on a sunny weekend", {"destination": "Goa"})
+    assert embedded == ["plan a trip to goa on a sunny weekend"]
+
+
+def test_near_identical_queries_hit():
+    cache = SemanticCache(fake_embed, threshold=0.95)
+    cache.set("Plan a trip to Goa on a sunny weekend", {"destination": "Goa"}, seconds=2.0)
+
+    assert cache.get("please plan a trip to goa on a sunny weekend") == {"destination": "Goa"}
+    assert cache.get("Plan a trip to Goa on a rainy weekend") is None
+    assert cache.stats() == {"exact_hits": 0, "semantic_hits": 1, "misses": 1,
+                             "hit_ratio": 0.5, "saved_seconds": 2.0, "size": 1}
+
+
+def test_semantic_hits_must_name_the_same_places():
+    cache = SemanticCache(fake_embed, threshold=0.5, accept=llm_service._names_same_intent)
+    cache.set("Plan a trip to Goa on a sunny weekend", {"destination": "Goa", "weather_preference": "sunny"})
+
+    assert cache.get("please plan a trip to goa on a sunny weekend") is not None
+    assert cache.get("Plan a trip to Manali on a sunny weekend") is None
+
+
+def test_semantic_hits_must_name_the_same_dates():
+    cache = SemanticCache(fake_embed, threshold=0.9, accept=llm_service._names_same_intent)
+    cache.set("Plan a trip to Goa next weekend", {"destination": "Goa", "travel_dates": "next weekend"})
+
+    # "this" and "next" are not in the stand-in vocabulary, so both queries embed the same
+    assert cache.get("plan a trip to goa this weekend") is None
+    assert cache.get("please plan a trip to goa next weekend") is not None
+
+
+def test_rejected_neighbours_are_not_refreshed():
+    cache = SemanticCache(fake_embed, threshold=0.5, max_entries=2, accept=lambda query, response: False)
+    cache.set("Plan a trip to Goa on a sunny weekend", "goa")
+    cache.set("Plan a trip to Manali", "manali")
+
+    # Goa is the nearest neighbour but rejected, so it stays the least recently used entry
+    assert cache.get("please plan a trip to goa on a sunny weekend") is None
+    cache.set("rainy weekend", "rainy")
+    assert cache.get("Plan a trip to Goa on a sunny weekend") is None
+    assert cache.get("Plan a trip to Manali") == "manali"
+
+
+def test_process_query_reuses_cached_intents():
+    calls = []
+
+    def fake_generate(prompt, model_name, generation_config):
+        calls.append(prompt)
+        return '{"source": null, "destination": "Goa", "weather_preference": "sunny"}'
+
+    original_generate, original_cache = llm_service.generate, llm_service.intent_cache
+    llm_service.generate = fake_generate
+    llm_service.intent_cache = SemanticCache(fake_embed, threshold=0.95, accept=llm_service._names_same_intent)
+    try:
+        first = json.loads(llm_service.process_query("Plan a trip to Goa on a sunny weekend"))
+        second = json.loads(llm_service.process_query("plan a trip to Goa on a sunny weekend please"))
+        assert first == second == {"status": "success",
+                                   "data": {"source": None, "destination": "Goa", "weather_preference": "sunny"}}
+        assert len(calls) == 1
+    finally:
+        llm_service.generate, llm_service.intent_cache = original_generate, original_cache
+
+
+if __name__ == "__main__":
+    test_exact_match_skips_the_embedding()
+    test_trailing_punctuation_and_spaces_are_ignored()
+    test_a_cold_cache_does_not_embed()
+    test_near_identical_queries_hit()
+    test_semantic_hits_must_name_the_same_places()
+    test_semantic_hits_must_name_the_same_dates()
+    test_rejected_neighbours_are_not_refreshed()
+    test_process_query_reuses_cached_intents()
+    print("✅ Semantic cache tests passed")
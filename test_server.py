@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Tests for the HTTP routes (stand-in pipeline functions, no external services needed)
+"""
+
+import asyncio
+import httpx
+import server
+from Services import embeddings, weather_service
+
+
+def request(method, path, **kwargs):
+    async def run():
+        transport = httpx.ASGITransport(app=server.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.request(method, path, **kwargs)
+    return asyncio.run(run())
+
+
+def test_routes_call_the_pipeline():
+    calls = []
+
+    async def fake_weather(destination, condition, days=30):
+        calls.append(("weather", destination, condition, days))
+        return ["2025-08-18"]
+
+    async def fake_holidays(employee_id):
+        calls.append(("holidays", employee_id))
+        return ["2025-08-20"]
+
+    async def fake_plan(prompt, employee_id, days=30, fused=None, stream=None):
+        calls.append(("plan", prompt, employee_id, days, stream))
+        return {"status": "success", "data": "planned"}
+
+    originals = (server.index.get_relevant_dates_based_on_weather_async, server.index.get_available_dates_async,
+                 server.planner.plan_trip_async)
+    server.index.get_relevant_dates_based_on_weather_async = fake_weather
+    server.index.get_available_dates_async = fake_holidays
+    server.planner.plan_trip_async = fake_plan
+    try:
+        response = request("POST", "/weather/dates", json={"location": "Goa", "condition": "sunny"})
+        assert response.json() == {"location": "Goa", "condition": "sunny", "dates": ["2025-08-18"]}
+        assert request("GET", "/holidays/1001").json() == {"employee_id": 1001, "dates": ["2025-08-20"]}
+        assert request("POST", "/plan", json={"prompt": "Plan a trip to Goa", "employee_id": 1001, "stream": True}).json() == \
+            {"status": "success", "data": "planned"}
+        assert request("POST", "/plan", json={"employee_id": 1001}).status_code == 422
+    finally:
+        (server.index.get_relevant_dates_based_on_weather_async, server.index.get_available_dates_async,
+         server.planner.plan_trip_async) = originals
+
+    assert calls == [("weather", "Goa", "sunny", 5), ("holidays", 1001), ("plan", "Plan a trip to Goa", 1001, 30, True)]
+
+
+def test_health_and_shutdown_without_a_weather_service():
+    async def run():
+        async with server.lifespan(server.app):
+            transport = httpx.ASGITransport(app=server.app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                return await client.get("/health")
+
+    originals = (server.SERVER_WARMUP, weather_service._weather_service, weather_service._weather_batcher,
+                 embeddings._batcher)
+    server.SERVER_WARMUP = False
+    weather_service._weather_service = None
+    try:
+        response = asyncio.run(run())
+        # Neither the health check nor the shutdown created (or needed) the weather service
+        assert weather_service._weather_service is None
+    finally:
+        (server.SERVER_WARMUP, weather_service._weather_service, weather_service._weather_batcher,
+         embeddings._batcher) = originals
+
+    assert response.status_code == 200
+    caches = response.json()["caches"]
+    assert caches["geocode"] is None and caches["forecast"] is None
+    assert caches["intent"]["size"] >= 0
+
+
+if __name__ == "__main__":
+    test_routes_call_the_pipeline()
+    test_health_and_shutdown_without_a_weather_service()
+    print("✅ Server tests passed")
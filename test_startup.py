@@ -0,0 +1,29 @@
+#!/usr/bin/env python3
+"""
+Tests that importing the planner's modules stays cheap (run in a fresh interpreter)
+
+Gemini, ChromaDB and the embedding model are only loaded on first use.
+"""
+
+import os
+import sys
+import subprocess
+
+HEAVY_MODULES = ["chromadb", "google.generativeai", "sentence_transformers", "onnxruntime"]
+
+
+def test_importing_the_planner_modules_loads_no_heavy_dependencies():
+    code = (
+        "import sys, index, Services.hotel_service, Services.llm_service; "
+        f"print([name for name in {HEAVY_MODULES!r} if name in sys.modules])"
+    )
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True,
+                            cwd=os.path.dirname(os.path.abspath(__file__)))
+
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip().splitlines()[-1] == "[]"
+
+
+if __name__ == "__main__":
+    test_importing_the_planner_modules_loads_no_heavy_dependencies()
+    print("✅ Startup tests passed")
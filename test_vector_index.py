@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Tests for the memory-mapped exact vector index
+"""
+
+import os
+import tempfile
+import numpy as np
+from Services.vector_index import VectorIndex
+
+
+def test_search_returns_the_nearest_chunks_best_first():
+    rng = np.random.default_rng(0)
+    vectors = rng.normal(size=(50, 16))
+    documents = [f"chunk {i}" for i in range(50)]
+    query = vectors[7] + 0.01 * rng.normal(size=16)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for dtype in ("float32", "float16"):
+            index = VectorIndex(os.path.join(tmp, dtype), dtype=dtype)
+            assert index.search("1001", query) is None
+            assert index.write("1001", vectors, documents)
+
+            normalized = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+            expected = [documents[i] for i in np.argsort(-(normalized @ query))[:3]]
+            assert index.search("1001", query, k=3) == expected
+            assert expected[0] == "chunk 7"
+            assert index.search("1001", query, k=100)[:3] == expected
+            assert np.load(os.path.join(tmp, dtype, "1001.npy"), mmap_mode="r").dtype == np.dtype(dtype)
+            assert index.stats()["hits"] == 2 and index.stats()["fallbacks"] == 1
+
+
+def test_large_users_are_left_to_chroma_and_rewrites_are_picked_up():
+    with tempfile.TemporaryDirectory() as tmp:
+        index = VectorIndex(tmp, max_rows=2)
+        assert index.write("user/a", [[1.0, 0.0], [0.0, 1.0]], ["east", "north"])
+        assert index.search("user/a", [1.0, 0.1], k=1) == ["east"]
+
+        # Another process (here: another instance) rewrites the files
+        VectorIndex(tmp).write("user/a", [[0.0, 1.0]], ["north only"])
+        assert index.search("user/a", [1.0, 0.1], k=1) == ["north only"]
+
+        assert not index.write("user/a", [[1.0, 0.0]] * 3, ["a", "b", "c"])
+        assert index.search("user/a", [1.0, 0.0]) is None
+        assert index.write("empty", [], [])
+        assert index.search("empty", [1.0, 0.0]) == []
+
+
+if __name__ == "__main__":
+    test_search_returns_the_nearest_chunks_best_first()
+    test_large_users_are_left_to_chroma_and_rewrites_are_picked_up()
+    print("✅ Vector index tests passed")
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Tests for batched weather lookups and 429 retries (httpx.MockTransport, no API key or network needed)
+"""
+
+import os
+import time
+import asyncio
+import httpx
+from Services.weather_cache import GeocodeCache, ForecastCache
+from Services import weather_service
+from Services.weather_service import WeatherService
+
+CITIES = {"Goa": (15.49, 73.82), "Manali": (32.24, 77.19), "Jaipur": (26.91, 75.79)}
+WEATHER = {"Goa": (800, "Clear", "clear sky"), "Manali": (500, "Rain", "light rain"), "Jaipur": (803, "Clouds", "broken clouds")}
+
+
+def forecast(city):
+    code, main, description = WEATHER[city]
+    start = int(time.time()) // 10800 * 10800
+    return {"list": [{"dt": start + i * 10800, "weather": [{"id": code, "main": main, "description": description}],
+                      "main": {"temp": 25.0, "humidity": 50}} for i in range(40)]}
+
+
+def make_service():
+    original = os.environ.get("OPENWEATHER_API_KEY")
+    os.environ["OPENWEATHER_API_KEY"] = "test"
+    try:
+        return WeatherService(geocode_cache=GeocodeCache(path=None), forecast_cache=ForecastCache())
+    finally:
+        if original is None:
+            del os.environ["OPENWEATHER_API_KEY"]
+        else:
+            os.environ["OPENWEATHER_API_KEY"] = original
+
+
+def run_with_transport(service, handler, coroutine_function):
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            service.get_async_client = lambda: client
+            return await coroutine_function()
+    return asyncio.run(run())
+
+
+def test_batch_fetches_each_location_once_within_the_concurrency_cap():
+    calls = []
+    in_flight = peak = 0
+
+    async def handler(request):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.02)
+        in_flight -= 1
+        if request.url.path.endswith("/direct"):
+            city = request.url.params["q"].strip()
+            calls.append(("geocode", city))
+            lat, lon = CITIES[city]
+            return httpx.Response(200, json=[{"lat": lat, "lon": lon, "name": city, "country": "IN"}])
+        city = next(name for name, (lat, _) in CITIES.items() if float(request.url.params["lat"]) == lat)
+        calls.append(("forecast", city))
+        return httpx.Response(200, json=forecast(city))
+
+    requests = [("Goa", "sunny", 5)] * 4 + [(" goa", "rainy")] + [("Manali", "rainy")] * 3 + [("Jaipur", "cloudy", 3)]
+    service = make_service()
+    results = run_with_transport(service, handler,
+                                 lambda: service.get_weather_dates_batch_async(requests, max_concurrency=2))
+
+    assert sorted(calls) == [("forecast", "Goa"), ("forecast", "Jaipur"), ("forecast", "Manali"),
+                             ("geocode", "Goa"), ("geocode", "Jaipur"), ("geocode", "Manali")]
+    assert peak == 2
+    # Every condition is evaluated against its location's single forecast
+    assert len(results) == len(requests)
+    assert results[0] and results[0] == results[1] == results[2] == results[3]
+    assert results[4] == []
+    assert results[5] and results[5] == results[6] == results[7]
+    assert results[8] and len(results[8]) <= 3
+
+
+def test_rate_limited_requests_are_retried_after_retry_after():
+    attempts = []
+
+    def handler(request):
+        attempts.append(time.perf_counter())
+        if len(attempts) == 1:
+            return httpx.Response(429, headers={"Retry-After": "1"})
+        return httpx.Response(200, json=[{"lat": 15.49, "lon": 73.82, "name": "Goa", "country": "IN"}])
+
+    service = make_service()
+    coords = run_with_transport(service, handler, lambda: service.get_coordinates_async("Goa"))
+
+    assert coords["name"] == "Goa"
+    assert len(attempts) == 2
+    assert attempts[1] - attempts[0] >= 1.0
+
+
+def test_a_malformed_request_only_loses_its_own_dates():
+    def handler(request):
+        if request.url.path.endswith("/direct"):
+            return httpx.Response(200, json=[{"lat": 15.49, "lon": 73.82, "name": "Goa", "country": "IN"}])
+        return httpx.Response(200, json=forecast("Goa"))
+
+    requests = [("Goa", "sunny", 5), (None, "sunny", 5), ("Goa", None, 5), ("Goa",)]
+    service = make_service()
+    results = run_with_transport(service, handler, lambda: service.get_weather_dates_batch_async(requests))
+
+    assert results[0] and results[1:] == [[], [], []]
+
+    # The same through the server's micro-batcher, where both calls share one batch
+    async def submit_both():
+        weather_service.use_batched_weather_requests(max_wait_ms=20)
+        return await asyncio.gather(weather_service.get_weather_dates_async("Goa", "sunny", 5),
+                                    weather_service.get_weather_dates_async(None, "sunny", 5))
+
+    originals = weather_service._weather_service, weather_service._weather_batcher
+    weather_service._weather_service = service
+    try:
+        batched = run_with_transport(service, handler, submit_both)
+    finally:
+        weather_service._weather_service, weather_service._weather_batcher = originals
+    assert batched == [results[0], []]
+
+
+def test_the_shared_async_client_is_closed_with_its_loop():
+    async def run():
+        client = service.get_async_client()
+        await weather_service.aclose_weather_service()
+        return client
+
+    original = weather_service._weather_service
+    weather_service._weather_service = service = make_service()
+    try:
+        assert asyncio.run(run()).is_closed
+        # Without a shared service there is nothing to close (and nothing is created)
+        weather_service._weather_service = None
+        asyncio.run(weather_service.aclose_weather_service())
+        assert weather_service._weather_service is None
+    finally:
+        weather_service._weather_service = original
+
+
+if __name__ == "__main__":
+    test_batch_fetches_each_location_once_within_the_concurrency_cap()
+    test_rate_limited_requests_are_retried_after_retry_after()
+    test_a_malformed_request_only_loses_its_own_dates()
+    test_the_shared_async_client_is_closed_with_its_loop()
+    print("✅ Weather batch tests passed")
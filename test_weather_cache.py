@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Tests for the weather caches (no API key or network needed)
+"""
+
+import os
+import tempfile
+from Services.weather_cache import GeocodeCache, ForecastCache, normalize_location, next_forecast_update
+
+AMRITSAR = {"lat": 31.634, "lon": 74.8723, "name": "Amritsar", "state": "Punjab", "country": "IN"}
+
+
+def test_normalize_location():
+    assert normalize_location("  Amritsar ,  Punjab ") == "amritsar,punjab"
+    assert normalize_location("San   Francisco, CA") == "san francisco,ca"
+
+
+def test_geocode_cache_hits_and_misses():
+    cache = GeocodeCache(path=None)
+    assert cache.get("Amritsar, Punjab") == (False, None)
+
+    cache.set("Amritsar, Punjab", AMRITSAR)
+    assert cache.get("amritsar,punjab") == (True, AMRITSAR)
+
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+
+
+def test_geocode_cache_negative_entries():
+    cache = GeocodeCache(path=None)
+    cache.set("Atlantis", None)
+    assert cache.get("Atlantis") == (True, None)
+    assert cache.stats()["negative_hits"] == 1
+
+
+def test_geocode_cache_expiry_and_lru():
+    cache = GeocodeCache(path=None, max_entries=2, ttl=-1)
+    cache.set("Amritsar", AMRITSAR)
+    assert cache.get("Amritsar") == (False, None)
+
+    cache = GeocodeCache(path=None, max_entries=2)
+    cache.set("a", AMRITSAR)
+    cache.set("b", AMRITSAR)
+    cache.get("a")
+    cache.set("c", AMRITSAR)
+    assert cache.get("b") == (False, None)
+    assert cache.get("a") == (True, AMRITSAR)
+
+
+def test_geocode_cache_survives_restart():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "weather_cache.sqlite3")
+        GeocodeCache(path=path).set("Amritsar, Punjab", AMRITSAR)
+        assert GeocodeCache(path=path).get("Amritsar, Punjab") == (True, AMRITSAR)
+
+
+def test_next_forecast_update_is_on_3_hour_boundary():
+    now = 1_700_000_000
+    boundary = next_forecast_update(now)
+    assert boundary % (3 * 3600) == 0
+    assert now < boundary <= now + 3 * 3600
+
+
+def test_forecast_cache_rounds_coordinates():
+    cache = ForecastCache(precision=2)
+    records = [{"date": "2025-08-18", "condition": "clear", "temperature": 31.2}]
+    cache.set(31.6340, 74.8723, records)
+
+    assert cache.get(31.6341, 74.8719) == records
+    assert cache.get(31.6340, 74.8723, units="imperial") is None
+    assert cache.stats() == {"hits": 1, "misses": 1, "hit_ratio": 0.5, "size": 1}
+
+
+if __name__ == "__main__":
+    test_normalize_location()
+    test_geocode_cache_hits_and_misses()
+    test_geocode_cache_negative_entries()
+    test_geocode_cache_expiry_and_lru()
+    test_geocode_cache_survives_restart()
+    test_next_forecast_update_is_on_3_hour_boundary()
+    test_forecast_cache_rounds_coordinates()
+    print("✅ Weather cache tests passed")
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Tests for the compiled weather condition matcher (no API key or network needed)
+"""
+
+from Services.weather_conditions import compile_preference, CODE_TO_MAIN, CONDITION_CODES
+
+
+def day(condition, condition_id, temperature=22.0):
+    return {"date": "2025-08-18", "condition": condition, "condition_id": condition_id, "temperature": temperature}
+
+
+def test_every_code_has_a_main():
+    for codes in CONDITION_CODES.values():
+        assert codes <= set(CODE_TO_MAIN)
+
+
+def test_simple_conditions_match_on_codes():
+    assert compile_preference("sunny").matches(day("clear", 800))
+    assert not compile_preference("sunny").matches(day("clouds", 801))
+    assert compile_preference("rainy").matches(day("drizzle", 300))
+    assert compile_preference("heavy rain").matches(day("rain", 502))
+    assert not compile_preference("heavy rain").matches(day("rain", 500))
+
+
+def test_records_without_codes_match_on_main():
+    assert compile_preference("cloudy").matches(day("clouds", None))
+    assert compile_preference("foggy").matches(day("haze", None))
+    assert not compile_preference("foggy").matches(day("rain", None))
+
+
+def test_compound_preferences():
+    warm_and_sunny = compile_preference("sunny and warm above 25C")
+    assert warm_and_sunny.min_temp == 25.0
+    assert warm_and_sunny.matches(day("clear", 800, 27.5))
+    assert not warm_and_sunny.matches(day("clear", 800, 21.0))
+    assert not warm_and_sunny.matches(day("rain", 500, 27.5))
+
+    pref = compile_preference("rainy, between 15 and 20 degrees")
+    assert (pref.min_temp, pref.max_temp) == (15.0, 20.0)
+    assert pref.matches(day("rain", 501, 18.0))
+
+    assert compile_preference("hot").matches(day("clouds", 803, 33.0))
+    assert not compile_preference("cold").matches(day("snow", 600, 12.0))
+
+
+def test_unknown_conditions_fall_back_to_substring():
+    assert compile_preference("squall").matches(day("squall", None))
+    assert compile_preference("thunder").matches(day("thunderstorm", None))
+
+
+if __name__ == "__main__":
+    test_every_code_has_a_main()
+    test_simple_conditions_match_on_codes()
+    test_records_without_codes_match_on_main()
+    test_compound_preferences()
+    test_unknown_conditions_fall_back_to_substring()
+    print("✅ Weather condition tests passed")